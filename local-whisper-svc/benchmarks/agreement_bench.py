@@ -0,0 +1,99 @@
+"""Micro-benchmark: LocalAgreement (characters) vs WordAgreement (words).
+
+Simulates a long monologue decoded without a commit trim: every update the
+hypothesis grows by a few words, its last words are still unstable (they
+change between decodes), and the word timestamps advance with the audio.
+Both engines see the same hypotheses; only process() is timed.
+
+LocalAgreement compares the full hypothesis strings on every update, so its
+cost grows with the transcript. WordAgreement only compares the words after
+the last commit.
+
+Usage:
+    PYTHONPATH=src python benchmarks/agreement_bench.py --words 1000 2000 4000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from local_whisper_svc.local_agreement import LocalAgreement, WordAgreement
+from local_whisper_svc.whisper_engine import WordInfo
+
+VOCABULARY = (
+    "the of and to in that is was for it with as on be at by this had not are "
+    "but from or have an they which one you were her all she there would their "
+    "we him been has when who will more no if out so said what up its about into "
+    "than them can only other new some could time these two may then do first"
+).split()
+
+
+def monologue(num_words: int, seed: int = 0) -> list[WordInfo]:
+    """Word timings for a monologue of `num_words` words at ~2.5 words/s."""
+    rng = random.Random(seed)
+    words = []
+    t = 0.0
+    for _ in range(num_words):
+        duration = rng.uniform(0.25, 0.5)
+        words.append(WordInfo(f" {rng.choice(VOCABULARY)}", t, t + duration))
+        t += duration + 0.05
+    return words
+
+
+def hypotheses(words: list[WordInfo], step: int, unstable: int, seed: int = 1):
+    """Yield (text, words) per update: the stable prefix plus an unstable tail."""
+    rng = random.Random(seed)
+    for end in range(step, len(words) + 1, step):
+        hypothesis = list(words[:end])
+        for i in range(max(0, end - unstable), end):
+            if rng.random() < 0.5:
+                w = hypothesis[i]
+                hypothesis[i] = WordInfo(f" {rng.choice(VOCABULARY)}", w.start, w.end)
+        yield "".join(w.word for w in hypothesis).strip(), hypothesis
+
+
+def run(engine, updates: list, use_words: bool) -> dict:
+    """Feed every update to one engine and time process()."""
+    timings = []
+    commits = 0
+    for text, words in updates:
+        started = time.perf_counter()
+        result = engine.process(text, words) if use_words else engine.process(text)
+        timings.append(time.perf_counter() - started)
+        commits += result.is_final
+    # The last tenth of the updates shows the cost at full transcript length
+    late = timings[-max(1, len(timings) // 10):]
+    return {
+        "total_ms": round(sum(timings) * 1000, 2),
+        "mean_us": round(sum(timings) / len(timings) * 1e6, 1),
+        "late_mean_us": round(sum(late) / len(late) * 1e6, 1),
+        "commits": commits,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare agreement engines on long transcripts")
+    parser.add_argument("--words", type=int, nargs="+", default=[1000, 2000, 4000],
+                        help="Monologue lengths in words (default: 1000 2000 4000)")
+    parser.add_argument("--step", type=int, default=2, help="Words added per update (default: 2)")
+    parser.add_argument("--unstable", type=int, default=3,
+                        help="Trailing words that change between updates (default: 3)")
+    args = parser.parse_args()
+
+    results = []
+    for num_words in args.words:
+        # Hypotheses are built up front so their construction isn't timed
+        updates = list(hypotheses(monologue(num_words), args.step, args.unstable))
+        results.append({
+            "words": num_words,
+            "updates": len(updates),
+            "chars": run(LocalAgreement(), updates, use_words=False),
+            "words_engine": run(WordAgreement(), updates, use_words=True),
+        })
+        del updates
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Micro-benchmark: torch vs onnxruntime Silero VAD backends.
+
+Each backend runs in a fresh interpreter so import time and memory are not
+shared. Reported per backend:
+
+- import_s: importing the framework and loading the model
+- rss_mb: peak RSS of the process after loading and running
+- frame_us: per-frame latency for a single stream (p50/p95)
+- batch_frame_us: per-frame latency of one batched step over --batch streams,
+  divided by the batch size
+
+Usage:
+    PYTHONPATH=src python benchmarks/vad_bench.py --backends torch onnx
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+
+def measure(backend: str, frames: int, batch: int) -> dict:
+    """Run in the child process: load one backend and time it."""
+    started = time.perf_counter()
+    from local_whisper_svc.vad import CONTEXT_SAMPLES, FRAME_SAMPLES, STATE_SHAPE, create_vad
+
+    vad = create_vad(backend)
+    vad.load_model()
+    import_s = time.perf_counter() - started
+
+    rng = np.random.default_rng(0)
+    frame_len = CONTEXT_SAMPLES + FRAME_SAMPLES
+
+    def run(n_streams: int) -> list[float]:
+        state = np.zeros((STATE_SHAPE[0], n_streams, STATE_SHAPE[2]), dtype=np.float32)
+        timings = []
+        for _ in range(frames):
+            x = (rng.standard_normal((n_streams, frame_len)) * 0.1).astype(np.float32)
+            t = time.perf_counter()
+            _, state = vad.forward(x, state)
+            timings.append((time.perf_counter() - t) / n_streams)
+        return timings
+
+    run(1)  # warm-up
+    single = np.asarray(run(1)) * 1e6
+    batched = np.asarray(run(batch)) * 1e6
+
+    return {
+        "backend": backend,
+        "import_s": round(import_s, 3),
+        "rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "torch_imported": "torch" in sys.modules,
+        "frame_us": {
+            "p50": round(float(np.percentile(single, 50)), 1),
+            "p95": round(float(np.percentile(single, 95)), 1),
+        },
+        "batch_frame_us": {
+            "batch": batch,
+            "p50": round(float(np.percentile(batched, 50)), 1),
+            "p95": round(float(np.percentile(batched, 95)), 1),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Silero VAD backends")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx"],
+                        help="Backends to compare (default: torch onnx)")
+    parser.add_argument("--frames", type=int, default=2000, help="Frames timed per run (default: 2000)")
+    parser.add_argument("--batch", type=int, default=8, help="Streams per batched step (default: 8)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.frames, args.batch)))
+        return
+
+    results = []
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--child", backend,
+             "--frames", str(args.frames), "--batch", str(args.batch)],
+            capture_output=True, text=True, env=os.environ,
+        )
+        if proc.returncode != 0:
+            results.append({"backend": backend, "error": proc.stderr.strip().splitlines()[-1]})
+        else:
+            results.append(json.loads(proc.stdout))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Fixed-capacity float32 ring buffer for per-session audio.
+
+Incoming PCM chunks are converted to normalized float32 exactly once on
+arrival and written into a preallocated buffer, so memory and CPU per chunk
+stay flat no matter how long a speaker talks. Trimming (keep the last N
+seconds, drop committed audio) is an index move.
+
+The buffer is mirrored: every sample is stored twice, `capacity` apart, so
+any window of up to `capacity` samples is a contiguous slice of the backing
+array and can be handed to the engine as a view without copying.
+"""
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+INT16_SCALE = 1.0 / 32768.0
+
+
+class AudioRingBuffer:
+    """Mirrored float32 ring buffer with absolute stream offsets.
+
+    Views returned by view() alias the backing array. A view of n samples
+    stays valid until `capacity - n` more samples have been appended, so
+    size the capacity with headroom for audio that arrives while a decode
+    of the window is still in flight.
+    """
+
+    def __init__(self, capacity_samples: int):
+        """
+        Args:
+            capacity_samples: Maximum number of samples held; older samples
+                are dropped once the buffer is full
+        """
+        if capacity_samples <= 0:
+            raise ValueError("capacity_samples must be positive")
+        self.capacity = capacity_samples
+        self._data = np.zeros(2 * capacity_samples, dtype=np.float32)
+        self._write = 0  # ring position of the next sample
+        self._size = 0   # number of valid samples
+        self.total_samples = 0  # samples appended since creation (stream clock)
+        self.dropped_samples = 0  # samples overwritten before being trimmed
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def duration_seconds(self) -> float:
+        return self._size / SAMPLE_RATE
+
+    @property
+    def start_offset(self) -> int:
+        """Absolute stream offset (in samples) of the oldest buffered sample."""
+        return self.total_samples - self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes allocated for the backing array."""
+        return self._data.nbytes
+
+    def append_pcm(self, pcm_bytes: bytes) -> np.ndarray:
+        """Convert 16-bit PCM to float32 once and append it.
+
+        Args:
+            pcm_bytes: Raw PCM audio bytes (16kHz, 16-bit, mono)
+
+        Returns:
+            The converted float32 samples (e.g. for the VAD)
+        """
+        int16_audio = np.frombuffer(pcm_bytes, dtype=np.int16)
+        samples = np.multiply(int16_audio, INT16_SCALE, dtype=np.float32)
+        self.append(samples)
+        return samples
+
+    def append(self, samples: np.ndarray) -> None:
+        """Append normalized float32 samples."""
+        n = len(samples)
+        if n == 0:
+            return
+
+        self.total_samples += n
+        self.dropped_samples += max(0, self._size + n - self.capacity)
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            n = self.capacity
+
+        cap = self.capacity
+        first = min(n, cap - self._write)
+        w = self._write
+        self._data[w:w + first] = samples[:first]
+        self._data[w + cap:w + cap + first] = samples[:first]
+
+        rest = n - first
+        if rest:
+            self._data[:rest] = samples[first:]
+            self._data[cap:cap + rest] = samples[first:]
+
+        self._write = (w + n) % cap
+        self._size = min(self._size + n, cap)
+
+    def view(self, max_samples: int | None = None) -> np.ndarray:
+        """Return the newest samples as a contiguous view (no copy).
+
+        Args:
+            max_samples: Return at most this many of the newest samples
+
+        Returns:
+            float32 view of up to max_samples samples, oldest first
+        """
+        n = self._size if max_samples is None else min(max_samples, self._size)
+        if n <= 0:
+            return self._data[:0]
+
+        start = self._write - n
+        if start >= 0:
+            return self._data[start:self._write]
+        return self._data[start + self.capacity:self._write + self.capacity]
+
+    def view_from(self, offset: int) -> np.ndarray:
+        """Return samples from absolute stream offset to the newest sample."""
+        return self.view(max(0, self.total_samples - max(offset, self.start_offset)))
+
+    def room_after(self, offset: int) -> int:
+        """Samples that can be appended before the one at stream offset is overwritten."""
+        return offset + self.capacity - self.total_samples
+
+    def discard(self, n: int) -> None:
+        """Drop the n oldest samples (index move)."""
+        self._size = max(0, self._size - max(0, n))
+
+    def discard_until(self, offset: int) -> None:
+        """Drop every sample before absolute stream offset."""
+        self.discard(offset - self.start_offset)
+
+    def keep_last(self, n: int) -> None:
+        """Keep only the n newest samples (index move)."""
+        if n < self._size:
+            self._size = max(0, n)
+
+    def clear(self) -> None:
+        """Drop all buffered samples; the stream clock keeps running."""
+        self._size = 0
+
+
+def capacity_for_bytes(nbytes: int) -> int:
+    """Largest ring capacity (samples) whose mirrored backing array fits in nbytes."""
+    return nbytes // (2 * np.dtype(np.float32).itemsize)
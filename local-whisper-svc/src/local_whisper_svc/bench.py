@@ -0,0 +1,392 @@
+"""In-process replay benchmark for WhisperServer.
+
+Replays WAV files through WhisperServer._process_command with N concurrent
+simulated sessions, each paced in real time (or faster), and reports:
+
+- per-session real-time factor: wall time from the first chunk to the STOP
+  response, divided by the audio duration (> 1 means the session fell behind
+  at real-time pacing; with --speed 0 it is the processing RTF)
+- time-to-partial: for each PARTIAL, time since the first audio chunk sent
+  after the previous response
+- time-to-final: for each FINAL, time since the first audio chunk sent
+  after the previous FINAL
+- process CPU time and peak RSS
+
+With --engine fake, a fixed-cost stand-in replaces the Whisper model so the
+server's own overhead (parsing, VAD, buffering, scheduling) can be measured
+on machines without the model or a GPU. Results can be written as JSON for
+regression comparison.
+
+Usage:
+    whisper-svc-bench tests/pipeline-bench/samples/intro_30s.wav --sessions 8 --engine fake
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import resource
+import sys
+import time
+import wave
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+from .whisper_engine import COMMIT_PROFILE, DecodeProfile, TranscriptionResult, WordInfo
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+
+class FakeWhisperEngine:
+    """Fixed-cost stand-in for WhisperEngine.
+
+    Sleeps for a fixed cost plus a cost per second of audio (releasing the
+    GIL, like CTranslate2) and returns one word per `word_ms` of audio. A
+    single-window transcribe() reports a segment per `segment_s` of audio
+    as it goes, like faster-whisper's lazy segments. Decodes with a profile
+    without word timestamps cost `fast_cost` of a full one and return no
+    word timings.
+    """
+
+    def __init__(
+        self,
+        fixed_cost_ms: float = 50.0,
+        cost_per_audio_s_ms: float = 10.0,
+        word_ms: int = 400,
+        num_workers: int = 1,
+        language: str = "en",
+        segment_s: float = 5.0,
+        fast_cost: float = 0.3,
+    ):
+        """
+        Args:
+            fixed_cost_ms: Cost of every decode call
+            cost_per_audio_s_ms: Additional cost per second of audio
+            word_ms: Audio per emitted word
+            num_workers: Concurrent decodes, as for WhisperEngine
+            language: Language every decode reports
+            segment_s: Audio per segment reported by transcribe()
+            fast_cost: Relative cost of a decode without word timestamps
+        """
+        self.model_name = "fake"
+        self.device = "cpu"
+        self.fixed_cost_ms = fixed_cost_ms
+        self.cost_per_audio_s_ms = cost_per_audio_s_ms
+        self.word_ms = word_ms
+        self.num_workers = num_workers
+        self.language = language
+        self.segment_s = segment_s
+        self.fast_cost = fast_cost
+        self.calls = 0
+
+    def load_model(self) -> None:
+        pass
+
+    def unload_model(self) -> None:
+        pass
+
+    @property
+    def is_loaded(self) -> bool:
+        return True
+
+    def transcribe(
+        self,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        on_segment=None,
+        profile: DecodeProfile = COMMIT_PROFILE,
+        **kwargs,
+    ) -> TranscriptionResult:
+        if on_segment is None:
+            return self.transcribe_batch([audio], language, [initial_prompt], profile)[0]
+
+        self.calls += 1
+        scale = self._cost_scale(profile)
+        time.sleep(self.fixed_cost_ms * scale / 1000)
+        segment_samples = int(self.segment_s * SAMPLE_RATE)
+        for end in range(segment_samples, len(audio) + segment_samples, segment_samples):
+            segment = audio[end - segment_samples:end]
+            time.sleep(self.cost_per_audio_s_ms * scale * len(segment) / SAMPLE_RATE / 1000)
+            result = self._result(audio[:end], language, profile)
+            on_segment(result)
+        return self._result(audio, language, profile)
+
+    def transcribe_batch(
+        self,
+        audios: list[np.ndarray],
+        language: str | None = None,
+        initial_prompts: list[str | None] | None = None,
+        profile: DecodeProfile = COMMIT_PROFILE,
+    ) -> list[TranscriptionResult]:
+        self.calls += 1
+        audio_s = sum(len(a) for a in audios) / SAMPLE_RATE
+        cost_ms = self.fixed_cost_ms + self.cost_per_audio_s_ms * audio_s
+        time.sleep(cost_ms * self._cost_scale(profile) / 1000)
+        return [self._result(audio, language, profile) for audio in audios]
+
+    def detect_language(
+        self,
+        audio: np.ndarray,
+        candidates: list[str] | None = None,
+    ) -> tuple[str, float]:
+        time.sleep(self.fixed_cost_ms / 1000)
+        return (candidates or [self.language])[0], 1.0
+
+    def _cost_scale(self, profile: DecodeProfile) -> float:
+        return 1.0 if profile.word_timestamps else self.fast_cost
+
+    def _result(
+        self,
+        audio: np.ndarray,
+        language: str | None,
+        profile: DecodeProfile = COMMIT_PROFILE,
+    ) -> TranscriptionResult:
+        duration = len(audio) / SAMPLE_RATE
+        word_s = self.word_ms / 1000
+        words = [
+            WordInfo(f" w{i}", i * word_s, (i + 1) * word_s)
+            for i in range(int(duration / word_s))
+        ]
+        return TranscriptionResult(
+            text="".join(w.word for w in words).strip(),
+            language=language or self.language,
+            words=words if profile.word_timestamps else [],
+            duration_seconds=duration,
+        )
+
+
+@dataclass
+class SessionReport:
+    """Measurements for one simulated session."""
+    session_id: str
+    audio_seconds: float
+    wall_seconds: float = 0.0
+    stop_seconds: float = 0.0
+    partials: int = 0
+    finals: int = 0
+    errors: int = 0
+    time_to_partial: list[float] = field(default_factory=list)
+    time_to_final: list[float] = field(default_factory=list)
+
+    @property
+    def rtf(self) -> float:
+        return self.wall_seconds / self.audio_seconds if self.audio_seconds else 0.0
+
+
+def load_wav(path: Path) -> bytes:
+    """Read a 16 kHz mono 16-bit WAV file as raw PCM."""
+    with wave.open(str(path), "rb") as wav:
+        if (wav.getframerate(), wav.getnchannels(), wav.getsampwidth()) != (SAMPLE_RATE, 1, 2):
+            raise ValueError(f"{path}: expected 16 kHz mono 16-bit PCM")
+        return wav.readframes(wav.getnframes())
+
+
+def percentiles(values: list[float]) -> dict:
+    """p50/p95/p99 (and max) in milliseconds."""
+    if not values:
+        return {"count": 0}
+    arr = np.asarray(values) * 1000
+    return {
+        "count": len(values),
+        "p50_ms": round(float(np.percentile(arr, 50)), 1),
+        "p95_ms": round(float(np.percentile(arr, 95)), 1),
+        "p99_ms": round(float(np.percentile(arr, 99)), 1),
+        "max_ms": round(float(arr.max()), 1),
+    }
+
+
+async def replay_session(
+    server,
+    session_id: str,
+    pcm: bytes,
+    chunk_ms: int,
+    speed: float,
+    source_lang: str,
+) -> SessionReport:
+    """Replay one PCM stream as a client session."""
+    report = SessionReport(session_id=session_id, audio_seconds=len(pcm) / 2 / SAMPLE_RATE)
+    pending_since: float | None = None  # first chunk since the last response
+    final_pending_since: float | None = None  # first chunk since the last FINAL
+
+    def record(response: str) -> None:
+        nonlocal pending_since, final_pending_since
+        now = time.perf_counter()
+        kind = json.loads(response).get("type")
+        if kind == "PARTIAL":
+            report.partials += 1
+            if pending_since is not None:
+                report.time_to_partial.append(now - pending_since)
+        elif kind == "FINAL":
+            report.finals += 1
+            if final_pending_since is not None:
+                report.time_to_final.append(now - final_pending_since)
+            final_pending_since = None
+        elif kind == "ERROR":
+            report.errors += 1
+        pending_since = None
+
+    async def emit(response: str) -> None:
+        record(response)
+
+    await server._process_command(json.dumps({
+        "cmd": "START",
+        "session_id": session_id,
+        "source_lang": source_lang,
+    }), emit)
+
+    chunk_bytes = SAMPLE_RATE * chunk_ms // 1000 * 2
+    started = time.perf_counter()
+    for i, offset in enumerate(range(0, len(pcm), chunk_bytes)):
+        if speed > 0:
+            # Pace against the session clock so drift doesn't accumulate
+            due = started + i * chunk_ms / 1000 / speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        else:
+            await asyncio.sleep(0)
+
+        now = time.perf_counter()
+        if pending_since is None:
+            pending_since = now
+        if final_pending_since is None:
+            final_pending_since = now
+
+        response = await server._process_command(json.dumps({
+            "cmd": "AUDIO",
+            "session_id": session_id,
+            "pcm_b64": base64.b64encode(pcm[offset:offset + chunk_bytes]).decode("ascii"),
+        }))
+        if response:
+            record(response)
+
+    stop_started = time.perf_counter()
+    response = await server._process_command(json.dumps({"cmd": "STOP", "session_id": session_id}))
+    if response:
+        record(response)
+    finished = time.perf_counter()
+
+    report.stop_seconds = finished - stop_started
+    report.wall_seconds = finished - started
+    return report
+
+
+async def run_benchmark(
+    files: list[Path],
+    sessions: int,
+    chunk_ms: int = 100,
+    speed: float = 1.0,
+    engine=None,
+    source_lang: str = "en-US",
+) -> dict:
+    """Run the benchmark and return the JSON-serializable results.
+
+    Args:
+        files: WAV files; sessions cycle through them
+        sessions: Number of concurrent sessions
+        chunk_ms: Audio per AUDIO command
+        speed: Pacing relative to real time (0 = as fast as possible)
+        engine: Engine to run (None = load the configured Whisper model)
+        source_lang: Session language
+    """
+    from .server import WhisperServer
+
+    pcms = [load_wav(f) for f in files]
+
+    server = WhisperServer(engine=engine)
+    await server.load()
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    reports = await asyncio.gather(*(
+        replay_session(server, f"bench-{i}", pcms[i % len(pcms)], chunk_ms, speed, source_lang)
+        for i in range(sessions)
+    ))
+    wall = time.perf_counter() - started
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    server_stats = server.stats()
+    await server.stop()
+
+    cpu = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    return {
+        "config": {
+            "files": [str(f) for f in files],
+            "sessions": sessions,
+            "chunk_ms": chunk_ms,
+            "speed": speed,
+            "engine": server.engine.model_name,
+            "device": server.engine.device,
+        },
+        "wall_seconds": round(wall, 3),
+        "cpu_seconds": round(cpu, 3),
+        "cpu_per_audio_second": round(cpu / sum(r.audio_seconds for r in reports), 4),
+        "peak_rss_mb": round(usage_after.ru_maxrss / 1024, 1),  # ru_maxrss is KiB on Linux
+        "rtf": {
+            "mean": round(float(np.mean([r.rtf for r in reports])), 3),
+            "max": round(max(r.rtf for r in reports), 3),
+        },
+        "time_to_partial": percentiles([t for r in reports for t in r.time_to_partial]),
+        "time_to_final": percentiles([t for r in reports for t in r.time_to_final]),
+        "stop": percentiles([r.stop_seconds for r in reports]),
+        "scheduler": server_stats["scheduler"],
+        "sessions": [
+            {**asdict(r), "rtf": round(r.rtf, 3),
+             "time_to_partial": percentiles(r.time_to_partial),
+             "time_to_final": percentiles(r.time_to_final)}
+            for r in reports
+        ],
+    }
+
+
+def main():
+    """Console entry point (whisper-svc-bench)."""
+    parser = argparse.ArgumentParser(description="Replay WAV files through WhisperServer")
+    parser.add_argument("files", nargs="+", type=Path, help="16 kHz mono 16-bit WAV files")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions (default: 4)")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="Audio per AUDIO command (default: 100)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Pacing relative to real time; 0 = as fast as possible (default: 1)")
+    parser.add_argument("--lang", default="en-US", help="Session source language (default: en-US)")
+    parser.add_argument("--engine", choices=["whisper", "fake"], default="whisper",
+                        help="Real model or fixed-cost stand-in (default: whisper)")
+    parser.add_argument("--fake-cost-ms", type=float, default=50.0,
+                        help="Fake engine: fixed cost per decode (default: 50)")
+    parser.add_argument("--fake-cost-per-s-ms", type=float, default=10.0,
+                        help="Fake engine: cost per second of audio (default: 10)")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    args = parser.parse_args()
+
+    engine = None
+    if args.engine == "fake":
+        engine = FakeWhisperEngine(
+            fixed_cost_ms=args.fake_cost_ms,
+            cost_per_audio_s_ms=args.fake_cost_per_s_ms,
+        )
+
+    results = asyncio.run(run_benchmark(
+        args.files,
+        sessions=args.sessions,
+        chunk_ms=args.chunk_ms,
+        speed=args.speed,
+        engine=engine,
+        source_lang=args.lang,
+    ))
+
+    summary = {k: v for k, v in results.items() if k != "sessions"}
+    print(json.dumps(summary, indent=2))
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        logger.info(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    main()
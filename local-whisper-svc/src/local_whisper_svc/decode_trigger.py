@@ -0,0 +1,111 @@
+"""Per-session decode trigger with backlog coalescing.
+
+Decoding the whole window on every AUDIO chunk falls apart once decoding is
+slower than real time: stale decodes queue up and latency grows without
+bound. The trigger instead starts a decode only once enough new audio has
+arrived (or a VAD boundary was hit), and while a decode is in flight it
+folds every chunk that arrives into a single pending decode. Each session
+has at most one decode running and at most one pending.
+
+Chunks without speech don't make a decode due: a chunk the VAD judged
+silent that arrives with nothing pending is counted and skipped, so a
+session listening to silence or background noise costs no inference.
+"""
+
+import os
+from dataclasses import dataclass
+
+# Configuration from environment
+DECODE_STEP_MS = int(os.getenv("WHISPER_DECODE_STEP_MS", "500"))
+
+
+@dataclass
+class DecodeTriggerStats:
+    """Counters for one session's decode trigger."""
+    chunks: int = 0
+    decodes: int = 0
+    merged_chunks: int = 0  # chunks folded into a decode that covered several
+    deferred: int = 0       # due decodes postponed because inference was saturated
+    skipped_chunks: int = 0  # silent chunks that didn't count towards a decode
+    max_backlog_chunks: int = 0
+
+
+class DecodeTrigger:
+    """Decides when a session's window should be decoded next."""
+
+    def __init__(self, step_samples: int = 16000 * DECODE_STEP_MS // 1000):
+        """
+        Args:
+            step_samples: New audio (in samples) that triggers a decode
+        """
+        self.step_samples = max(1, step_samples)
+        self.stats = DecodeTriggerStats()
+        self.in_flight = False
+        self._new_samples = 0
+        self._new_chunks = 0
+        self._boundary = False
+
+    @property
+    def backlog_chunks(self) -> int:
+        """Chunks received since the last decode started."""
+        return self._new_chunks
+
+    @property
+    def backlog_samples(self) -> int:
+        """Samples received since the last decode started."""
+        return self._new_samples
+
+    @property
+    def is_due(self) -> bool:
+        """True if enough new audio (or a boundary) is waiting for a decode."""
+        return self._new_chunks > 0 and (
+            self._boundary or self._new_samples >= self.step_samples
+        )
+
+    def add_chunk(self, num_samples: int, boundary: bool = False, speech: bool = True) -> bool:
+        """Record a new audio chunk.
+
+        Args:
+            num_samples: Samples in the chunk
+            boundary: The chunk crossed a VAD boundary (decode right away)
+            speech: The chunk holds speech; a silent chunk is skipped unless
+                earlier chunks are already waiting for a decode
+
+        Returns:
+            True if a decode should be started now (due and none in flight)
+        """
+        if not (speech or boundary or self._new_chunks):
+            self.stats.chunks += 1
+            self.stats.skipped_chunks += 1
+            return False
+
+        self._new_samples += num_samples
+        self._new_chunks += 1
+        self._boundary = self._boundary or boundary
+        self.stats.chunks += 1
+        self.stats.max_backlog_chunks = max(self.stats.max_backlog_chunks, self._new_chunks)
+        return self.is_due and not self.in_flight
+
+    def begin(self) -> int:
+        """Start a decode covering everything received so far.
+
+        Returns:
+            Number of chunks merged into this decode
+        """
+        merged = self._new_chunks
+        self.stats.decodes += 1
+        self.stats.merged_chunks += max(0, merged - 1)
+        self._new_samples = 0
+        self._new_chunks = 0
+        self._boundary = False
+        self.in_flight = True
+        return merged
+
+    def finish(self) -> bool:
+        """Mark the in-flight decode done.
+
+        Returns:
+            True if chunks that arrived meanwhile already make another decode due
+        """
+        self.in_flight = False
+        return self.is_due
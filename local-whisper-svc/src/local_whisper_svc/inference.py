@@ -0,0 +1,189 @@
+"""Bounded inference executor for Whisper decodes.
+
+faster-whisper (CTranslate2) releases the GIL while decoding, so running
+transcribe() on a worker thread keeps the asyncio event loop free for socket
+I/O, VAD and protocol handling while decodes are in flight.
+
+The pool is sized to the CTranslate2 `num_workers` of the loaded model, and
+the number of decodes waiting for a worker is bounded so overload shows up as
+a rejected submission instead of an ever-growing queue.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Configuration from environment
+INFERENCE_QUEUE_SIZE = int(os.getenv("WHISPER_INFERENCE_QUEUE_SIZE", "8"))
+
+T = TypeVar("T")
+
+
+class InferenceQueueFull(RuntimeError):
+    """Raised when a non-blocking submission finds the queue full."""
+
+
+@dataclass
+class InferenceStats:
+    """Counters and timings for the inference executor."""
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    in_flight: int = 0
+    queued: int = 0
+    last_queue_wait_ms: float = 0.0
+    last_run_ms: float = 0.0
+    total_queue_wait_ms: float = 0.0
+    total_run_ms: float = 0.0
+
+    @property
+    def avg_queue_wait_ms(self) -> float:
+        return self.total_queue_wait_ms / self.completed if self.completed else 0.0
+
+    @property
+    def avg_run_ms(self) -> float:
+        return self.total_run_ms / self.completed if self.completed else 0.0
+
+
+class InferenceExecutor:
+    """Thread pool for blocking inference calls with a bounded queue.
+
+    At most `workers` calls run at once; at most `max_queue` more wait for a
+    free worker. Queue-wait and run time are measured for every call.
+    """
+
+    def __init__(self, workers: int = 1, max_queue: int = INFERENCE_QUEUE_SIZE):
+        """
+        Args:
+            workers: Number of concurrent inference threads (match the
+                CTranslate2 num_workers of the model)
+            max_queue: Maximum number of calls waiting for a free worker
+        """
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.stats = InferenceStats()
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="whisper-inference",
+        )
+        self._slots = asyncio.Semaphore(self.workers + self.max_queue)
+        self._released = asyncio.Event()  # replaced each time a slot is released
+        # queued/in_flight are updated from both the loop and the workers
+        self._stats_lock = threading.Lock()
+
+    @property
+    def is_full(self) -> bool:
+        """True if a new submission would have to wait for a slot."""
+        return self._slots.locked()
+
+    async def wait_for_slot(self) -> None:
+        """Wait until a submission would get a slot without waiting.
+
+        Nothing is reserved: a blocking run() may still take the slot first.
+        """
+        while self.is_full:
+            await self._released.wait()
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        block: bool = True,
+        **kwargs: Any,
+    ) -> T:
+        """Run a blocking call on the inference pool.
+
+        Args:
+            fn: Blocking callable (e.g. WhisperEngine.transcribe)
+            block: Wait for a queue slot if full; otherwise raise
+                InferenceQueueFull immediately
+
+        Returns:
+            The callable's return value
+        """
+        if not block and self._slots.locked():
+            self.stats.rejected += 1
+            raise InferenceQueueFull(
+                f"Inference queue full ({self.workers} running, {self.max_queue} queued)"
+            )
+
+        await self._slots.acquire()
+        self.stats.submitted += 1
+        with self._stats_lock:
+            self.stats.queued += 1
+        enqueued_at = time.perf_counter()
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._pool.submit(self._timed_call, fn, enqueued_at, args, kwargs)
+        except Exception:
+            with self._stats_lock:
+                self.stats.queued -= 1
+            self._release_slot()
+            raise
+        # The slot is held until the call is done, even if the caller is
+        # cancelled first: a running worker thread can't be interrupted, so
+        # releasing early would let more calls run than there are workers
+        future.add_done_callback(functools.partial(self._call_done, loop))
+
+        try:
+            result, queue_wait_ms, run_ms = await asyncio.wrap_future(future)
+        except Exception:
+            self.stats.failed += 1
+            raise
+
+        self.stats.completed += 1
+        self.stats.last_queue_wait_ms = queue_wait_ms
+        self.stats.last_run_ms = run_ms
+        self.stats.total_queue_wait_ms += queue_wait_ms
+        self.stats.total_run_ms += run_ms
+        return result
+
+    def _call_done(self, loop: asyncio.AbstractEventLoop, future: Future) -> None:
+        """Release a call's slot once it finished or was cancelled before starting."""
+        if future.cancelled():
+            with self._stats_lock:
+                self.stats.queued -= 1
+        loop.call_soon_threadsafe(self._release_slot)
+
+    def _release_slot(self) -> None:
+        self._slots.release()
+        released, self._released = self._released, asyncio.Event()
+        released.set()
+
+    def _timed_call(
+        self,
+        fn: Callable[..., T],
+        enqueued_at: float,
+        args: tuple,
+        kwargs: dict,
+    ) -> tuple[T, float, float]:
+        """Worker-thread wrapper that measures queue wait and run time."""
+        started_at = time.perf_counter()
+        with self._stats_lock:
+            self.stats.queued -= 1
+            self.stats.in_flight += 1
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            with self._stats_lock:
+                self.stats.in_flight -= 1
+        finished_at = time.perf_counter()
+        return (
+            result,
+            (started_at - enqueued_at) * 1000,
+            (finished_at - started_at) * 1000,
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the worker threads."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -9,10 +9,18 @@ Algorithm:
 2. Find the longest common prefix (LCP) across the last N entries
 3. Commit the LCP when it has min_new_chars more than the previous commit
 4. Force commit on silence (VAD end-of-speech)
+
+WordAgreement applies the same policy to words instead of characters. It
+skips the committed part of each hypothesis by word timestamp and only
+compares what follows, so an update costs time proportional to the
+uncommitted words rather than to the whole transcript.
 """
 
 import logging
 import os
+import string
+from bisect import bisect_left
+from collections import deque
 from dataclasses import dataclass, field
 
 logger = logging.getLogger(__name__)
@@ -24,6 +32,7 @@ class AgreementResult:
     text: str
     is_final: bool
     committed_prefix: str = ""
+    end_time: float | None = None  # end of the last committed word (WordAgreement)
 
 
 class LocalAgreement:
@@ -47,11 +56,18 @@ class LocalAgreement:
         self.history: list[str] = []
         self.committed_prefix: str = ""
 
-    def process(self, text: str) -> AgreementResult:
+    def process(
+        self,
+        text: str,
+        words: list | None = None,
+        offset: float = 0.0,
+    ) -> AgreementResult:
         """Process a new transcription and determine if it should be committed.
 
         Args:
             text: The latest transcription text
+            words: Unused; accepted so WordAgreement can be swapped in
+            offset: Unused; accepted so WordAgreement can be swapped in
 
         Returns:
             AgreementResult with text, is_final flag, and committed_prefix
@@ -152,3 +168,202 @@ class LocalAgreement:
             return text
 
         return text[:last_space + 1].rstrip()
+
+
+# Stripped before comparing words, since Whisper often changes punctuation
+# and case of a word between decodes without changing the word
+_PUNCTUATION = string.punctuation + "«»¿¡…“”‘’"
+
+
+class WordAgreement:
+    """LocalAgreement over words, anchored by word timestamps.
+
+    Each hypothesis is reduced to its uncommitted suffix: the words whose
+    midpoint lies after the end of the last committed word (found by
+    bisection), or past the committed word count when there are no
+    timings. Only these suffixes are kept and compared, so neither the
+    history nor the per-update cost grows with the session.
+
+    Results carry the newly committed text only; the caller accumulates
+    commits (as WhisperServer does per unit).
+    """
+
+    def __init__(
+        self,
+        k: int = 3,
+        n: int = 2,
+        min_new_chars: int = 10,
+    ):
+        """
+        Args:
+            k: History window size (keep last K transcriptions)
+            n: Required stable iterations (check last N for agreement)
+            min_new_chars: Minimum new characters before considering commit
+        """
+        self.k = k
+        self.n = n
+        self.min_new_chars = min_new_chars
+        # Uncommitted suffix of each hypothesis as (key, word, end) tuples
+        self.history: deque[list[tuple]] = deque(maxlen=k)
+        self.committed_words = 0
+        self.committed_end: float | None = None
+
+    def process(
+        self,
+        text: str,
+        words: list | None = None,
+        offset: float = 0.0,
+    ) -> AgreementResult:
+        """Process a new transcription and determine if it should be committed.
+
+        Args:
+            text: The latest transcription text
+            words: WordInfo list of the transcription (None or empty = split text)
+            offset: Start of the decoded window (seconds), so word times from
+                different windows of the same stream line up
+
+        Returns:
+            AgreementResult with the uncommitted text, or the newly committed
+            text when is_final is set
+        """
+        suffix = self._uncommitted(text, words, offset)
+        self.history.append(suffix)
+
+        if DEBUG_AGREEMENT:
+            logger.info(f"[WordAgreement] Uncommitted ({len(suffix)} words): {self._text(suffix)[:80]}")
+
+        if len(self.history) < self.n:
+            return AgreementResult(text=self._text(suffix), is_final=False)
+
+        recent = [self.history[-i] for i in range(self.n, 0, -1)]
+        agreed = self._agreed_length(recent)
+        committed = self._text(suffix[:agreed])
+
+        if agreed and len(committed) > self.min_new_chars:
+            self.committed_words += agreed
+            if suffix[agreed - 1][2] is not None:
+                self.committed_end = suffix[agreed - 1][2]
+            # The last N hypotheses share the agreed words; the older ones
+            # can no longer take part in an agreement
+            self.history = deque((h[agreed:] for h in recent), maxlen=self.k)
+            if DEBUG_AGREEMENT:
+                logger.info(f"[WordAgreement] COMMIT: {committed[:60]}...")
+            return AgreementResult(
+                text=committed,
+                is_final=True,
+                committed_prefix=committed,
+                end_time=self.committed_end,
+            )
+
+        return AgreementResult(text=self._text(suffix), is_final=False)
+
+    def force_commit(self) -> AgreementResult | None:
+        """Force commit on silence/end-of-speech.
+
+        Returns:
+            AgreementResult with the uncommitted text of the latest
+            transcription, None if there is none
+        """
+        if not self.history or not self.history[-1]:
+            return None
+
+        suffix = self.history[-1]
+        self.committed_words += len(suffix)
+        if suffix[-1][2] is not None:
+            self.committed_end = suffix[-1][2]
+        self.history.clear()
+
+        text = self._text(suffix)
+        return AgreementResult(
+            text=text,
+            is_final=True,
+            committed_prefix=text,
+            end_time=self.committed_end,
+        )
+
+    def reset(self) -> None:
+        """Reset state for a new utterance."""
+        self.history.clear()
+        self.committed_words = 0
+        self.committed_end = None
+
+    def _uncommitted(self, text: str, words: list | None, offset: float) -> list[tuple]:
+        """Tokenize the part of a hypothesis after the committed words."""
+        if not words:
+            return [
+                (self._key(token), " " + token, None)
+                for token in text.split()[self.committed_words:]
+            ]
+
+        start = 0
+        if self.committed_end is not None:
+            start = bisect_left(
+                words, self.committed_end,
+                key=lambda w: offset + (w.start + w.end) / 2,
+            )
+        return [
+            (self._key(w.word), w.word, offset + w.end)
+            for w in words[start:]
+        ]
+
+    @staticmethod
+    def _agreed_length(hypotheses: list[list[tuple]]) -> int:
+        """Number of leading words all hypotheses agree on."""
+        first = hypotheses[0]
+        length = min(len(h) for h in hypotheses)
+        for i in range(length):
+            key = first[i][0]
+            for h in hypotheses[1:]:
+                if h[i][0] != key:
+                    return i
+        return length
+
+    @staticmethod
+    def _key(word: str) -> str:
+        return word.strip().strip(_PUNCTUATION).lower()
+
+    @staticmethod
+    def _text(tokens: list[tuple]) -> str:
+        return "".join(t[1] for t in tokens).strip()
+
+
+def committed_word_count(words: list, committed_text: str) -> int | None:
+    """Count the words of a decode that committed text covers.
+
+    Words are matched by non-whitespace characters rather than by splitting
+    on spaces, so punctuation and languages written without spaces map the
+    same way.
+
+    Args:
+        words: WordInfo list of the decode the commit came from
+        committed_text: Text committed from that decode (a prefix of it)
+
+    Returns:
+        Number of leading words that make up the committed text, or None if
+        the words don't cover it
+    """
+    target = sum(1 for c in committed_text if not c.isspace())
+    if target == 0:
+        return None
+
+    covered = 0
+    for i, word in enumerate(words):
+        covered += sum(1 for c in word.word if not c.isspace())
+        if covered >= target:
+            return i + 1
+    return None
+
+
+def committed_end_time(words: list, committed_text: str) -> float | None:
+    """Find where committed text ends in a decode's word timings.
+
+    Args:
+        words: WordInfo list of the decode the commit came from
+        committed_text: Text committed from that decode (a prefix of it)
+
+    Returns:
+        End time (seconds, relative to the decode window) of the last
+        committed word, or None if the words don't cover the text
+    """
+    count = committed_word_count(words, committed_text)
+    return words[count - 1].end if count else None
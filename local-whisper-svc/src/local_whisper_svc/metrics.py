@@ -0,0 +1,214 @@
+"""Optional Prometheus metrics for the Whisper STT service.
+
+Exposes decode, VAD, parsing and write timings plus session gauges on a
+separate HTTP listener (WHISPER_METRICS_PORT), so latency spikes can be
+attributed to decode time, VAD, queueing or I/O. Every series is labelled
+with the model name and device.
+
+prometheus_client is optional: without it (or without a port configured)
+ServiceMetrics is a no-op and the service runs unchanged.
+"""
+
+import logging
+import os
+from typing import Callable
+
+try:
+    from prometheus_client import (
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        start_http_server,
+    )
+except ImportError:  # pragma: no cover - optional dependency
+    CollectorRegistry = None
+
+logger = logging.getLogger(__name__)
+
+# Configuration from environment
+METRICS_PORT = int(os.getenv("WHISPER_METRICS_PORT", "0"))  # 0 = disabled
+METRICS_HOST = os.getenv("WHISPER_METRICS_HOST", "0.0.0.0")
+
+PREFIX = "whisper_svc_"
+LABELS = ["model", "device"]
+
+
+class ServiceMetrics:
+    """Prometheus metrics for one WhisperServer."""
+
+    def __init__(self, model: str, device: str, enabled: bool = True):
+        """
+        Args:
+            model: Whisper model name (label)
+            device: Inference device (label)
+            enabled: Set False to turn every call into a no-op
+        """
+        self.enabled = enabled and CollectorRegistry is not None
+        self.model = model
+        self.device = device
+        if not self.enabled:
+            return
+
+        self.registry = CollectorRegistry()
+        labels = dict(model=model, device=device)
+
+        def histogram(name, doc, buckets, extra_labels=()):
+            metric = Histogram(
+                PREFIX + name, doc, LABELS + list(extra_labels),
+                buckets=buckets, registry=self.registry,
+            )
+            return metric if extra_labels else metric.labels(**labels)
+
+        def counter(name, doc):
+            return Counter(PREFIX + name, doc, LABELS, registry=self.registry).labels(**labels)
+
+        self.decode_latency = histogram(
+            "decode_latency_seconds",
+            "Decode latency per window, including scheduling and queueing.",
+            [0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10],
+        )
+        self.decode_rtf = histogram(
+            "decode_rtf",
+            "Decode latency divided by window duration.",
+            [0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2],
+        )
+        self.decode_window = histogram(
+            "decode_window_seconds",
+            "Duration of the decoded audio window.",
+            [1, 2, 5, 10, 15, 20, 30],
+        )
+        self.vad_time = histogram(
+            "vad_seconds",
+            "VAD processing time per audio chunk.",
+            [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05],
+        )
+        self.parse_time = histogram(
+            "parse_seconds",
+            "Parsing time per command, by stage (json, base64).",
+            [0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01],
+            extra_labels=["stage"],
+        )
+        self.write_time = histogram(
+            "write_seconds",
+            "Time to write and drain one response.",
+            [0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1],
+        )
+
+        self.partials = counter("partials_total", "PARTIAL responses sent.")
+        self.finals = counter("finals_total", "FINAL responses sent.")
+        self.forced_commits = counter(
+            "forced_commits_total", "FINALs forced by end of speech or STOP."
+        )
+        self.busy = counter("busy_total", "START commands refused at session capacity.")
+        self.dropped_chunks = counter(
+            "dropped_chunks_total", "Audio chunks shed by flow control."
+        )
+        self.coalesced_partials = counter(
+            "coalesced_partials_total", "Queued PARTIALs replaced by a newer one before being written."
+        )
+
+        self.active_sessions = Gauge(
+            PREFIX + "active_sessions", "Active STT sessions.", LABELS, registry=self.registry
+        ).labels(**labels)
+        self.inflight_decodes = Gauge(
+            PREFIX + "inflight_decodes", "Decodes running or queued on the inference pool.",
+            LABELS, registry=self.registry,
+        ).labels(**labels)
+        self.outbound_queued = Gauge(
+            PREFIX + "outbound_queued", "Responses queued for writing across connections.",
+            LABELS, registry=self.registry,
+        ).labels(**labels)
+        self.buffer_bytes = Gauge(
+            PREFIX + "audio_buffer_bytes", "Audio ring memory allocated across sessions.",
+            LABELS, registry=self.registry,
+        ).labels(**labels)
+        self._buffered = Gauge(
+            PREFIX + "buffered_seconds", "Audio buffered per session.",
+            LABELS + ["session"], registry=self.registry,
+        )
+
+    def start_http_server(self, port: int = METRICS_PORT, host: str = METRICS_HOST) -> bool:
+        """Start the metrics HTTP listener.
+
+        Returns:
+            True if the listener was started
+        """
+        if not self.enabled or port <= 0:
+            return False
+        start_http_server(port, addr=host, registry=self.registry)
+        logger.info(f"Metrics listening on http://{host}:{port}/metrics")
+        return True
+
+    def observe_decode(self, latency_s: float, window_s: float) -> None:
+        if not self.enabled:
+            return
+        self.decode_latency.observe(latency_s)
+        self.decode_window.observe(window_s)
+        if window_s > 0:
+            self.decode_rtf.observe(latency_s / window_s)
+
+    def observe_vad(self, seconds: float) -> None:
+        if self.enabled:
+            self.vad_time.observe(seconds)
+
+    def observe_parse(self, stage: str, seconds: float) -> None:
+        if self.enabled:
+            self.parse_time.labels(self.model, self.device, stage).observe(seconds)
+
+    def observe_write(self, seconds: float) -> None:
+        if self.enabled:
+            self.write_time.observe(seconds)
+
+    def count_response(self, kind: str, forced: bool = False) -> None:
+        """Count a PARTIAL or FINAL response."""
+        if not self.enabled:
+            return
+        if kind == "PARTIAL":
+            self.partials.inc()
+        elif kind == "FINAL":
+            self.finals.inc()
+            if forced:
+                self.forced_commits.inc()
+
+    def count_busy(self) -> None:
+        if self.enabled:
+            self.busy.inc()
+
+    def count_dropped_chunk(self) -> None:
+        if self.enabled:
+            self.dropped_chunks.inc()
+
+    def count_coalesced_partial(self) -> None:
+        if self.enabled:
+            self.coalesced_partials.inc()
+
+    def track_sessions(
+        self,
+        active: Callable[[], float],
+        inflight_decodes: Callable[[], float],
+        outbound_queued: Callable[[], float] | None = None,
+        buffer_bytes: Callable[[], float] | None = None,
+    ) -> None:
+        """Read the session, in-flight decode, outbound queue and buffer memory gauges at scrape time."""
+        if not self.enabled:
+            return
+        self.active_sessions.set_function(active)
+        self.inflight_decodes.set_function(inflight_decodes)
+        if outbound_queued is not None:
+            self.outbound_queued.set_function(outbound_queued)
+        if buffer_bytes is not None:
+            self.buffer_bytes.set_function(buffer_bytes)
+
+    def set_buffered(self, session_id: str, seconds: float) -> None:
+        if self.enabled:
+            self._buffered.labels(self.model, self.device, session_id).set(seconds)
+
+    def remove_session(self, session_id: str) -> None:
+        """Drop a stopped session's per-session series."""
+        if not self.enabled:
+            return
+        try:
+            self._buffered.remove(self.model, self.device, session_id)
+        except KeyError:
+            pass
@@ -0,0 +1,121 @@
+"""Per-connection outbound queue with latest-partial-wins coalescing.
+
+Each connection gets a reader task (commands, audio) and a writer task that
+drains this queue to the socket, so a slow client only delays its own
+responses and never ingest or decoding: producers append and return
+immediately.
+
+PARTIALs supersede each other: a PARTIAL for a session replaces that
+session's queued PARTIAL if it hasn't been written yet, so a congested
+link sends the newest hypothesis instead of a backlog of stale ones. All
+other responses (FINAL, ERROR, READY, BUSY, FLOW) are always sent, in order,
+and a session's PARTIAL never overtakes one of its own earlier responses.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+WRITER_CLOSE_TIMEOUT_S = 2.0  # Flushing queued responses after the client disconnects
+
+class OutboundQueue:
+    """Responses waiting to be written to one client connection."""
+
+    def __init__(self, on_coalesce: Callable[[], None] | None = None):
+        """
+        Args:
+            on_coalesce: Called each time a queued PARTIAL is replaced
+        """
+        self.on_coalesce = on_coalesce
+        # Entries are [line, session_id]; a queued PARTIAL's line is replaced
+        # in place so it keeps its position
+        self._entries: deque[list] = deque()
+        self._partials: dict[str, list] = {}
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.coalesced = 0  # PARTIALs replaced before being written
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def put(self, line: str, kind: str, session_id: str) -> None:
+        """Queue a response without waiting for the socket.
+
+        Args:
+            line: Serialized response
+            kind: Response type ("PARTIAL", "FINAL", ...), from the producer
+                so the line never has to be parsed here
+            session_id: Session the response belongs to
+        """
+        if self._closed:
+            return
+
+        if kind == "PARTIAL":
+            entry = self._partials.get(session_id)
+            if entry is not None:
+                entry[0] = line
+                self.coalesced += 1
+                if self.on_coalesce:
+                    self.on_coalesce()
+                return
+            entry = [line, session_id]
+            self._partials[session_id] = entry
+        else:
+            # A later PARTIAL of this session must not overtake this response
+            # by replacing one queued before it; other sessions' responses
+            # don't depend on it, so their PARTIALs keep coalescing
+            self._partials.pop(session_id, None)
+            entry = [line, None]
+
+        self._entries.append(entry)
+        self._ready.set()
+
+    async def get(self) -> str | None:
+        """Next response to write, or None once closed and empty."""
+        while not self._entries:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+        entry = self._entries.popleft()
+        if entry[1] is not None and self._partials.get(entry[1]) is entry:
+            del self._partials[entry[1]]
+        return entry[0]
+
+    def close(self) -> None:
+        """Stop accepting responses; the writer exits once the queue is empty."""
+        self._closed = True
+        self._ready.set()
+
+
+async def write_loop(
+    queue: OutboundQueue,
+    writer: asyncio.StreamWriter,
+    observe_write: Callable[[float], None] | None = None,
+) -> None:
+    """Write queued responses to a connection until the queue is closed.
+
+    Args:
+        queue: Responses for this connection
+        writer: Connection to write to
+        observe_write: Called with the time to write and drain each response
+    """
+    try:
+        while True:
+            line = await queue.get()
+            if line is None or writer.is_closing():
+                break
+            started = time.perf_counter()
+            writer.write((line + "\n").encode("utf-8"))
+            await writer.drain()
+            if observe_write:
+                observe_write(time.perf_counter() - started)
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        queue.close()
@@ -1,22 +1,54 @@
 """Message protocol definitions for Unix socket communication.
 
-Protocol: JSON-lines (newline-delimited JSON)
+Protocol: JSON-lines (newline-delimited JSON), plus optional binary audio frames
 
 Commands (client → server):
-  START  { "cmd": "START", "session_id": "...", "source_lang": "en-US", "auto_detect_langs": [...], "phrase_hints": [...] }
-  AUDIO  { "cmd": "AUDIO", "session_id": "...", "pcm_b64": "..." }  # base64-encoded PCM
+  START  { "cmd": "START", "session_id": "...", "source_lang": "en-US", "auto_detect_langs": [...], "phrase_hints": [...], "binary_audio": false, "timing": false }
+  AUDIO  { "cmd": "AUDIO", "session_id": "...", "pcm_b64": "...", "seq": 12 }  # base64-encoded PCM, optional seq
   STOP   { "cmd": "STOP", "session_id": "..." }
 
 Responses (server → client):
   PARTIAL { "type": "PARTIAL", "session_id": "...", "text": "...", "language": "en", "confidence": 0.95 }
-  FINAL   { "type": "FINAL", "session_id": "...", "text": "...", "language": "en", "words": [...], "committed_prefix": "..." }
+  FINAL   { "type": "FINAL", "session_id": "...", "text": "...", "language": "en", "words": [...], "committed_prefix": "...", "commit_seq": 3 }
+
+FINAL text is the committed text of the current unit so far; words only
+cover the span this FINAL commits, timed in seconds of session stream time
+(all audio received since START, including audio discarded under FLOW
+"drop"), and commit_seq numbers a session's FINALs 1, 2, 3, ...
+With "timing": true in START, PARTIAL and FINAL also carry a "timing"
+object (see ResponseTiming) breaking down where the server spent its time.
   ERROR   { "type": "ERROR", "session_id": "...", "error": "..." }
-  READY   { "type": "READY", "session_id": "..." }
+  READY   { "type": "READY", "session_id": "...", "audio_channel": 7 }  # audio_channel only if binary_audio
+  BUSY    { "type": "BUSY", "session_id": "...", "reason": "...", "active_sessions": 8, "max_sessions": 8 }  # START refused
+  FLOW    { "type": "FLOW", "session_id": "...", "state": "throttle", "backlog_ms": 3200, "buffered_ms": 4100 }
+
+A connection may carry many sessions: commands of one session are handled
+in order, different sessions concurrently, so responses of different
+sessions interleave and must be routed by session_id.
+
+Flow control: the server sends FLOW when a session's decode backlog (audio
+received but not yet decoded) crosses its budget. "throttle" asks the client
+to slow down, "drop" means the server is discarding that session's audio
+until backlog recovers, and "ok" means normal operation resumed.
+
+Binary audio frames (client → server), negotiated with "binary_audio": true in START:
+  A frame starts with the byte 0x00 (a JSON line never does), followed by a
+  little-endian header and raw PCM (16kHz, 16-bit signed LE, mono):
+    u8  magic         0x00
+    u32 audio_channel from READY
+    u32 seq           per-session frame counter
+    u32 num_samples   PCM samples that follow (2 bytes each)
+  Frames and JSON lines may be interleaved on the same connection.
 """
 
 from dataclasses import dataclass, field, asdict
-from typing import Literal
+from typing import ClassVar, Literal
 import json
+import struct
+
+AUDIO_FRAME_MAGIC = 0x00
+AUDIO_FRAME_HEADER = struct.Struct("<BIII")  # magic, audio_channel, seq, num_samples
+MAX_FRAME_SAMPLES = 16000 * 30  # 30 s per frame
 
 
 @dataclass
@@ -37,6 +69,8 @@ class StartCommand:
     auto_detect_langs: list[str] = field(default_factory=list)
     phrase_hints: list[str] = field(default_factory=list)
     initial_prompt: str = ""
+    binary_audio: bool = False
+    timing: bool = False  # add a ResponseTiming to PARTIAL/FINAL
 
     def to_json(self) -> str:
         return json.dumps({
@@ -46,6 +80,8 @@ class StartCommand:
             "auto_detect_langs": self.auto_detect_langs,
             "phrase_hints": self.phrase_hints,
             "initial_prompt": self.initial_prompt,
+            "binary_audio": self.binary_audio,
+            "timing": self.timing,
         })
 
 
@@ -53,13 +89,50 @@ class StartCommand:
 class AudioCommand:
     session_id: str
     pcm_b64: str  # base64-encoded PCM audio (16kHz, 16-bit, mono)
+    seq: int | None = None  # per-session chunk counter, echoed in timings
 
     def to_json(self) -> str:
-        return json.dumps({
+        data = {
             "cmd": "AUDIO",
             "session_id": self.session_id,
             "pcm_b64": self.pcm_b64,
-        })
+        }
+        if self.seq is not None:
+            data["seq"] = self.seq
+        return json.dumps(data)
+
+
+@dataclass
+class AudioFrame:
+    """Binary audio frame: raw PCM addressed by audio channel."""
+    audio_channel: int
+    seq: int
+    pcm: bytes  # raw PCM audio (16kHz, 16-bit, mono)
+
+    def to_bytes(self) -> bytes:
+        return AUDIO_FRAME_HEADER.pack(
+            AUDIO_FRAME_MAGIC,
+            self.audio_channel,
+            self.seq,
+            len(self.pcm) // 2,
+        ) + self.pcm
+
+
+def parse_audio_frame_header(header: bytes) -> tuple[int, int, int]:
+    """Parse a binary frame header.
+
+    Returns:
+        (audio_channel, seq, num_samples)
+
+    Raises:
+        ValueError: On a bad magic byte or an oversized frame
+    """
+    magic, audio_channel, seq, num_samples = AUDIO_FRAME_HEADER.unpack(header)
+    if magic != AUDIO_FRAME_MAGIC:
+        raise ValueError(f"Bad audio frame magic: {magic:#x}")
+    if num_samples > MAX_FRAME_SAMPLES:
+        raise ValueError(f"Audio frame too large: {num_samples} samples")
+    return audio_channel, seq, num_samples
 
 
 @dataclass
@@ -73,52 +146,88 @@ class StopCommand:
         })
 
 
+@dataclass
+class ResponseTiming:
+    """Server-side latency breakdown of a PARTIAL or FINAL.
+
+    Times are server wall-clock milliseconds since the epoch; the decode
+    fields are None when the response needed no decode (e.g. a STOP with
+    nothing left to decode).
+    """
+    chunk_seq: int  # newest audio chunk in the decoded window
+    chunk_recv_ms: int  # when the server received that chunk
+    window_s: float  # audio decoded, after silence squeezing
+    stream_end_s: float  # stream time of the newest sample in the window
+    queued_ms: int | None = None  # waited for a batch and a free engine
+    decode_start_ms: int | None = None
+    decode_end_ms: int | None = None  # interim PARTIALs: when their segment was ready
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
 @dataclass
 class PartialResponse:
+    type: ClassVar[str] = "PARTIAL"
+
     session_id: str
     text: str
     language: str
     confidence: float = 1.0
+    timing: ResponseTiming | None = None
 
     def to_json(self) -> str:
-        return json.dumps({
-            "type": "PARTIAL",
+        data = {
+            "type": self.type,
             "session_id": self.session_id,
             "text": self.text,
             "language": self.language,
             "confidence": self.confidence,
-        })
+        }
+        if self.timing is not None:
+            data["timing"] = self.timing.to_dict()
+        return json.dumps(data)
 
 
 @dataclass
 class FinalResponse:
+    type: ClassVar[str] = "FINAL"
+
     session_id: str
     text: str
     language: str
     words: list[WordInfo] = field(default_factory=list)
     committed_prefix: str = ""
     tts_final: bool = False
+    commit_seq: int = 0
+    timing: ResponseTiming | None = None
 
     def to_json(self) -> str:
-        return json.dumps({
-            "type": "FINAL",
+        data = {
+            "type": self.type,
             "session_id": self.session_id,
             "text": self.text,
             "language": self.language,
             "words": [w.to_dict() for w in self.words],
             "committed_prefix": self.committed_prefix,
             "tts_final": self.tts_final,
-        })
+            "commit_seq": self.commit_seq,
+        }
+        if self.timing is not None:
+            data["timing"] = self.timing.to_dict()
+        return json.dumps(data)
 
 
 @dataclass
 class ErrorResponse:
+    type: ClassVar[str] = "ERROR"
+
     session_id: str
     error: str
 
     def to_json(self) -> str:
         return json.dumps({
-            "type": "ERROR",
+            "type": self.type,
             "session_id": self.session_id,
             "error": self.error,
         })
@@ -126,16 +235,70 @@ class ErrorResponse:
 
 @dataclass
 class ReadyResponse:
+    type: ClassVar[str] = "READY"
+
+    session_id: str
+    audio_channel: int | None = None  # set when binary audio was negotiated
+
+    def to_json(self) -> str:
+        data = {
+            "type": self.type,
+            "session_id": self.session_id,
+        }
+        if self.audio_channel is not None:
+            data["audio_channel"] = self.audio_channel
+        return json.dumps(data)
+
+
+# FLOW states
+FLOW_OK = "ok"
+FLOW_THROTTLE = "throttle"
+FLOW_DROP = "drop"
+
+
+@dataclass
+class BusyResponse:
+    type: ClassVar[str] = "BUSY"
+
     session_id: str
+    reason: str
+    active_sessions: int
+    max_sessions: int
 
     def to_json(self) -> str:
         return json.dumps({
-            "type": "READY",
+            "type": self.type,
             "session_id": self.session_id,
+            "reason": self.reason,
+            "active_sessions": self.active_sessions,
+            "max_sessions": self.max_sessions,
         })
 
 
-def parse_command(line: str) -> StartCommand | AudioCommand | StopCommand | None:
+@dataclass
+class FlowResponse:
+    type: ClassVar[str] = "FLOW"
+
+    session_id: str
+    state: str  # FLOW_OK, FLOW_THROTTLE or FLOW_DROP
+    backlog_ms: int
+    buffered_ms: int
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "type": self.type,
+            "session_id": self.session_id,
+            "state": self.state,
+            "backlog_ms": self.backlog_ms,
+            "buffered_ms": self.buffered_ms,
+        })
+
+
+Command = StartCommand | AudioCommand | StopCommand
+Response = PartialResponse | FinalResponse | ErrorResponse | ReadyResponse | BusyResponse | FlowResponse
+
+
+def parse_command(line: str) -> Command | None:
     """Parse a JSON-line command from the client."""
     try:
         data = json.loads(line)
@@ -148,11 +311,14 @@ def parse_command(line: str) -> StartCommand | AudioCommand | StopCommand | None
                 auto_detect_langs=data.get("auto_detect_langs", []),
                 phrase_hints=data.get("phrase_hints", []),
                 initial_prompt=data.get("initial_prompt", ""),
+                binary_audio=bool(data.get("binary_audio", False)),
+                timing=bool(data.get("timing", False)),
             )
         elif cmd == "AUDIO":
             return AudioCommand(
                 session_id=data["session_id"],
                 pcm_b64=data["pcm_b64"],
+                seq=data["seq"] if isinstance(data.get("seq"), int) else None,
             )
         elif cmd == "STOP":
             return StopCommand(session_id=data["session_id"])
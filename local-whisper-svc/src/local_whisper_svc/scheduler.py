@@ -0,0 +1,297 @@
+"""Cross-session batched decode scheduler.
+
+Instead of every session running its own small decode, sessions submit their
+pending decode windows to the scheduler. On each tick the scheduler collects
+every window submitted since the last tick, groups them into buckets by
+language, decode profile and window length, and runs each bucket as one batched inference
+on the inference executor. Results are routed back to the submitting session
+through a per-request future.
+
+Whisper pads every window to 30 s before the encoder, so batching windows of
+different sessions costs no extra encoder work; length buckets keep short
+windows from waiting on the decoder steps of long ones.
+
+A window that ends up alone in its batch is decoded segment by segment, and
+its submitter can be handed the text of each segment as it is decoded; a
+batched decode produces all its windows at once.
+
+A submitter can pass a DecodeTiming to learn when its window was submitted
+and when the engine call that decoded it started and finished.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import numpy as np
+
+from .inference import InferenceExecutor, InferenceQueueFull
+from .whisper_engine import COMMIT_PROFILE, DecodeProfile, WhisperEngine, TranscriptionResult
+
+logger = logging.getLogger(__name__)
+
+# Configuration from environment
+BATCH_WINDOW_MS = int(os.getenv("WHISPER_BATCH_WINDOW_MS", "15"))
+MAX_BATCH_SIZE = int(os.getenv("WHISPER_MAX_BATCH_SIZE", "8"))
+BATCH_BUCKETS_S = os.getenv("WHISPER_BATCH_BUCKETS_S", "5,10,20,30")
+
+
+def epoch_ms() -> int:
+    """Wall-clock time in milliseconds since the epoch."""
+    return int(time.time() * 1000)
+
+
+@dataclass
+class DecodeTiming:
+    """Wall-clock milestones (ms since the epoch) of one window's decode."""
+    submitted_ms: int = 0
+    started_ms: int = 0  # engine call began (after batching and the executor queue)
+    finished_ms: int = 0  # 0 while the decode is still running
+
+    @property
+    def queued_ms(self) -> int:
+        return max(0, self.started_ms - self.submitted_ms) if self.started_ms else 0
+
+
+@dataclass
+class DecodeRequest:
+    """A decode window submitted by one session."""
+    session_id: str
+    audio: np.ndarray
+    language: str | None
+    initial_prompt: str | None
+    future: asyncio.Future
+    on_segment: Callable[[TranscriptionResult], Awaitable[None]] | None = None
+    profile: DecodeProfile = COMMIT_PROFILE
+    timing: DecodeTiming | None = None
+    submitted_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def duration_seconds(self) -> float:
+        return len(self.audio) / 16000
+
+
+@dataclass
+class SchedulerStats:
+    """Counters for the decode scheduler."""
+    requests: int = 0
+    batches: int = 0
+    batched_requests: int = 0
+    max_batch_size: int = 0
+
+    @property
+    def avg_batch_size(self) -> float:
+        return self.batched_requests / self.batches if self.batches else 0.0
+
+
+class DecodeScheduler:
+    """Collects decode windows from all sessions and runs them in batches."""
+
+    def __init__(
+        self,
+        engine: WhisperEngine,
+        inference: InferenceExecutor,
+        batch_window_ms: int = BATCH_WINDOW_MS,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        buckets_s: str = BATCH_BUCKETS_S,
+    ):
+        """
+        Args:
+            engine: Loaded Whisper engine
+            inference: Executor the batched decodes run on
+            batch_window_ms: How long a tick waits to collect more windows
+            max_batch_size: Maximum windows per batched decode
+            buckets_s: Comma-separated upper bounds (seconds) of length buckets
+        """
+        self.engine = engine
+        self.inference = inference
+        self.batch_window_s = batch_window_ms / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self.buckets_s = sorted(float(b) for b in buckets_s.split(",") if b.strip())
+        self.stats = SchedulerStats()
+
+        self._pending: list[DecodeRequest] = []
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._batch_tasks: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start the scheduler tick loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the tick loop and fail any windows still waiting."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        for request in self._pending:
+            if not request.future.done():
+                request.future.cancel()
+        self._pending.clear()
+
+    async def decode(
+        self,
+        session_id: str,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        block: bool = True,
+        on_segment: Callable[[TranscriptionResult], Awaitable[None]] | None = None,
+        profile: DecodeProfile = COMMIT_PROFILE,
+        timing: DecodeTiming | None = None,
+    ) -> TranscriptionResult:
+        """Submit a decode window and wait for its result.
+
+        Args:
+            session_id: Submitting session (for logging)
+            audio: Audio samples as float32 numpy array (16kHz, mono)
+            language: Language code or None for auto-detect
+            initial_prompt: Optional prompt to guide transcription
+            block: If False, raise InferenceQueueFull instead of queueing
+                behind a saturated inference executor
+            on_segment: Awaited on the event loop with the result so far after
+                each decoded segment, if the window is decoded on its own
+            profile: Decoding options; windows are only batched with windows
+                of the same profile
+            timing: Filled in with the decode's milestones as they happen
+
+        Returns:
+            TranscriptionResult for this window
+        """
+        if not block and self.inference.is_full:
+            self.inference.stats.rejected += 1
+            raise InferenceQueueFull("Inference queue full")
+
+        if timing is not None:
+            timing.submitted_ms = epoch_ms()
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(DecodeRequest(
+            session_id=session_id,
+            audio=audio,
+            language=language,
+            initial_prompt=initial_prompt,
+            future=future,
+            on_segment=on_segment,
+            profile=profile,
+            timing=timing,
+        ))
+        self.stats.requests += 1
+        self._wakeup.set()
+        return await future
+
+    async def _run(self) -> None:
+        """Tick loop: collect pending windows, then dispatch them as batches."""
+        while True:
+            await self._wakeup.wait()
+
+            # Give other sessions a short window to submit theirs
+            if self.batch_window_s > 0 and len(self._pending) < self.max_batch_size:
+                await asyncio.sleep(self.batch_window_s)
+
+            self._wakeup.clear()
+            pending, self._pending = self._pending, []
+
+            for batch in self._make_batches(pending):
+                task = asyncio.create_task(self._run_batch(batch))
+                self._batch_tasks.add(task)
+                task.add_done_callback(self._batch_tasks.discard)
+
+    def _make_batches(self, requests: list[DecodeRequest]) -> list[list[DecodeRequest]]:
+        """Group requests by (language, profile, length bucket), split by max batch size."""
+        buckets: dict[tuple[str | None, str, int], list[DecodeRequest]] = {}
+        for request in requests:
+            if request.future.done():
+                continue
+            key = (
+                request.language,
+                request.profile.name,
+                self._bucket_index(request.duration_seconds),
+            )
+            buckets.setdefault(key, []).append(request)
+
+        batches = []
+        for bucket in buckets.values():
+            for i in range(0, len(bucket), self.max_batch_size):
+                batches.append(bucket[i:i + self.max_batch_size])
+        return batches
+
+    def _bucket_index(self, duration_seconds: float) -> int:
+        for i, upper in enumerate(self.buckets_s):
+            if duration_seconds <= upper:
+                return i
+        return len(self.buckets_s)
+
+    async def _run_batch(self, batch: list[DecodeRequest]) -> None:
+        """Run one batched decode and route results back to each session."""
+        self.stats.batches += 1
+        self.stats.batched_requests += len(batch)
+        self.stats.max_batch_size = max(self.stats.max_batch_size, len(batch))
+
+        try:
+            if len(batch) == 1 and batch[0].on_segment is not None:
+                results = [await self._run_streaming(batch[0])]
+            else:
+                results = await self.inference.run(
+                    self._stamped(self.engine.transcribe_batch, batch),
+                    [r.audio for r in batch],
+                    language=batch[0].language,
+                    initial_prompts=[r.initial_prompt for r in batch],
+                    profile=batch[0].profile,
+                )
+        except Exception as e:
+            logger.error(f"Batched decode of {len(batch)} windows failed: {e}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+            return
+
+        for request, result in zip(batch, results):
+            if not request.future.done():
+                request.future.set_result(result)
+
+    async def _run_streaming(self, request: DecodeRequest) -> TranscriptionResult:
+        """Decode one window, passing each segment's result to its submitter."""
+        loop = asyncio.get_running_loop()
+
+        def on_segment(result: TranscriptionResult) -> None:
+            # Called on the inference thread; segments arrive in order and
+            # ahead of the decode's own result
+            asyncio.run_coroutine_threadsafe(request.on_segment(result), loop)
+
+        return await self.inference.run(
+            self._stamped(self.engine.transcribe, [request]),
+            request.audio,
+            language=request.language,
+            initial_prompt=request.initial_prompt,
+            on_segment=on_segment,
+            profile=request.profile,
+        )
+
+    @staticmethod
+    def _stamped(fn: Callable, batch: list[DecodeRequest]) -> Callable:
+        """Wrap an engine call to record when it ran on the batch's timings."""
+        timings = [r.timing for r in batch if r.timing is not None]
+        if not timings:
+            return fn
+
+        def call(*args, **kwargs):
+            started = epoch_ms()
+            for timing in timings:
+                timing.started_ms = started
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                finished = epoch_ms()
+                for timing in timings:
+                    timing.finished_ms = finished
+
+        return call
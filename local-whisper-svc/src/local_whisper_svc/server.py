@@ -18,23 +18,61 @@ import logging
 import os
 import signal
 import sys
-from dataclasses import dataclass, field
+import time
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Awaitable, Callable
 
 import numpy as np
 
-from .whisper_engine import WhisperEngine, pcm_to_float32
-from .vad import SileroVAD
-from .local_agreement import LocalAgreement
+from .whisper_engine import (
+    WhisperEngine,
+    TranscriptionResult,
+    DecodeProfile,
+    COMMIT_PROFILE,
+    PARTIAL_PROFILE,
+    WHISPER_PARTIAL_MODEL,
+    WHISPER_PARTIAL_COMPUTE_TYPE,
+    WHISPER_PARTIAL_DEVICE,
+    WHISPER_PARTIAL_BEAM_SIZE,
+)
+from .audio_buffer import AudioRingBuffer, capacity_for_bytes
+from .inference import InferenceExecutor, InferenceQueueFull
+from .scheduler import DecodeScheduler, DecodeTiming, epoch_ms
+from .decode_trigger import DecodeTrigger
+from .vad import FRAME_SAMPLES, SileroVAD, VADBatcher, VADState, create_vad
+from .speech_spans import SpeechSpans, WindowMap
+from .local_agreement import (
+    LocalAgreement,
+    WordAgreement,
+    committed_end_time,
+    committed_word_count,
+)
+from .metrics import ServiceMetrics
+from .outbound import WRITER_CLOSE_TIMEOUT_S, OutboundQueue, write_loop
+from .session_queues import SessionQueues
+from .workers import WORKER_PROCESSES
 from .protocol import (
+    AUDIO_FRAME_HEADER,
+    AUDIO_FRAME_MAGIC,
+    parse_audio_frame_header,
     parse_command,
+    Command,
     StartCommand,
     AudioCommand,
+    AudioFrame,
     StopCommand,
     PartialResponse,
     FinalResponse,
+    ResponseTiming,
     ErrorResponse,
     ReadyResponse,
+    BusyResponse,
+    FlowResponse,
+    Response,
+    FLOW_OK,
+    FLOW_THROTTLE,
+    FLOW_DROP,
     WordInfo,
 )
 
@@ -48,6 +86,27 @@ logger = logging.getLogger(__name__)
 SOCKET_PATH = os.getenv("WHISPER_SOCKET_PATH", "/tmp/whisper-stt.sock")
 TCP_HOST = os.getenv("WHISPER_TCP_HOST", "0.0.0.0")
 TCP_PORT = os.getenv("WHISPER_TCP_PORT", "")  # Empty = use Unix socket
+STREAM_LIMIT = int(os.getenv("WHISPER_STREAM_LIMIT", str(4 * 1024 * 1024)))  # Max JSON line bytes
+# Audio is buffered during a decode until FLOW drop sheds it, above twice
+# MAX_BACKLOG_S: the headroom must cover that plus a chunk, or in-flight
+# decode windows are overwritten (raised to that minimum at startup)
+BUFFER_HEADROOM_S = float(os.getenv("WHISPER_BUFFER_HEADROOM_S", "7"))  # Audio that may arrive during a decode
+TRIM_MARGIN_MS = int(os.getenv("WHISPER_TRIM_MARGIN_MS", "100"))  # Audio kept before a commit cut
+LANG_PIN_THRESHOLD = float(os.getenv("WHISPER_LANG_PIN_THRESHOLD", "0.6"))  # Min detection confidence to pin
+MAX_SESSIONS = int(os.getenv("WHISPER_MAX_SESSIONS", "0"))  # 0 = unlimited
+MAX_BACKLOG_S = float(os.getenv("WHISPER_MAX_BACKLOG_S", "3"))  # Undecoded audio before FLOW throttle (see headroom)
+MAX_BUFFERED_S = float(os.getenv("WHISPER_MAX_BUFFERED_S", "20"))  # Uncommitted audio before a forced commit
+AGREEMENT_MODE = os.getenv("WHISPER_AGREEMENT_MODE", "words")  # "words" or "chars" (LocalAgreement)
+PARTIAL_DECODE = os.getenv("WHISPER_PARTIAL_DECODE", "fast")  # "fast" (PARTIAL_PROFILE) or "full"
+WARMUP_S = float(os.getenv("WHISPER_WARMUP_S", "1"))  # Audio decoded at startup (0 = no warm-up)
+SESSION_IDLE_S = float(os.getenv("WHISPER_SESSION_IDLE_S", "300"))  # Reap sessions without commands (0 = never)
+SESSION_BUFFER_MB = float(os.getenv("WHISPER_SESSION_BUFFER_MB", "0"))  # Audio ring per session (0 = window + headroom)
+PROMPT_CONTEXT_CHARS = 200  # Committed text passed back to the decoder as prompt
+
+# Sends one response to the session's client
+Emitter = Callable[[Response], Awaitable[None]]
+# Server-side work run in a session's command queue, in order with its commands
+SessionJob = Callable[[], Awaitable[None]]
 
 
 @dataclass
@@ -58,11 +117,49 @@ class Session:
     auto_detect_langs: list[str]
     phrase_hints: list[str]
     initial_prompt: str = ""
-    agreement: LocalAgreement = field(default_factory=LocalAgreement)
-    audio_buffer: bytes = b""
+    agreement: LocalAgreement | WordAgreement = field(default_factory=WordAgreement)
+    unit_prefix: str = ""  # text committed and trimmed away in the current unit
+    commit_seq: int = 0  # FINALs sent so far
+    last_partial_text: str = ""  # text of the last PARTIAL in this unit
+    language: str | None = None  # language pinned for the current utterance (auto only)
+    language_confidence: float = 0.0
+    last_result: TranscriptionResult | None = None  # latest decode in this unit
+    last_profile: DecodeProfile = COMMIT_PROFILE  # profile last_result was decoded with
+    last_authoritative: bool = False  # last_result is main model, COMMIT_PROFILE: committable as is
+    last_pending: str = ""  # part of last_result's text not yet committed
+    last_pending_words: list[WordInfo] = field(default_factory=list)  # its words, stream time
+    last_window_end: int = 0  # absolute stream offset where last_result's window ends
+    vad_state: VADState = field(default_factory=VADState)
+    speech: SpeechSpans = field(default_factory=SpeechSpans)  # VAD speech frames in the buffer
+    audio_buffer: AudioRingBuffer = field(
+        default_factory=lambda: AudioRingBuffer(int(16000 * (30 + BUFFER_HEADROOM_S)))
+    )
+    audio_channel: int | None = None  # set when binary audio frames are used
+    last_seq: int = -1
+    frames_lost: int = 0
+    report_timing: bool = False  # add a ResponseTiming to PARTIAL/FINAL
+    chunk_seq: int = -1  # newest buffered chunk: client seq, or our own count
+    chunk_recv_ms: int = 0  # when it was received (wall clock)
+    trigger: DecodeTrigger = field(default_factory=DecodeTrigger)
+    decode_task: asyncio.Task | None = None
+    decode_view_start: int | None = None  # stream offset of the ring audio a decode is reading
+    retry_task: asyncio.Task | None = None  # restarts a deferred decode once inference frees up
+    end_of_speech: bool = False  # VAD speech_end seen, not yet decoded
+    emit: Emitter | None = None  # where asynchronous PARTIAL/FINAL go
+    connection: int | None = None  # client connection that started the session
+    flow_state: str = FLOW_OK
+    dropped_chunks: int = 0  # chunks discarded while in FLOW_DROP
+    shed_samples: int = 0  # their audio, which still counts as stream time
+    shed_marks: list[tuple[int, int]] = field(default_factory=list)  # (buffer offset, shed_samples by then)
     is_active: bool = True
     last_activity_ms: int = 0
 
+    @property
+    def candidate_languages(self) -> list[str]:
+        """Whisper language codes allowed for auto-detect (BCP-47 -> ISO 639-1)."""
+        codes = [lang.split("-")[0].lower() for lang in self.auto_detect_langs if lang]
+        return list(dict.fromkeys(codes))
+
 
 class WhisperServer:
     """Whisper STT server with Unix/TCP socket support."""
@@ -73,7 +170,20 @@ class WhisperServer:
         tcp_host: str | None = None,
         tcp_port: int | None = None,
         model_name: str | None = None,
+        engine: WhisperEngine | None = None,
+        partial_engine: WhisperEngine | None = None,
     ):
+        """
+        Args:
+            socket_path: Unix socket to listen on
+            tcp_host: TCP host to bind (TCP mode)
+            tcp_port: TCP port (enables TCP mode)
+            model_name: Whisper model to load
+            engine: Preconstructed engine to use instead of loading
+                `model_name` (e.g. a stand-in for benchmarks)
+            partial_engine: Preconstructed engine for PARTIAL hypotheses
+                (default: WHISPER_PARTIAL_MODEL, if set)
+        """
         self.socket_path = socket_path
         self.tcp_host = tcp_host
         self.tcp_port = tcp_port
@@ -82,31 +192,167 @@ class WhisperServer:
         # Determine connection mode
         self.use_tcp = tcp_port is not None
 
-        self.engine: WhisperEngine | None = None
+        self.engine: WhisperEngine | None = engine
+        self.inference: InferenceExecutor | None = None
+        self.scheduler: DecodeScheduler | None = None
+        # Optional small model for partials; the main engine then only
+        # produces commits
+        self.partial_engine: WhisperEngine | None = partial_engine
+        self.partial_inference: InferenceExecutor | None = None
+        self.partial_scheduler: DecodeScheduler | None = None
+        # Hypotheses are only shown, so they skip beam search, temperature
+        # fallback and word alignment; commits always decode at full quality
+        self.hypothesis_profile = COMMIT_PROFILE if PARTIAL_DECODE == "full" else PARTIAL_PROFILE
         self.vad: SileroVAD | None = None
+        self.vad_batcher: VADBatcher | None = None
+        # No-op until start() knows the device the model actually loaded on
+        self.metrics = ServiceMetrics(self.model_name, "", enabled=False)
+        self.startup: dict = {}  # load and warm-up timings, set by load()
         self.sessions: dict[str, Session] = {}
+        # Sessions by the client connection that started them, so a client
+        # that disconnects without STOP doesn't leave its sessions behind
+        self.connections: dict[int, set[str]] = {}
+        self._next_connection = 1
+        self.audio_channels: dict[int, str] = {}  # binary audio channel -> session_id
+        self._next_audio_channel = 1
+        self.outbound: set[OutboundQueue] = set()  # one per client connection
+        self.session_queues: dict[int, SessionQueues] = {}  # command queues by connection
         self.server: asyncio.Server | None = None
 
-        self._chunk_samples = 16000 // 4  # 250ms chunks for VAD processing
         self._min_transcribe_samples = 16000  # 1 second minimum for transcription
         self._max_transcribe_samples = 16000 * 30  # 30 second max window for transcription
+        self._keep_samples = 16000 * 5  # Context kept after a commit without word timings
+        self._trim_margin_samples = 16000 * TRIM_MARGIN_MS // 1000
+        self._min_tail_samples = 16000 // 4  # Shorter STOP tails aren't worth a decode
+        self.max_sessions = MAX_SESSIONS
+        self._max_backlog_samples = int(16000 * MAX_BACKLOG_S)
+        # Ring capacity: max window plus headroom so in-flight decode views
+        # stay valid while audio arrives, up to FLOW_DROP's threshold and the
+        # chunk (of up to a second) that crosses it
+        headroom = int(16000 * BUFFER_HEADROOM_S)
+        min_headroom = 2 * self._max_backlog_samples + 16000
+        if headroom < min_headroom:
+            logger.warning(
+                f"WHISPER_BUFFER_HEADROOM_S={BUFFER_HEADROOM_S:g} is below twice "
+                f"WHISPER_MAX_BACKLOG_S plus a chunk; using {min_headroom / 16000:g}s"
+            )
+            headroom = min_headroom
+        if SESSION_BUFFER_MB > 0:
+            # A capped ring keeps the headroom and shrinks the decode window
+            cap = capacity_for_bytes(int(SESSION_BUFFER_MB * 1024 * 1024))
+            cap = max(cap, self._min_transcribe_samples + headroom)
+            self._max_transcribe_samples = min(self._max_transcribe_samples, cap - headroom)
+        self._buffer_samples = self._max_transcribe_samples + headroom
+        self._max_buffered_samples = min(int(16000 * MAX_BUFFERED_S), self._max_transcribe_samples)
+        self.idle_timeout_s = SESSION_IDLE_S
+        self._reaper_task: asyncio.Task | None = None
 
     async def start(self) -> None:
         """Start the server."""
+        await self.load()
+        await self.listen()
+
+    async def load(self) -> None:
+        """Load the models and start the decode pipeline (no listeners).
+
+        The Whisper model(s) and the VAD load concurrently on threads, then a
+        short warm-up decode and VAD pass run so the first client doesn't pay
+        for CTranslate2 and torch initialization.
+        """
         logger.info("Initializing Whisper STT server...")
+        started = time.perf_counter()
+
+        if self.engine is None:
+            self.engine = WhisperEngine(model_name=self.model_name)
+        if self.partial_engine is None and WHISPER_PARTIAL_MODEL:
+            self.partial_engine = WhisperEngine(
+                model_name=WHISPER_PARTIAL_MODEL,
+                device=WHISPER_PARTIAL_DEVICE,
+                compute_type=WHISPER_PARTIAL_COMPUTE_TYPE,
+                beam_size=WHISPER_PARTIAL_BEAM_SIZE,
+            )
+        self.vad = create_vad()
+
+        # Model loading is mostly file I/O and native code, so the loads
+        # overlap instead of adding up
+        loads = [self.engine.load_model, self.vad.load_model]
+        if self.partial_engine is not None:
+            loads.append(self.partial_engine.load_model)
+        await asyncio.gather(*(asyncio.to_thread(load) for load in loads))
+        loaded = time.perf_counter()
+
+        self.inference = InferenceExecutor(workers=self.engine.num_workers)
+        self.scheduler = DecodeScheduler(self.engine, self.inference)
+        self.scheduler.start()
+
+        if self.partial_engine is not None:
+            self.partial_inference = InferenceExecutor(workers=self.partial_engine.num_workers)
+            self.partial_scheduler = DecodeScheduler(self.partial_engine, self.partial_inference)
+            self.partial_scheduler.start()
+            logger.info(f"Partials use {self.partial_engine.model_name}, commits {self.engine.model_name}")
+
+        self.vad_batcher = VADBatcher(self.vad)
+
+        await self._warm_up()
+        ready = time.perf_counter()
+        self.startup = {
+            "load_seconds": round(loaded - started, 3),
+            "warmup_seconds": round(ready - loaded, 3),
+        }
+        logger.info(
+            f"Ready in {ready - started:.2f}s "
+            f"(models {loaded - started:.2f}s, warm-up {ready - loaded:.2f}s)"
+        )
 
-        self.engine = WhisperEngine(model_name=self.model_name)
-        self.engine.load_model()
+        self.metrics = ServiceMetrics(self.engine.model_name, self.engine.device)
+        self.metrics.track_sessions(
+            lambda: len(self.sessions),
+            lambda: self.inference.stats.in_flight + self.inference.stats.queued,
+            lambda: sum(len(q) for q in self.outbound),
+            lambda: self.buffer_bytes,
+        )
+        self.metrics.start_http_server()
+
+        if self.idle_timeout_s > 0 and self._reaper_task is None:
+            self._reaper_task = asyncio.create_task(self._reap_idle_sessions())
+
+    async def _warm_up(self) -> None:
+        """Run a short decode on each engine and one VAD pass.
 
-        self.vad = SileroVAD()
-        self.vad.load_model()
+        The first inference initializes CTranslate2 kernels and allocators
+        (and torch's, for the VAD); doing it here keeps that off the first
+        session's latency.
+        """
+        if WARMUP_S <= 0:
+            return
 
+        # Low-level noise rather than silence, so the decoder runs past the
+        # first token
+        rng = np.random.default_rng(0)
+        audio = (rng.standard_normal(int(16000 * WARMUP_S)) * 0.01).astype(np.float32)
+
+        engines = [(self.engine, self.inference)]
+        if self.partial_engine is not None:
+            engines.append((self.partial_engine, self.partial_inference))
+        try:
+            await asyncio.gather(*(
+                inference.run(engine.transcribe, audio) for engine, inference in engines
+            ))
+            state = self.vad.new_state()
+            await self.vad_batcher.process(state, audio)
+        except Exception as e:
+            # A failed warm-up only costs first-request latency
+            logger.warning(f"Warm-up failed: {e}")
+
+    async def listen(self) -> None:
+        """Start accepting clients on the Unix socket or TCP port."""
         if self.use_tcp:
             # TCP mode for Railway
             self.server = await asyncio.start_server(
                 self._handle_client,
                 host=self.tcp_host,
                 port=self.tcp_port,
+                limit=STREAM_LIMIT,
             )
             logger.info(f"Whisper STT server listening on TCP {self.tcp_host}:{self.tcp_port}")
         else:
@@ -118,6 +364,7 @@ class WhisperServer:
             self.server = await asyncio.start_unix_server(
                 self._handle_client,
                 path=self.socket_path,
+                limit=STREAM_LIMIT,
             )
 
             os.chmod(self.socket_path, 0o666)
@@ -128,46 +375,143 @@ class WhisperServer:
         reader: asyncio.StreamReader,
         writer: asyncio.StreamWriter,
     ) -> None:
-        """Handle a single client connection."""
+        """Handle a single client connection.
+
+        This task only reads: commands go to per-session queues, so sessions
+        multiplexed over one connection don't wait on each other, and
+        responses go through the connection's outbound queue to a writer
+        task, so a slow client can't stall ingest or decodes.
+        """
         peer = writer.get_extra_info("peername") or "unknown"
         logger.info(f"Client connected: {peer}")
+        connection = self._next_connection
+        self._next_connection += 1
+
+        outbound = OutboundQueue(on_coalesce=self.metrics.count_coalesced_partial)
+        self.outbound.add(outbound)
+        writer_task = asyncio.create_task(write_loop(outbound, writer, self.metrics.observe_write))
+
+        async def emit(response: Response) -> None:
+            outbound.put(response.to_json(), response.type, response.session_id)
+
+        queues = self._connection_queues(connection, emit)
 
         try:
             while True:
-                line = await reader.readline()
-                if not line:
+                first = await reader.read(1)
+                if not first:
                     break
 
-                line_str = line.decode("utf-8").strip()
-                if not line_str:
-                    continue
-
-                response = await self._process_command(line_str)
-                if response:
-                    writer.write((response + "\n").encode("utf-8"))
-                    await writer.drain()
+                if first[0] == AUDIO_FRAME_MAGIC:
+                    # Binary audio frame: fixed header, then raw PCM
+                    header = first + await reader.readexactly(AUDIO_FRAME_HEADER.size - 1)
+                    try:
+                        audio_channel, seq, num_samples = parse_audio_frame_header(header)
+                    except ValueError as e:
+                        # The stream can't be resynchronized after a bad header
+                        logger.error(f"Bad audio frame from {peer}: {e}")
+                        break
+                    pcm = await reader.readexactly(num_samples * 2)
+                    frame = AudioFrame(audio_channel, seq, pcm)
+                    session_id = self.audio_channels.get(audio_channel, "unknown")
+                    await queues.submit(session_id, frame)
+                else:
+                    line = first + await reader.readline()
+                    line_str = line.decode("utf-8").strip()
+                    if not line_str:
+                        continue
+                    cmd = self._parse_command(line_str)
+                    await queues.submit(cmd.session_id if cmd else "unknown", cmd)
 
         except asyncio.CancelledError:
             pass
+        except asyncio.IncompleteReadError:
+            logger.warning(f"Client {peer} closed mid-frame")
         except Exception as e:
             logger.error(f"Error handling client {peer}: {e}")
         finally:
             logger.info(f"Client disconnected: {peer}")
+            await queues.close()
+            self.session_queues.pop(connection, None)
+            self.close_connection(connection)
+            # Let the writer flush what is queued, unless the client stopped reading
+            outbound.close()
+            try:
+                await asyncio.wait_for(writer_task, WRITER_CLOSE_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                pass
+            self.outbound.discard(outbound)
             writer.close()
             await writer.wait_closed()
 
-    async def _process_command(self, line: str) -> str | None:
-        """Process a command and return a response."""
+    def _connection_queues(
+        self,
+        connection: int,
+        emit: Emitter,
+    ) -> SessionQueues[Command | AudioFrame | SessionJob | None]:
+        """Create and register the per-session command queues of a connection.
+
+        Sessions sharing the connection are handled concurrently, each in
+        order. Besides client commands, a queue runs SessionJobs the server
+        submits (idle reaping), so they can't overtake queued commands.
+        """
+        async def handle(command: Command | AudioFrame | SessionJob | None) -> None:
+            if isinstance(command, AudioFrame):
+                response = await self._process_frame(command)
+            elif callable(command):
+                await command()
+                return
+            else:
+                response = await self._dispatch_command(command, emit, connection)
+            if response:
+                await emit(response)
+
+        queues = SessionQueues(handle)
+        self.session_queues[connection] = queues
+        return queues
+
+    async def _process_command(
+        self,
+        line: str,
+        emit: Callable[[str], Awaitable[None]] | None = None,
+        connection: int | None = None,
+    ) -> str | None:
+        """Process a command line and return its immediate response line.
+
+        Decode results (PARTIAL/FINAL) are produced asynchronously and sent
+        as JSON lines through `emit`, which START binds to the new session
+        along with the `connection` that owns it.
+        """
+        emit_response = None
+        if emit is not None:
+            async def emit_response(response: Response) -> None:
+                await emit(response.to_json())
+
+        response = await self._dispatch_command(self._parse_command(line), emit_response, connection)
+        return response.to_json() if response else None
+
+    def _parse_command(self, line: str) -> Command | None:
+        """Parse a JSON command line, or return None if it is invalid."""
+        started = time.perf_counter()
         cmd = parse_command(line)
+        self.metrics.observe_parse("json", time.perf_counter() - started)
+        return cmd
 
+    async def _dispatch_command(
+        self,
+        cmd: Command | None,
+        emit: Emitter | None = None,
+        connection: int | None = None,
+    ) -> Response | None:
+        """Run a parsed command and return its immediate response."""
         if cmd is None:
             return ErrorResponse(
                 session_id="unknown",
                 error="Invalid command format",
-            ).to_json()
+            )
 
         if isinstance(cmd, StartCommand):
-            return await self._handle_start(cmd)
+            return await self._handle_start(cmd, emit, connection)
         elif isinstance(cmd, AudioCommand):
             return await self._handle_audio(cmd)
         elif isinstance(cmd, StopCommand):
@@ -175,16 +519,75 @@ class WhisperServer:
 
         return None
 
-    async def _handle_start(self, cmd: StartCommand) -> str:
+    async def _process_frame(self, frame: AudioFrame) -> Response | None:
+        """Process a binary audio frame and return a response."""
+        session_id = self.audio_channels.get(frame.audio_channel)
+        session = self.sessions.get(session_id) if session_id else None
+        if not session:
+            return ErrorResponse(
+                session_id=session_id or "unknown",
+                error=f"Unknown audio channel {frame.audio_channel}",
+            )
+
+        return await self._ingest_frame(session, frame.seq, frame.pcm)
+
+    async def _ingest_frame(self, session: Session, seq: int, pcm_bytes: bytes) -> Response | None:
+        """Track a chunk's sequence number, then ingest its audio."""
+        if seq != session.last_seq + 1 and session.last_seq >= 0:
+            session.frames_lost += max(0, seq - session.last_seq - 1)
+            logger.warning(
+                f"Session {session.session_id}: audio frame seq {seq} "
+                f"after {session.last_seq}"
+            )
+        session.last_seq = seq
+
+        if not session.is_active:
+            return None
+
+        return await self._ingest_audio(session, pcm_bytes, seq)
+
+    async def _handle_start(
+        self,
+        cmd: StartCommand,
+        emit: Emitter | None = None,
+        connection: int | None = None,
+    ) -> Response:
         """Handle START command - create new session."""
+        if (
+            self.max_sessions > 0
+            and cmd.session_id not in self.sessions
+            and len(self.sessions) >= self.max_sessions
+        ):
+            logger.warning(f"Refusing session {cmd.session_id}: at capacity ({self.max_sessions})")
+            self.metrics.count_busy()
+            return BusyResponse(
+                session_id=cmd.session_id,
+                reason="Session capacity reached",
+                active_sessions=len(self.sessions),
+                max_sessions=self.max_sessions,
+            )
+
         logger.info(f"Starting session: {cmd.session_id} (lang={cmd.source_lang})")
 
-        agreement = LocalAgreement(
+        previous = self.sessions.get(cmd.session_id)
+        if previous is not None:
+            # Restarted without STOP: the new session replaces the old one
+            logger.warning(f"Session {cmd.session_id} restarted, discarding its previous state")
+            self._close_session(previous)
+
+        agreement_cls = LocalAgreement if AGREEMENT_MODE == "chars" else WordAgreement
+        agreement = agreement_cls(
             k=int(os.getenv("WHISPER_AGREEMENT_K", "3")),
             n=int(os.getenv("WHISPER_AGREEMENT_N", "2")),
             min_new_chars=int(os.getenv("WHISPER_AGREEMENT_MIN_CHARS", "10")),
         )
 
+        audio_channel = None
+        if cmd.binary_audio:
+            audio_channel = self._next_audio_channel
+            self._next_audio_channel += 1
+            self.audio_channels[audio_channel] = cmd.session_id
+
         self.sessions[cmd.session_id] = Session(
             session_id=cmd.session_id,
             source_lang=cmd.source_lang,
@@ -192,101 +595,676 @@ class WhisperServer:
             phrase_hints=cmd.phrase_hints,
             initial_prompt=cmd.initial_prompt or "",
             agreement=agreement,
+            vad_state=self.vad.new_state(),
+            audio_buffer=AudioRingBuffer(self._buffer_samples),
+            audio_channel=audio_channel,
+            emit=emit,
+            connection=connection,
+            report_timing=cmd.timing,
+            last_activity_ms=self._now_ms(),
         )
+        if connection is not None:
+            self.connections.setdefault(connection, set()).add(cmd.session_id)
 
-        return ReadyResponse(session_id=cmd.session_id).to_json()
+        return ReadyResponse(
+            session_id=cmd.session_id,
+            audio_channel=audio_channel,
+        )
 
-    async def _handle_audio(self, cmd: AudioCommand) -> str | None:
+    async def _handle_audio(self, cmd: AudioCommand) -> Response | None:
         """Handle AUDIO command - process audio chunk."""
         session = self.sessions.get(cmd.session_id)
         if not session:
             return ErrorResponse(
                 session_id=cmd.session_id,
                 error="Session not found",
-            ).to_json()
+            )
 
         if not session.is_active:
             return None
 
         try:
+            started = time.perf_counter()
             pcm_bytes = base64.b64decode(cmd.pcm_b64)
+            self.metrics.observe_parse("base64", time.perf_counter() - started)
         except Exception as e:
             return ErrorResponse(
                 session_id=cmd.session_id,
                 error=f"Invalid base64 audio: {e}",
-            ).to_json()
-
-        session.audio_buffer += pcm_bytes
+            )
 
-        buffer_samples = len(session.audio_buffer) // 2
+        if cmd.seq is not None:
+            return await self._ingest_frame(session, cmd.seq, pcm_bytes)
+        return await self._ingest_audio(session, pcm_bytes)
 
-        if buffer_samples < self._min_transcribe_samples:
+    async def _ingest_audio(
+        self,
+        session: Session,
+        pcm_bytes: bytes,
+        seq: int | None = None,
+    ) -> Response | None:
+        """Buffer a PCM chunk, run the VAD and trigger a decode if one is due.
+
+        Decodes run in a per-session task; chunks that arrive while one is in
+        flight are merged into a single next decode instead of each queueing
+        their own. `seq` is the client's number for the chunk, if it sent one.
+        """
+        received_ms = epoch_ms()
+        session.last_activity_ms = self._now_ms()
+        if session.flow_state == FLOW_DROP or self._would_overrun(session, len(pcm_bytes) // 2):
+            # Over twice the backlog budget: shed this session's audio until
+            # its decodes catch up (the decode loop lifts the state, also
+            # when no more chunks arrive). Also shed while appending would
+            # overwrite buffered audio under an in-flight decode.
+            session.dropped_chunks += 1
+            self.metrics.count_dropped_chunk()
+            self._shed_audio(session, len(pcm_bytes) // 2)
+            if session.trigger.is_due:
+                self._schedule_decode(session)
             return None
 
-        # Use sliding window - only transcribe last N seconds to bound latency
-        max_bytes = self._max_transcribe_samples * 2  # 2 bytes per sample
-        transcribe_buffer = session.audio_buffer
-        if len(transcribe_buffer) > max_bytes:
-            transcribe_buffer = session.audio_buffer[-max_bytes:]
+        # Converted to float32 once; the same samples feed the VAD
+        samples = session.audio_buffer.append_pcm(pcm_bytes)
+        session.chunk_seq = session.chunk_seq + 1 if seq is None else seq
+        session.chunk_recv_ms = received_ms
+
+        # Feed exactly the new samples to this session's VAD stream
+        started = time.perf_counter()
+        vad_events = await self.vad_batcher.process(session.vad_state, samples)
+        self.metrics.observe_vad(time.perf_counter() - started)
+        self.metrics.set_buffered(session.session_id, session.audio_buffer.duration_seconds)
+
+        # The VAD clock counts the same samples as the buffer's stream clock
+        session.speech.discard_until(session.audio_buffer.start_offset)
+        boundary = False
+        for event in vad_events:
+            if event.event_type == "speech":
+                start = event.timestamp_ms * 16
+                session.speech.add(start, start + FRAME_SAMPLES)
+            elif event.event_type == "speech_start":
+                session.end_of_speech = False
+                session.language = None  # new utterance: detect again
+                boundary = True
+            elif event.event_type == "speech_end":
+                session.end_of_speech = True
+                boundary = True
+        if session.vad_state.is_speaking:
+            session.end_of_speech = False
+        elif not (session.speech or session.end_of_speech or session.trigger.in_flight):
+            # Only silence is buffered and nothing waits to be decoded: keep
+            # just the lead-in a later speech start is decoded with
+            session.audio_buffer.keep_last(max(session.speech.pad_samples, self._trim_margin_samples))
+
+        if len(session.audio_buffer) >= self._max_buffered_samples and not session.end_of_speech:
+            # No commit for too long: force one so the window stays bounded
+            logger.info(f"Session {session.session_id}: buffered audio limit, forcing commit")
+            session.end_of_speech = True
+            boundary = True
+
+        # Silence and noise don't trigger decodes; only speech (or the end of it) does
+        should_decode = session.trigger.add_chunk(
+            len(samples), boundary=boundary, speech=session.vad_state.is_speaking
+        )
 
-        audio = pcm_to_float32(transcribe_buffer)
+        if should_decode and len(session.audio_buffer) >= self._min_transcribe_samples:
+            self._schedule_decode(session)
+
+        return self._update_flow(session)
+
+    @staticmethod
+    def _would_overrun(session: Session, num_samples: int) -> bool:
+        """True if appending num_samples would overwrite audio a decode still needs.
+
+        While a decode is in flight, neither its window (a view of the ring)
+        nor audio still buffered may be overwritten; without one, the ring
+        drops its oldest audio as usual.
+        """
+        if session.decode_view_start is None:
+            return False
+        ring = session.audio_buffer
+        oldest = min(session.decode_view_start, ring.start_offset)
+        return num_samples > ring.room_after(oldest)
+
+    @staticmethod
+    def _shed_audio(session: Session, num_samples: int) -> None:
+        """Count audio discarded at the end of the buffer into the stream clock."""
+        offset = session.audio_buffer.total_samples
+        session.shed_samples += num_samples
+        marks = session.shed_marks
+        if marks and marks[-1][0] == offset:
+            marks[-1] = (offset, session.shed_samples)
+        else:
+            marks.append((offset, session.shed_samples))
+        # Only the last mark before the buffer start still matters
+        while len(marks) > 1 and marks[1][0] <= session.audio_buffer.start_offset:
+            marks.pop(0)
+
+    def _update_flow(self, session: Session) -> Response | None:
+        """Re-evaluate the session's flow state from its decode backlog.
+
+        Throttles above the backlog budget, drops above twice the budget and
+        returns to normal below half of it.
+
+        Returns:
+            FLOW response if the state changed, else None
+        """
+        backlog = session.trigger.backlog_samples
+        budget = self._max_backlog_samples
+        if backlog > 2 * budget:
+            state = FLOW_DROP
+        elif backlog > budget:
+            state = FLOW_THROTTLE if session.flow_state == FLOW_OK else session.flow_state
+        elif backlog <= budget // 2:
+            state = FLOW_OK
+        else:
+            state = session.flow_state
 
-        vad_events = self.vad.process_audio(audio[-self._chunk_samples:])
+        if state == session.flow_state:
+            return None
 
-        is_silence = not self.vad.is_speaking and any(
-            e.event_type == "speech_end" for e in vad_events
+        logger.info(
+            f"Session {session.session_id}: flow {session.flow_state} -> {state} "
+            f"(backlog {backlog / 16:.0f}ms)"
+        )
+        session.flow_state = state
+        return FlowResponse(
+            session_id=session.session_id,
+            state=state,
+            backlog_ms=backlog // 16,
+            buffered_ms=len(session.audio_buffer) // 16,
         )
 
-        lang = None if session.source_lang == "auto" else session.source_lang.split("-")[0]
+    def _schedule_decode(self, session: Session) -> None:
+        """Start the session's decode task unless one is already running."""
+        if session.decode_task is None or session.decode_task.done():
+            session.decode_task = asyncio.create_task(self._decode_loop(session))
+
+    async def _decode_loop(self, session: Session) -> None:
+        """Decode the session's window until no new audio is due."""
+        while session.is_active and session.trigger.is_due:
+            if len(session.audio_buffer) < self._min_transcribe_samples:
+                break
+
+            end_of_speech = session.end_of_speech
+            partial_inference = self.partial_inference or self.inference
+            if not end_of_speech and partial_inference.is_full:
+                # Partials don't wait for a saturated executor; the backlog
+                # stays merged in the trigger and is decoded once a slot
+                # frees up. Not left to the next chunk: a client in
+                # FLOW_DROP may not send one until the backlog drains.
+                session.trigger.stats.deferred += 1
+                if session.retry_task is None or session.retry_task.done():
+                    session.retry_task = asyncio.create_task(
+                        self._retry_decode(session, partial_inference)
+                    )
+                break
+
+            session.trigger.begin()
+            session.end_of_speech = False
+            flow = self._update_flow(session)
+            if flow and session.emit:
+                await session.emit(flow)
+            try:
+                response = await self._decode_window(session, end_of_speech)
+            except InferenceQueueFull:
+                logger.debug(f"Inference queue full, skipping decode for {session.session_id}")
+                response = None
+            except Exception as e:
+                logger.error(f"Decode failed for session {session.session_id}: {e}")
+                response = ErrorResponse(
+                    session_id=session.session_id,
+                    error=f"Decode failed: {e}",
+                )
+            finally:
+                session.trigger.finish()
+
+            # A FINAL is sent even if STOP came in meanwhile: its commit_seq
+            # and text are already counted, and STOP's flush follows it
+            sendable = session.is_active or isinstance(response, FinalResponse)
+            if response and session.emit and sendable:
+                try:
+                    await session.emit(response)
+                except Exception as e:
+                    logger.warning(f"Failed to send response for {session.session_id}: {e}")
+
+    async def _retry_decode(self, session: Session, inference: InferenceExecutor) -> None:
+        """Restart a deferred decode as soon as `inference` has a free slot."""
+        await inference.wait_for_slot()
+        if session.is_active:
+            self._schedule_decode(session)
+
+    async def _decode_window(self, session: Session, end_of_speech: bool) -> Response | None:
+        """Decode the current window and turn the result into a response."""
+        # Only uncommitted audio is buffered, so the window stays as short as
+        # the pending speech; 30 s is a backstop
+        raw = session.audio_buffer.view(self._max_transcribe_samples)
+        window_end = session.audio_buffer.total_samples
+        # The window is read from the ring in place: _ingest_audio sheds
+        # audio that would overwrite it until the decode is done
+        session.decode_view_start = window_end - len(raw)
+        try:
+            return await self._transcribe_window(session, raw, window_end, end_of_speech)
+        finally:
+            session.decode_view_start = None
 
-        result = self.engine.transcribe(
-            audio,
-            language=lang,
-            initial_prompt=session.initial_prompt or None,
+    async def _transcribe_window(
+        self,
+        session: Session,
+        raw: np.ndarray,
+        window_end: int,
+        end_of_speech: bool,
+    ) -> Response | None:
+        """Decode a raw window ending at stream offset window_end."""
+        # Silence around and between the VAD's speech spans is squeezed out
+        # before decoding
+        audio, window = session.speech.compact(raw, window_end - len(raw))
+        report = self._window_timing(session, audio, window_end)
+        if len(audio) == 0:
+            # No speech left in the buffer: nothing to decode
+            if end_of_speech:
+                return self._flush_unit(session, "", [], None, window_end, report)
+            return None
+
+        # Hypotheses come from the cheap profile (and the small model, if
+        # there is one); the main model at full quality only runs for end of
+        # speech and for commits
+        authoritative = end_of_speech or (
+            self.partial_scheduler is None and self.hypothesis_profile is COMMIT_PROFILE
         )
+        if authoritative:
+            scheduler, profile = self.scheduler, COMMIT_PROFILE
+        else:
+            scheduler = self.partial_scheduler or self.scheduler
+            profile = self.hypothesis_profile
+
+        # End-of-speech decodes wait for a slot so the forced commit isn't lost
+        language = await self._utterance_language(session, audio, block=end_of_speech)
+        # Hypothesis decodes stream their segments as interim PARTIALs; an
+        # end-of-speech decode is followed by a FINAL right away
+        timing = DecodeTiming() if report else None
+        on_segment = None if end_of_speech else self._interim_partial(session, report, timing)
+        result = await self._decode(
+            session, scheduler, audio, language,
+            block=end_of_speech, on_segment=on_segment, profile=profile, timing=timing,
+        )
+        self._cache_result(session, result, window, window_end, profile, authoritative)
 
-        if is_silence:
-            commit_result = session.agreement.force_commit()
-            if commit_result and commit_result.text:
-                session.audio_buffer = b""
-                self.vad.reset()
-
-                return FinalResponse(
-                    session_id=cmd.session_id,
-                    text=commit_result.text,
-                    language=result.language,
-                    words=[WordInfo(w.word, w.start, w.end, w.confidence)
-                           for w in result.words],
-                    committed_prefix=commit_result.committed_prefix,
-                    tts_final=True,
-                ).to_json()
-
-        agreement_result = session.agreement.process(result.text)
+        words = self._stream_words(session, result.words, window)
+        if end_of_speech:
+            return self._flush_unit(
+                session, result.text, words, result.language, window_end,
+                self._decode_timing(report, timing),
+            )
 
-        if agreement_result.is_final:
-            # Trim buffer to last 5 seconds to provide context for next segment
-            keep_bytes = 16000 * 5 * 2  # 5 seconds
-            if len(session.audio_buffer) > keep_bytes:
-                session.audio_buffer = session.audio_buffer[-keep_bytes:]
+        agreement_result = session.agreement.process(result.text, words)
 
+        if agreement_result.is_final:
+            committed = agreement_result.text
+            if not authoritative:
+                # The hypotheses are stable: redo the window at full quality
+                # and commit its words for the same audio span (by time, or by
+                # characters when the hypothesis has no word timings)
+                end_time = committed_end_time(result.words, committed)
+                timing = DecodeTiming() if report else None
+                result = await self._decode(session, self.scheduler, audio, language, timing=timing)
+                self._cache_result(session, result, window, window_end, COMMIT_PROFILE, True)
+                words = self._stream_words(session, result.words, window)
+                count = self._words_until(result.words, end_time) if end_time is not None else 0
+                count = count or committed_word_count(result.words, committed)
+                if count:
+                    committed = self._words_text(result.words[:count])
+            else:
+                count = committed_word_count(result.words, committed)
+            self._trim_committed(session, result, committed, window)
+            session.unit_prefix = self._join(session.unit_prefix, committed)
+
+            # Only the newly committed words are sent; the rest stay pending.
+            # Pending text is rebuilt from the words: result.text joins
+            # segments with their own spacing, so character offsets of the
+            # committed text don't line up with it.
+            if count:
+                session.last_pending = self._words_text(result.words[count:])
+            else:
+                session.last_pending = self._text_after(result.text, committed)
+                count = len(words)
+            session.last_pending_words = words[count:]
+
+            session.commit_seq += 1
+            self.metrics.count_response("FINAL")
             return FinalResponse(
-                session_id=cmd.session_id,
-                text=agreement_result.text,
+                session_id=session.session_id,
+                text=session.unit_prefix,
                 language=result.language,
-                words=[WordInfo(w.word, w.start, w.end, w.confidence)
-                       for w in result.words],
-                committed_prefix=agreement_result.committed_prefix,
+                words=words[:count],
+                committed_prefix=session.unit_prefix,
                 tts_final=False,
-            ).to_json()
+                commit_seq=session.commit_seq,
+                timing=self._decode_timing(report, timing),
+            )
         else:
-            return PartialResponse(
-                session_id=cmd.session_id,
-                text=agreement_result.text,
-                language=result.language,
-                confidence=result.language_confidence,
-            ).to_json()
+            return self._partial_response(
+                session, agreement_result.text, result, self._decode_timing(report, timing)
+            )
+
+    async def _decode(
+        self,
+        session: Session,
+        scheduler: DecodeScheduler,
+        audio: np.ndarray,
+        language: str | None,
+        block: bool = True,
+        on_segment: Callable[[TranscriptionResult], Awaitable[None]] | None = None,
+        profile: DecodeProfile = COMMIT_PROFILE,
+        timing: DecodeTiming | None = None,
+        pending: str = "",
+    ) -> TranscriptionResult:
+        """Decode a window on one of the engines and record its timing.
+
+        `pending` is decoded but uncommitted text preceding the window (the
+        STOP tail), passed to the decoder as context.
+        """
+        started = time.perf_counter()
+        result = await scheduler.decode(
+            session.session_id,
+            audio,
+            language=language,
+            initial_prompt=self._decode_prompt(session, pending),
+            block=block,
+            on_segment=on_segment,
+            profile=profile,
+            timing=timing,
+        )
+        self.metrics.observe_decode(time.perf_counter() - started, len(audio) / 16000)
+        if session.source_lang == "auto":
+            result.language_confidence = session.language_confidence
+        return result
+
+    def _interim_partial(
+        self,
+        session: Session,
+        report: ResponseTiming | None = None,
+        timing: DecodeTiming | None = None,
+    ) -> Callable[[TranscriptionResult], Awaitable[None]]:
+        """Callback sending the text decoded so far as a PARTIAL."""
+        async def on_segment(partial: TranscriptionResult) -> None:
+            if session.is_active and session.emit:
+                response = self._partial_response(
+                    session, partial.text, partial, self._decode_timing(report, timing)
+                )
+                if response:
+                    await session.emit(response)
+        return on_segment
+
+    def _partial_response(
+        self,
+        session: Session,
+        pending: str,
+        result: TranscriptionResult,
+        timing: ResponseTiming | None = None,
+    ) -> Response | None:
+        """PARTIAL for the unit, or None if its text was just sent."""
+        text = self._join(session.unit_prefix, pending)
+        if text == session.last_partial_text:
+            return None
+        session.last_partial_text = text
+
+        self.metrics.count_response("PARTIAL")
+        return PartialResponse(
+            session_id=session.session_id,
+            text=text,
+            language=result.language,
+            confidence=result.language_confidence,
+            timing=timing,
+        )
+
+    def _cache_result(
+        self,
+        session: Session,
+        result: TranscriptionResult,
+        window: WindowMap,
+        window_end: int,
+        profile: DecodeProfile,
+        authoritative: bool,
+    ) -> None:
+        """Remember the latest decode and how it was made, for STOP.
+
+        Args:
+            profile: Profile the window was decoded with
+            authoritative: Decoded by the main model at COMMIT_PROFILE, so its
+                text may be committed as is
+        """
+        session.last_result = result
+        session.last_profile = profile
+        session.last_authoritative = authoritative
+        session.last_pending = result.text
+        session.last_pending_words = self._stream_words(session, result.words, window)
+        session.last_window_end = window_end
+
+    @classmethod
+    def _stream_words(cls, session: Session, words: list, window: WindowMap) -> list[WordInfo]:
+        """Word timings moved from the decode window onto the stream clock.
+
+        Stream time counts all of the session's audio since START, so FINALs
+        of different windows line up with each other and with the client's
+        clock: the silence squeezed out of the window is put back, and so is
+        audio shed by flow control.
+        """
+        return [
+            WordInfo(
+                w.word,
+                cls._stream_seconds(session, window.to_stream(w.start)),
+                cls._stream_seconds(session, window.to_stream(w.end), end=True),
+                w.confidence,
+            )
+            for w in words
+        ]
+
+    @staticmethod
+    def _stream_seconds(session: Session, buffer_seconds: float, end: bool = False) -> float:
+        """Stream time of a time on the buffer clock, which skips shed audio.
+
+        A time right where audio was shed is placed after the gap, or before
+        it if it is the `end` of something.
+        """
+        sample = buffer_seconds * 16000
+        shed = 0
+        for offset, total in session.shed_marks:
+            if offset > sample or (end and offset == sample):
+                break
+            shed = total
+        return round((sample + shed) / 16000, 3)
+
+    @staticmethod
+    def _words_until(words: list, end_time: float) -> int:
+        """Number of leading words centred before end_time (seconds into the window)."""
+        count = 0
+        while count < len(words) and (words[count].start + words[count].end) / 2 <= end_time:
+            count += 1
+        return count
+
+    @staticmethod
+    def _words_text(words: list) -> str:
+        """Text of decoded words (each carries its own leading space)."""
+        return "".join(w.word for w in words).strip()
+
+    @staticmethod
+    def _text_after(text: str, committed: str) -> str:
+        """Rest of text after as many non-whitespace characters as committed has.
+
+        For decodes without word timings; spacing may differ between the two.
+        """
+        remaining = sum(1 for c in committed if not c.isspace())
+        for i, c in enumerate(text):
+            if remaining == 0:
+                return text[i:].strip()
+            if not c.isspace():
+                remaining -= 1
+        return ""
+
+    def _decode_language(self, session: Session) -> str | None:
+        """Fixed session language, or the language pinned for the utterance."""
+        if session.source_lang == "auto":
+            return session.language
+        return session.source_lang.split("-")[0]
+
+    async def _utterance_language(
+        self,
+        session: Session,
+        audio: np.ndarray,
+        block: bool = True,
+    ) -> str | None:
+        """Language to decode a window with.
+
+        Auto-detect sessions detect once per utterance, restricted to the
+        session's candidate languages, and pin the result so later decodes
+        skip detection. A detection below LANG_PIN_THRESHOLD isn't pinned and
+        is repeated on the next decode.
+        """
+        language = self._decode_language(session)
+        if language is not None or session.source_lang != "auto":
+            return language
+
+        candidates = session.candidate_languages
+        if len(candidates) == 1:
+            language, confidence = candidates[0], 1.0
+        else:
+            language, confidence = await self.inference.run(
+                self.engine.detect_language,
+                audio,
+                candidates or None,
+                block=block,
+            )
+
+        session.language_confidence = confidence
+        if confidence >= LANG_PIN_THRESHOLD:
+            session.language = language
+            logger.debug(
+                f"Pinned language {language} ({confidence:.2f}) for {session.session_id}"
+            )
+        return language
+
+    def _decode_prompt(self, session: Session, pending: str = "") -> str | None:
+        """Session prompt plus the tail of the text already decoded in this unit.
+
+        The decoder only sees audio after the commit (or after the last
+        decode, for the STOP tail), so the earlier text is passed back as
+        context to keep the continuation coherent.
+        """
+        context = self._join(session.unit_prefix, pending)[-PROMPT_CONTEXT_CHARS:]
+        return self._join(session.initial_prompt, context) or None
+
+    def _trim_committed(
+        self,
+        session: Session,
+        result: TranscriptionResult,
+        committed: str,
+        window: WindowMap,
+    ) -> None:
+        """Drop committed audio from the buffer and reset the agreement.
+
+        The cut is placed at the end of the last committed word (minus a small
+        margin, since word end times tend to run late), mapped back to the
+        stream clock so audio that arrived during the decode is kept.
+        """
+        end_time = committed_end_time(result.words, committed)
+        if end_time is None:
+            # No usable word timings: fall back to a fixed context
+            session.audio_buffer.keep_last(self._keep_samples)
+        else:
+            cut = int(window.to_stream(end_time) * 16000) - self._trim_margin_samples
+            session.audio_buffer.discard_until(cut)
+
+        # Subsequent decodes start after the commit, so their text no longer
+        # shares a prefix with the history
+        session.agreement.reset()
+
+    def _flush_unit(
+        self,
+        session: Session,
+        pending: str,
+        words: list[WordInfo],
+        language: str | None,
+        window_end: int,
+        timing: ResponseTiming | None = None,
+    ) -> Response | None:
+        """Commit everything pending and close the current unit.
+
+        Args:
+            session: Session to flush
+            pending: Uncommitted text of the unit
+            words: Words of the pending text, on the stream clock
+            language: Language of the pending text (None = session language)
+            window_end: Stream offset the flushed text covers up to; audio
+                that arrived after it (e.g. during the decode) stays buffered
+            timing: Latency breakdown to report, if the session asked for it
+
+        Returns:
+            FINAL with tts_final=True, or None if the unit has no text
+        """
+        text = self._join(session.unit_prefix, pending)
+
+        session.agreement.reset()
+        session.unit_prefix = ""
+        session.language = None
+        session.last_result = None
+        session.last_pending = ""
+        session.last_pending_words = []
+        session.last_partial_text = ""
+        session.audio_buffer.discard_until(window_end)
+
+        if not text:
+            return None
 
-    async def _handle_stop(self, cmd: StopCommand) -> str | None:
+        session.commit_seq += 1
+        self.metrics.count_response("FINAL", forced=True)
+        return FinalResponse(
+            session_id=session.session_id,
+            text=text,
+            language=language or session.source_lang,
+            words=words,
+            committed_prefix=text,
+            tts_final=True,
+            commit_seq=session.commit_seq,
+            timing=timing,
+        )
+
+    @classmethod
+    def _window_timing(cls, session: Session, audio: np.ndarray, window_end: int) -> ResponseTiming | None:
+        """Timing report of a decode window, if the session asked for them."""
+        if not session.report_timing:
+            return None
+        return ResponseTiming(
+            chunk_seq=session.chunk_seq,
+            chunk_recv_ms=session.chunk_recv_ms,
+            window_s=round(len(audio) / 16000, 3),
+            stream_end_s=cls._stream_seconds(session, window_end / 16000, end=True),
+        )
+
+    @staticmethod
+    def _decode_timing(
+        report: ResponseTiming | None,
+        timing: DecodeTiming | None,
+    ) -> ResponseTiming | None:
+        """Add a decode's milestones to a window's timing report."""
+        if report is None or timing is None or not timing.started_ms:
+            return report
+        return replace(
+            report,
+            queued_ms=timing.queued_ms,
+            decode_start_ms=timing.started_ms,
+            # Interim PARTIALs are sent while the decode is still running
+            decode_end_ms=timing.finished_ms or epoch_ms(),
+        )
+
+    @staticmethod
+    def _join(prefix: str, text: str) -> str:
+        if not prefix:
+            return text
+        if not text:
+            return prefix
+        return f"{prefix} {text}"
+
+    async def _handle_stop(self, cmd: StopCommand) -> Response | None:
         """Handle STOP command - end session and flush."""
         session = self.sessions.get(cmd.session_id)
         if not session:
@@ -294,38 +1272,203 @@ class WhisperServer:
 
         logger.info(f"Stopping session: {cmd.session_id}")
 
-        response = None
-        if session.audio_buffer:
+        # Stop further decodes and let an in-flight one finish so it can't
+        # race the flush below; the flush supersedes its PARTIAL, but a
+        # FINAL it commits is still sent first
+        session.is_active = False
+        if session.decode_task and not session.decode_task.done():
+            try:
+                await session.decode_task
+            except Exception:
+                pass
+
+        stats = session.trigger.stats
+        logger.info(
+            f"Session {cmd.session_id} decode stats: {stats.decodes} decodes for "
+            f"{stats.chunks} chunks, {stats.merged_chunks} merged, "
+            f"{stats.skipped_chunks} skipped as silence, max backlog {stats.max_backlog_chunks} chunks"
+        )
+
+        # The text comes from the last decode if it is committable as is;
+        # then only audio that arrived after it still needs decoding. A
+        # cached hypothesis is not committed (greedy text, and no word
+        # timings under PARTIAL_PROFILE): the uncommitted audio, which is
+        # all the buffer holds after _trim_committed, is decoded again at
+        # COMMIT_PROFILE as one window instead, so nothing committed is
+        # decoded twice and no text is joined at an arbitrary cut.
+        last = session.last_result if session.last_authoritative else None
+        pending = session.last_pending if last else ""
+        words = session.last_pending_words if last else []
+        language = session.last_result.language if session.last_result else None
+        tail_start = session.last_window_end if last else session.audio_buffer.start_offset
+        tail_start = max(tail_start, session.audio_buffer.start_offset)
+        tail, tail_window = session.speech.compact(
+            session.audio_buffer.view_from(tail_start), tail_start
+        )
+        report = self._window_timing(session, tail, session.audio_buffer.total_samples)
+
+        if len(tail) >= self._min_tail_samples:
+            timing = DecodeTiming() if report else None
+            tail_result = await self._decode(
+                session,
+                self.scheduler,
+                tail,
+                language or self._decode_language(session),
+                timing=timing,
+                pending=pending,
+            )
+            report = self._decode_timing(report, timing)
+            pending = self._join(pending, tail_result.text)
+            words = words + self._stream_words(session, tail_result.words, tail_window)
+            language = language or tail_result.language
+        elif last is None:
+            # Nothing committable decoded this unit; fall back to the agreement history
             commit_result = session.agreement.force_commit()
-            if commit_result and commit_result.text:
-                audio = pcm_to_float32(session.audio_buffer)
-                lang = None if session.source_lang == "auto" else session.source_lang.split("-")[0]
-                result = self.engine.transcribe(
-                    audio,
-                    language=lang,
-                    initial_prompt=session.initial_prompt or None,
-                )
+            pending = commit_result.text if commit_result else ""
 
-                response = FinalResponse(
-                    session_id=cmd.session_id,
-                    text=commit_result.text,
-                    language=result.language,
-                    words=[WordInfo(w.word, w.start, w.end, w.confidence)
-                           for w in result.words],
-                    committed_prefix=commit_result.committed_prefix,
-                    tts_final=True,
-                ).to_json()
+        response = self._flush_unit(
+            session, pending, words, language, session.audio_buffer.total_samples, report
+        )
+        self._close_session(session)
+        return response
 
+    def _close_session(self, session: Session) -> None:
+        """Stop a session's decodes and release everything it holds."""
         session.is_active = False
-        del self.sessions[cmd.session_id]
-        self.vad.reset()
-
-        return response
+        if session.decode_task and not session.decode_task.done():
+            session.decode_task.cancel()
+        if session.retry_task and not session.retry_task.done():
+            session.retry_task.cancel()
+
+        if self.sessions.get(session.session_id) is session:
+            del self.sessions[session.session_id]
+            self.metrics.remove_session(session.session_id)
+        if session.audio_channel is not None:
+            self.audio_channels.pop(session.audio_channel, None)
+        owned = self.connections.get(session.connection)
+        if owned is not None:
+            owned.discard(session.session_id)
+
+    def close_connection(self, connection: int) -> None:
+        """Drop the sessions of a client connection that went away.
+
+        Their pending text has no one left to receive it, so nothing is
+        flushed.
+        """
+        for session_id in self.connections.pop(connection, set()):
+            session = self.sessions.get(session_id)
+            if session is not None and session.connection == connection:
+                logger.info(f"Closing session {session_id}: client disconnected without STOP")
+                self._close_session(session)
+
+    async def _reap_idle_sessions(self) -> None:
+        """Stop sessions that received no command for idle_timeout_s.
+
+        The pending text is flushed as a FINAL, followed by an ERROR, in
+        case the client is still connected. The stop runs in the session's
+        command queue, so it never interleaves with a command of the session.
+        """
+        interval = min(30.0, self.idle_timeout_s / 4)
+        while True:
+            await asyncio.sleep(interval)
+            cutoff = self._now_ms() - int(self.idle_timeout_s * 1000)
+            idle = [s for s in self.sessions.values() if s.last_activity_ms < cutoff]
+            for session in idle:
+                queues = self.session_queues.get(session.connection)
+                if queues is None:
+                    await self._reap_session(session)
+                else:
+                    # Behind the session's queued commands, like a STOP from its client
+                    await queues.submit(session.session_id, lambda s=session: self._reap_session(s))
+
+    async def _reap_session(self, session: Session) -> None:
+        """Stop an idle session, unless it was stopped or used meanwhile."""
+        if self.sessions.get(session.session_id) is not session:
+            return  # stopped or disconnected meanwhile
+        if self._now_ms() - session.last_activity_ms < self.idle_timeout_s * 1000:
+            return  # a command queued ahead of the reap was handled first
+
+        logger.info(
+            f"Reaping session {session.session_id}: idle for over {self.idle_timeout_s:.0f}s"
+        )
+        try:
+            response = await self._handle_stop(StopCommand(session_id=session.session_id))
+        except Exception as e:
+            logger.error(f"Failed to flush idle session {session.session_id}: {e}")
+            self._close_session(session)
+            response = None
+        if session.emit:
+            if response:
+                await session.emit(response)
+            await session.emit(ErrorResponse(
+                session_id=session.session_id,
+                error=f"Session closed after {self.idle_timeout_s:.0f}s without commands",
+            ))
+
+    @property
+    def buffer_bytes(self) -> int:
+        """Audio ring memory allocated across sessions."""
+        return sum(s.audio_buffer.nbytes for s in self.sessions.values())
+
+    @staticmethod
+    def _now_ms() -> int:
+        return int(time.monotonic() * 1000)
+
+    def stats(self) -> dict:
+        """Snapshot of inference, batching and per-session decode backlog."""
+        sessions = {}
+        for session_id, session in self.sessions.items():
+            trigger = session.trigger
+            sessions[session_id] = {
+                "chunks": trigger.stats.chunks,
+                "decodes": trigger.stats.decodes,
+                "merged_chunks": trigger.stats.merged_chunks,
+                "deferred": trigger.stats.deferred,
+                "skipped_chunks": trigger.stats.skipped_chunks,
+                "backlog_chunks": trigger.backlog_chunks,
+                "max_backlog_chunks": trigger.stats.max_backlog_chunks,
+                "decode_in_flight": trigger.in_flight,
+                "flow_state": session.flow_state,
+                "dropped_chunks": session.dropped_chunks,
+                "buffered_bytes": len(session.audio_buffer) * 4,
+                "idle_ms": self._now_ms() - session.last_activity_ms,
+            }
+
+        inference = self.inference.stats if self.inference else None
+        scheduler = self.scheduler.stats if self.scheduler else None
+        return {
+            "inference": {
+                "in_flight": inference.in_flight,
+                "queued": inference.queued,
+                "completed": inference.completed,
+                "rejected": inference.rejected,
+            } if inference else {},
+            "scheduler": {
+                "batches": scheduler.batches,
+                "avg_batch_size": scheduler.avg_batch_size,
+            } if scheduler else {},
+            "startup": self.startup,
+            "outbound": {
+                "connections": len(self.outbound),
+                "queued": sum(len(q) for q in self.outbound),
+                "coalesced_partials": sum(q.coalesced for q in self.outbound),
+            },
+            "memory": {
+                "buffer_bytes": self.buffer_bytes,
+                "buffered_bytes": sum(len(s.audio_buffer) * 4 for s in self.sessions.values()),
+                "connections": len(self.connections),
+            },
+            "sessions": sessions,
+        }
 
     async def stop(self) -> None:
         """Stop the server."""
         logger.info("Shutting down Whisper STT server...")
 
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+
         if self.server:
             self.server.close()
             await self.server.wait_closed()
@@ -336,6 +1479,30 @@ class WhisperServer:
             if socket_file.exists():
                 socket_file.unlink()
 
+        if self.scheduler:
+            await self.scheduler.stop()
+            logger.info(
+                f"Scheduler stats: {self.scheduler.stats.batches} batches, "
+                f"avg batch size {self.scheduler.stats.avg_batch_size:.2f}"
+            )
+
+        if self.inference:
+            stats = self.inference.stats
+            logger.info(
+                f"Inference stats: {stats.completed} decodes, "
+                f"{stats.rejected} rejected, "
+                f"avg queue wait {stats.avg_queue_wait_ms:.1f}ms, "
+                f"avg run {stats.avg_run_ms:.1f}ms"
+            )
+            self.inference.shutdown()
+
+        if self.partial_scheduler:
+            await self.partial_scheduler.stop()
+        if self.partial_inference:
+            self.partial_inference.shutdown()
+        if self.partial_engine:
+            self.partial_engine.unload_model()
+
         if self.engine:
             self.engine.unload_model()
 
@@ -346,13 +1513,28 @@ async def run_server(
     socket_path: str | None = None,
     tcp_host: str | None = None,
     tcp_port: int | None = None,
+    workers: int = 0,
 ) -> None:
-    """Run the server with graceful shutdown."""
-    server = WhisperServer(
-        socket_path=socket_path,
-        tcp_host=tcp_host,
-        tcp_port=tcp_port,
-    )
+    """Run the server with graceful shutdown.
+
+    With workers > 0, runs a supervisor that spreads sessions over that many
+    worker processes instead of decoding in this process.
+    """
+    if workers > 0:
+        from .workers import SupervisorServer
+
+        server = SupervisorServer(
+            workers,
+            socket_path=socket_path,
+            tcp_host=tcp_host,
+            tcp_port=tcp_port,
+        )
+    else:
+        server = WhisperServer(
+            socket_path=socket_path,
+            tcp_host=tcp_host,
+            tcp_port=tcp_port,
+        )
 
     loop = asyncio.get_event_loop()
     shutdown_event = asyncio.Event()
@@ -391,6 +1573,12 @@ def main():
         default=None,
         help="TCP port (enables TCP mode, disables Unix socket)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKER_PROCESSES,
+        help=f"Worker processes, one engine each (0 = single process; default: {WORKER_PROCESSES})",
+    )
     args = parser.parse_args()
 
     # Determine mode from args or environment
@@ -402,10 +1590,10 @@ def main():
 
     if tcp_port:
         logger.info(f"Starting in TCP mode on {args.tcp_host}:{tcp_port}")
-        asyncio.run(run_server(tcp_host=args.tcp_host, tcp_port=tcp_port))
+        asyncio.run(run_server(tcp_host=args.tcp_host, tcp_port=tcp_port, workers=args.workers))
     else:
         logger.info(f"Starting in Unix socket mode at {socket_path}")
-        asyncio.run(run_server(socket_path=socket_path))
+        asyncio.run(run_server(socket_path=socket_path, workers=args.workers))
 
 
 if __name__ == "__main__":
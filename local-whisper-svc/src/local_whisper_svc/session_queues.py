@@ -0,0 +1,97 @@
+"""Per-session command queues for connections that carry several sessions.
+
+A client may multiplex any number of sessions over one connection (e.g. a
+small pool of long-lived sockets instead of one socket per room). Reading a
+connection is sequential, but handling its commands need not be: the reader
+only routes each command to its session's queue, and every session with
+queued commands has one task working through them in order. A STOP that
+waits for a decode then holds up only its own session's commands.
+
+Commands of one session are handled strictly in order; commands of
+different sessions run concurrently and their responses interleave on the
+connection's outbound queue, each tagged with its session_id.
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Awaitable, Callable, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Configuration from environment
+SESSION_QUEUE_SIZE = int(os.getenv("WHISPER_SESSION_QUEUE_SIZE", "256"))  # Commands queued per session
+
+T = TypeVar("T")
+
+
+class SessionQueues(Generic[T]):
+    """Ordered per-session command queues, drained concurrently across sessions."""
+
+    def __init__(
+        self,
+        handle: Callable[[T], Awaitable[None]],
+        max_queued: int = SESSION_QUEUE_SIZE,
+    ):
+        """
+        Args:
+            handle: Handles one command (called in order per session)
+            max_queued: Commands a session may have queued before submit()
+                waits, which in turn stops the connection's reader
+        """
+        self.handle = handle
+        self.max_queued = max(1, max_queued)
+        self._queues: dict[str, deque[T]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._space = asyncio.Condition()
+
+    def __len__(self) -> int:
+        """Commands queued across sessions."""
+        return sum(len(q) for q in self._queues.values())
+
+    @property
+    def active_sessions(self) -> int:
+        """Sessions with a command being handled or queued."""
+        return len(self._tasks)
+
+    async def submit(self, session_id: str, command: T) -> None:
+        """Queue a command behind the session's earlier ones."""
+        queue = self._queues.setdefault(session_id, deque())
+        if len(queue) >= self.max_queued:
+            async with self._space:
+                await self._space.wait_for(lambda: len(queue) < self.max_queued)
+            # The drain may have finished meanwhile and dropped the queue
+            queue = self._queues.setdefault(session_id, queue)
+
+        queue.append(command)
+        if session_id not in self._tasks:
+            self._tasks[session_id] = asyncio.create_task(self._drain(session_id, queue))
+
+    async def _drain(self, session_id: str, queue: deque[T]) -> None:
+        """Handle the session's commands until its queue is empty."""
+        try:
+            while queue:
+                command = queue.popleft()
+                async with self._space:
+                    self._space.notify_all()
+                try:
+                    await self.handle(command)
+                except Exception as e:
+                    logger.error(f"Error handling command for session {session_id}: {e}")
+        finally:
+            self._tasks.pop(session_id, None)
+            if not queue and self._queues.get(session_id) is queue:
+                del self._queues[session_id]
+
+    async def close(self) -> None:
+        """Drop queued commands and cancel the ones being handled."""
+        tasks = list(self._tasks.values())
+        for queue in self._queues.values():
+            queue.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Tasks cancelled before their first step never ran their cleanup
+        self._tasks.clear()
+        self._queues.clear()
@@ -0,0 +1,124 @@
+"""Speech spans of a session's stream and silence-squeezed decode windows.
+
+The VAD decides speech / non-speech for every 32 ms frame. SpeechSpans keeps
+the frames judged speech as merged spans on the stream clock (absolute
+samples since START, like AudioRingBuffer offsets), so a decode window can
+be built from the speech it contains instead of the raw buffer: leading and
+trailing silence is cut and long pauses are squeezed to a short gap. Whisper
+then spends no encoder or decoder work on silence, and a window with no
+speech at all needs no decode.
+
+Squeezing makes window time non-linear, so every compacted window comes
+with a WindowMap that maps word timestamps back to stream time.
+"""
+
+import os
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# Configuration from environment
+SQUEEZE_PAUSE_MS = int(os.getenv("WHISPER_SQUEEZE_PAUSE_MS", "300"))  # 0 = decode raw windows
+
+
+@dataclass
+class WindowMap:
+    """Maps sample positions in a decode window to the stream clock.
+
+    The window is made of pieces copied from the stream; piece i starts at
+    window sample `window_starts[i]` and stream sample `stream_starts[i]`.
+    """
+    window_starts: list[int] = field(default_factory=lambda: [0])
+    stream_starts: list[int] = field(default_factory=lambda: [0])
+
+    @classmethod
+    def contiguous(cls, stream_offset: int) -> "WindowMap":
+        """Map of an unsqueezed window starting at stream_offset."""
+        return cls([0], [stream_offset])
+
+    @property
+    def stream_start(self) -> int:
+        """Stream offset of the first sample of the window."""
+        return self.stream_starts[0]
+
+    def to_stream(self, seconds: float) -> float:
+        """Convert a time in the window (seconds) to stream time (seconds)."""
+        sample = seconds * SAMPLE_RATE
+        i = max(0, bisect_right(self.window_starts, sample) - 1)
+        return (self.stream_starts[i] + sample - self.window_starts[i]) / SAMPLE_RATE
+
+
+class SpeechSpans:
+    """Merged speech spans of one stream, in absolute samples."""
+
+    def __init__(self, squeeze_pause_ms: int = SQUEEZE_PAUSE_MS):
+        """
+        Args:
+            squeeze_pause_ms: Pauses longer than this are shortened to it in
+                compacted windows; half of it is kept around each span
+                (0 = never squeeze)
+        """
+        self.pad_samples = SAMPLE_RATE * squeeze_pause_ms // 2000
+        self.squeeze = squeeze_pause_ms > 0
+        self._spans: list[list[int]] = []  # [start, end) pairs, in order
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def add(self, start: int, end: int) -> None:
+        """Record a speech frame (or span) from start to end (samples)."""
+        if self._spans and start <= self._spans[-1][1]:
+            self._spans[-1][1] = max(self._spans[-1][1], end)
+        else:
+            self._spans.append([start, end])
+
+    def discard_until(self, offset: int) -> None:
+        """Forget speech before the stream offset (e.g. the buffer start)."""
+        while self._spans and self._spans[0][1] <= offset:
+            self._spans.pop(0)
+        if self._spans and self._spans[0][0] < offset:
+            self._spans[0][0] = offset
+
+    def compact(self, audio: np.ndarray, offset: int) -> tuple[np.ndarray, WindowMap]:
+        """Build a decode window from the speech in audio.
+
+        Args:
+            audio: Raw window (float32, 16kHz)
+            offset: Stream offset of its first sample
+
+        Returns:
+            (window, map) where window holds each speech span padded by up to
+            half the squeeze pause on both sides, with everything else cut.
+            The window is empty if audio holds no speech, and is audio itself
+            (no copy) if nothing would be cut.
+        """
+        end = offset + len(audio)
+        if not self.squeeze:
+            return audio, WindowMap.contiguous(offset)
+
+        keep: list[list[int]] = []
+        for s, e in self._spans:
+            if e <= offset or s >= end:
+                continue
+            s, e = max(offset, s - self.pad_samples), min(end, e + self.pad_samples)
+            if keep and s <= keep[-1][1]:
+                keep[-1][1] = max(keep[-1][1], e)
+            else:
+                keep.append([s, e])
+
+        if not keep:
+            return audio[:0], WindowMap.contiguous(offset)
+        if keep == [[offset, end]]:
+            return audio, WindowMap.contiguous(offset)
+
+        window_starts, stream_starts, pieces = [], [], []
+        position = 0
+        for s, e in keep:
+            window_starts.append(position)
+            stream_starts.append(s)
+            pieces.append(audio[s - offset:e - offset])
+            position += e - s
+        return np.concatenate(pieces), WindowMap(window_starts, stream_starts)
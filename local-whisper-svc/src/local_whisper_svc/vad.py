@@ -2,22 +2,45 @@
 
 Detects speech start/end events for utterance segmentation.
 Used to trigger forced commits on silence and segment audio for transcription.
+
+The model is shared; all per-stream state (recurrent state, context samples,
+hysteresis) lives in a VADState, one per session. VADBatcher evaluates the
+32 ms frames of every session that received audio in one batched forward
+pass per tick.
+
+The model ships with the silero-vad package, so loading it needs no network
+or torch.hub cache. torch is imported when the model is loaded.
+
+With WHISPER_VAD_BACKEND=onnx, OnnxSileroVAD runs the package's ONNX export
+of the same model on onnxruntime instead, so a worker whose Whisper model
+runs on CTranslate2 never imports torch at all.
 """
 
+import asyncio
+import importlib.util
 import os
 import logging
+from pathlib import Path
+
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Callable
 
-import torch
-
 logger = logging.getLogger(__name__)
 
 # Configuration from environment
 VAD_THRESHOLD = float(os.getenv("WHISPER_VAD_THRESHOLD", "0.5"))
 VAD_MIN_SPEECH_MS = int(os.getenv("WHISPER_VAD_MIN_SPEECH_MS", "250"))
 VAD_MIN_SILENCE_MS = int(os.getenv("WHISPER_VAD_MIN_SILENCE_MS", "300"))
+VAD_BATCH_WINDOW_MS = int(os.getenv("WHISPER_VAD_BATCH_WINDOW_MS", "0"))
+VAD_BACKEND = os.getenv("WHISPER_VAD_BACKEND", "torch")  # "torch" or "onnx"
+VAD_ONNX_PATH = os.getenv("WHISPER_VAD_ONNX_PATH", "")  # default: model bundled with silero-vad
+
+# Silero v5 operates on fixed 512-sample frames (32 ms at 16kHz), each
+# preceded by the last 64 samples of the previous frame.
+FRAME_SAMPLES = 512
+CONTEXT_SAMPLES = 64
+STATE_SHAPE = (2, 1, 128)
 
 
 @dataclass
@@ -28,11 +51,105 @@ class VADEvent:
     confidence: float = 1.0
 
 
+@dataclass
+class VADState:
+    """Per-stream VAD state: model recurrent state, context and hysteresis."""
+    threshold: float = VAD_THRESHOLD
+    min_speech_ms: int = VAD_MIN_SPEECH_MS
+    min_silence_ms: int = VAD_MIN_SILENCE_MS
+    rnn_state: np.ndarray = field(default_factory=lambda: np.zeros(STATE_SHAPE, dtype=np.float32))
+    context: np.ndarray = field(default_factory=lambda: np.zeros(CONTEXT_SAMPLES, dtype=np.float32))
+    pending: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.float32))
+    is_speaking: bool = False
+    speech_start_ms: int | None = None
+    silence_start_ms: int | None = None
+    current_ms: int = 0
+
+    def push(self, audio: np.ndarray) -> int:
+        """Append new samples; return how many whole frames are ready."""
+        if audio.dtype != np.float32:
+            audio = audio.astype(np.float32)
+        if len(self.pending):
+            self.pending = np.concatenate([self.pending, audio])
+        else:
+            self.pending = audio
+        return len(self.pending) // FRAME_SAMPLES
+
+    def take_frame(self) -> np.ndarray:
+        """Pop the next frame, prefixed with the context samples (576 samples)."""
+        frame = self.pending[:FRAME_SAMPLES]
+        self.pending = self.pending[FRAME_SAMPLES:]
+        x = np.concatenate([self.context, frame])
+        self.context = frame[-CONTEXT_SAMPLES:].copy()
+        return x
+
+    def update(self, speech_prob: float, chunk_ms: int) -> list[VADEvent]:
+        """Apply hysteresis to one frame's speech probability."""
+        events = []
+        is_speech = speech_prob >= self.threshold
+
+        if is_speech:
+            self.silence_start_ms = None
+
+            if not self.is_speaking:
+                if self.speech_start_ms is None:
+                    self.speech_start_ms = self.current_ms
+
+                speech_duration = self.current_ms - self.speech_start_ms + chunk_ms
+
+                if speech_duration >= self.min_speech_ms:
+                    self.is_speaking = True
+                    events.append(VADEvent(
+                        event_type="speech_start",
+                        timestamp_ms=self.speech_start_ms,
+                        confidence=speech_prob,
+                    ))
+
+            events.append(VADEvent(
+                event_type="speech",
+                timestamp_ms=self.current_ms,
+                confidence=speech_prob,
+            ))
+        else:
+            self.speech_start_ms = None
+
+            if self.is_speaking:
+                if self.silence_start_ms is None:
+                    self.silence_start_ms = self.current_ms
+
+                silence_duration = self.current_ms - self.silence_start_ms + chunk_ms
+
+                if silence_duration >= self.min_silence_ms:
+                    self.is_speaking = False
+                    events.append(VADEvent(
+                        event_type="speech_end",
+                        timestamp_ms=self.current_ms,
+                        confidence=1.0 - speech_prob,
+                    ))
+
+        self.current_ms += chunk_ms
+        return events
+
+    def reset(self) -> None:
+        """Reset state for a new stream."""
+        self.rnn_state = np.zeros(STATE_SHAPE, dtype=np.float32)
+        self.context = np.zeros(CONTEXT_SAMPLES, dtype=np.float32)
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.is_speaking = False
+        self.speech_start_ms = None
+        self.silence_start_ms = None
+        self.current_ms = 0
+
+
 class SileroVAD:
     """Silero VAD wrapper for speech detection.
 
     Uses the Silero VAD model to detect speech segments in audio.
     Implements hysteresis to avoid rapid toggling.
+
+    The model itself is stateless from the wrapper's point of view: every
+    forward pass takes and returns the recurrent state explicitly, so one
+    loaded model can serve any number of VADState streams.
     """
 
     def __init__(
@@ -56,10 +173,8 @@ class SileroVAD:
         self.sample_rate = sample_rate
 
         self.model = None
-        self._is_speaking = False
-        self._speech_start_ms: int | None = None
-        self._silence_start_ms: int | None = None
-        self._current_ms = 0
+        self._torch = None  # imported by load_model()
+        self._state = self.new_state()
 
         # Callbacks
         self._on_speech_start: Callable[[int], None] | None = None
@@ -70,85 +185,115 @@ class SileroVAD:
         if self.model is not None:
             return
 
+        import torch
+
         logger.info("Loading Silero VAD model")
-        self.model, _ = torch.hub.load(
-            repo_or_dir="snakers4/silero-vad",
-            model="silero_vad",
-            force_reload=False,
-            trust_repo=True,
-        )
+        try:
+            from silero_vad import load_silero_vad
+        except ImportError:
+            # Older installs without the package: fall back to torch.hub
+            # (needs the network or a hub cache)
+            logger.warning("silero-vad package not installed, loading from torch.hub")
+            self.model, _ = torch.hub.load(
+                repo_or_dir="snakers4/silero-vad",
+                model="silero_vad",
+                force_reload=False,
+                trust_repo=True,
+            )
+        else:
+            self.model = load_silero_vad()
+        self._torch = torch
         logger.info("Silero VAD model loaded")
 
-    def process_chunk(self, audio: np.ndarray) -> list[VADEvent]:
-        """Process an audio chunk and return VAD events.
+    def new_state(self) -> VADState:
+        """Create a fresh per-stream state with this VAD's thresholds."""
+        return VADState(
+            threshold=self.threshold,
+            min_speech_ms=self.min_speech_ms,
+            min_silence_ms=self.min_silence_ms,
+        )
+
+    @property
+    def frame_ms(self) -> int:
+        """Duration of one model frame in milliseconds."""
+        return FRAME_SAMPLES * 1000 // self.sample_rate
+
+    def forward(self, frames: np.ndarray, states: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Run one batched model step.
 
         Args:
-            audio: Audio samples as float32 numpy array (16kHz, mono)
+            frames: (batch, 576) float32 frames, context samples first
+            states: (2, batch, 128) float32 recurrent states
 
         Returns:
-            List of VADEvent objects (may be empty)
+            (speech probabilities of shape (batch,), new states)
         """
         if self.model is None:
             raise RuntimeError("Model not loaded. Call load_model() first.")
 
-        if audio.dtype != np.float32:
-            audio = audio.astype(np.float32)
+        torch = self._torch
+        with torch.no_grad():
+            out, new_states = self.model._model(
+                torch.from_numpy(frames),
+                torch.from_numpy(states),
+            )
+        return out.numpy().reshape(-1), new_states.numpy()
 
-        chunk_ms = int(len(audio) / self.sample_rate * 1000)
+    def process_frames(self, streams: list[VADState]) -> list[list[VADEvent]]:
+        """Evaluate all whole frames pending in each stream, batched across streams.
 
-        audio_tensor = torch.from_numpy(audio)
+        Frames are evaluated in rounds: round r runs one batched step over
+        every stream that still has an r-th frame pending.
 
-        speech_prob = self.model(audio_tensor, self.sample_rate).item()
+        Returns:
+            VAD events per stream, in input order
+        """
+        events: list[list[VADEvent]] = [[] for _ in streams]
+        frame_ms = self.frame_ms
 
-        events = []
-        is_speech = speech_prob >= self.threshold
+        while True:
+            active = [i for i, s in enumerate(streams) if len(s.pending) >= FRAME_SAMPLES]
+            if not active:
+                break
 
-        if is_speech:
-            self._silence_start_ms = None
+            frames = np.stack([streams[i].take_frame() for i in active])
+            states = np.concatenate([streams[i].rnn_state for i in active], axis=1)
 
-            if not self._is_speaking:
-                if self._speech_start_ms is None:
-                    self._speech_start_ms = self._current_ms
+            probs, new_states = self.forward(frames, states)
 
-                speech_duration = self._current_ms - self._speech_start_ms + chunk_ms
+            for j, i in enumerate(active):
+                stream = streams[i]
+                stream.rnn_state = np.ascontiguousarray(new_states[:, j:j + 1, :])
+                events[i].extend(stream.update(float(probs[j]), frame_ms))
 
-                if speech_duration >= self.min_speech_ms:
-                    self._is_speaking = True
-                    events.append(VADEvent(
-                        event_type="speech_start",
-                        timestamp_ms=self._speech_start_ms,
-                        confidence=speech_prob,
-                    ))
-                    if self._on_speech_start:
-                        self._on_speech_start(self._speech_start_ms)
+        return events
 
-            events.append(VADEvent(
-                event_type="speech",
-                timestamp_ms=self._current_ms,
-                confidence=speech_prob,
-            ))
-        else:
-            self._speech_start_ms = None
+    def process_chunk(self, audio: np.ndarray) -> list[VADEvent]:
+        """Process an audio chunk and return VAD events.
 
-            if self._is_speaking:
-                if self._silence_start_ms is None:
-                    self._silence_start_ms = self._current_ms
+        Args:
+            audio: One 32 ms frame as float32 numpy array (16kHz, mono);
+                shorter input is zero-padded
 
-                silence_duration = self._current_ms - self._silence_start_ms + chunk_ms
+        Returns:
+            List of VADEvent objects (may be empty)
+        """
+        if self.model is None:
+            raise RuntimeError("Model not loaded. Call load_model() first.")
 
-                if silence_duration >= self.min_silence_ms:
-                    self._is_speaking = False
-                    events.append(VADEvent(
-                        event_type="speech_end",
-                        timestamp_ms=self._current_ms,
-                        confidence=1.0 - speech_prob,
-                    ))
-                    if self._on_speech_end:
-                        duration_ms = self._current_ms - (self._silence_start_ms - self.min_silence_ms)
-                        self._on_speech_end(self._silence_start_ms, duration_ms)
-                    self._silence_start_ms = None
+        if len(audio) < FRAME_SAMPLES:
+            audio = np.pad(audio, (0, FRAME_SAMPLES - len(audio)))
+
+        self._state.push(audio)
+        events = self.process_frames([self._state])[0]
+
+        for event in events:
+            if event.event_type == "speech_start" and self._on_speech_start:
+                self._on_speech_start(event.timestamp_ms)
+            elif event.event_type == "speech_end" and self._on_speech_end:
+                silence_start_ms = event.timestamp_ms - self.min_silence_ms
+                self._on_speech_end(silence_start_ms, event.timestamp_ms - silence_start_ms)
 
-        self._current_ms += chunk_ms
         return events
 
     def process_audio(self, audio: np.ndarray, chunk_ms: int = 32) -> list[VADEvent]:
@@ -175,12 +320,7 @@ class SileroVAD:
 
     def reset(self) -> None:
         """Reset VAD state for a new stream."""
-        self._is_speaking = False
-        self._speech_start_ms = None
-        self._silence_start_ms = None
-        self._current_ms = 0
-        if self.model is not None:
-            self.model.reset_states()
+        self._state.reset()
 
     def on_speech_start(self, callback: Callable[[int], None]) -> None:
         """Register callback for speech start events.
@@ -201,9 +341,144 @@ class SileroVAD:
     @property
     def is_speaking(self) -> bool:
         """Check if currently detecting speech."""
-        return self._is_speaking
+        return self._state.is_speaking
 
     @property
     def is_loaded(self) -> bool:
         """Check if the model is loaded."""
         return self.model is not None
+
+
+class OnnxSileroVAD(SileroVAD):
+    """SileroVAD running the ONNX export of the model on onnxruntime.
+
+    Same interface, frames and state layout as the torch backend; the
+    recurrent state stays a numpy array end to end.
+    """
+
+    def __init__(self, *args, model_path: str = VAD_ONNX_PATH, **kwargs):
+        """
+        Args:
+            model_path: Silero ONNX model (default: the one bundled with the
+                silero-vad package)
+            *args, **kwargs: As for SileroVAD
+        """
+        super().__init__(*args, **kwargs)
+        self.model_path = model_path
+        self._sr = np.array(self.sample_rate, dtype=np.int64)
+
+    def load_model(self) -> None:
+        """Load the Silero ONNX model into an onnxruntime session."""
+        if self.model is not None:
+            return
+
+        import onnxruntime
+
+        path = self.model_path or str(bundled_model_path("silero_vad.onnx"))
+        logger.info(f"Loading Silero VAD model (onnxruntime): {path}")
+
+        # One frame batch is tiny; extra threads only add synchronization
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        self.model = onnxruntime.InferenceSession(
+            path, sess_options=options, providers=["CPUExecutionProvider"],
+        )
+        logger.info("Silero VAD model loaded")
+
+    def forward(self, frames: np.ndarray, states: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        if self.model is None:
+            raise RuntimeError("Model not loaded. Call load_model() first.")
+
+        out, new_states = self.model.run(
+            None, {"input": frames, "state": states, "sr": self._sr},
+        )
+        return out.reshape(-1), new_states
+
+
+def bundled_model_path(name: str) -> Path:
+    """Path of a model file shipped with the silero-vad package.
+
+    Found without importing the package, whose __init__ imports torch.
+    """
+    spec = importlib.util.find_spec("silero_vad")
+    if spec is None or not spec.submodule_search_locations:
+        raise RuntimeError("silero-vad package not installed; set WHISPER_VAD_ONNX_PATH")
+    return Path(spec.submodule_search_locations[0]) / "data" / name
+
+
+def create_vad(backend: str = VAD_BACKEND) -> SileroVAD:
+    """SileroVAD for the configured backend ("torch" or "onnx")."""
+    if backend == "onnx":
+        return OnnxSileroVAD()
+    if backend != "torch":
+        raise ValueError(f"Unknown VAD backend: {backend}")
+    return SileroVAD()
+
+
+class VADBatcher:
+    """Runs the VAD for all sessions in one batched forward pass per tick.
+
+    Each AUDIO command submits exactly the new samples for its session's
+    VADState. On each tick the batcher evaluates the pending frames of
+    every submitting session together and hands each session its events.
+    """
+
+    def __init__(self, vad: SileroVAD, batch_window_ms: int = VAD_BATCH_WINDOW_MS):
+        """
+        Args:
+            vad: Loaded SileroVAD (shared model)
+            batch_window_ms: How long a tick waits to collect more sessions
+                (0 = whatever was submitted in the same loop iteration)
+        """
+        self.vad = vad
+        self.batch_window_s = batch_window_ms / 1000
+        self._pending: list[tuple[VADState, asyncio.Future]] = []
+        self._flush_scheduled = False
+
+    async def process(self, state: VADState, audio: np.ndarray) -> list[VADEvent]:
+        """Submit new samples for one stream and wait for its VAD events."""
+        if state.push(audio) == 0:
+            return []
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((state, future))
+
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.create_task(self._flush())
+
+        return await future
+
+    async def _flush(self) -> None:
+        """Evaluate every stream submitted since the last tick."""
+        if self.batch_window_s > 0:
+            await asyncio.sleep(self.batch_window_s)
+        else:
+            await asyncio.sleep(0)
+
+        pending, self._pending = self._pending, []
+        self._flush_scheduled = False
+
+        # A stream may have submitted twice in one tick; evaluate it once
+        streams: list[VADState] = []
+        for state, _ in pending:
+            if not any(state is s for s in streams):
+                streams.append(state)
+
+        try:
+            stream_events = self.vad.process_frames(streams)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        delivered: set[int] = set()
+        for state, future in pending:
+            if future.done():
+                continue
+            index = next(i for i, s in enumerate(streams) if s is state)
+            # Events go to the first waiter of each stream
+            future.set_result([] if index in delivered else stream_events[index])
+            delivered.add(index)
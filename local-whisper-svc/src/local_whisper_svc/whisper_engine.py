@@ -2,15 +2,28 @@
 
 Provides streaming transcription with chunked audio processing.
 Supports GPU (CUDA) with float16 for best performance, with CPU fallback.
+
+Each decode runs with a DecodeProfile. PARTIAL_PROFILE (greedy, a single
+temperature, no word alignment) is for hypotheses that are only shown;
+COMMIT_PROFILE (the engine's beam size, temperature fallback and word
+timestamps) is for text that is about to be committed. Word alignment and
+beam search make up most of a CPU decode, so a hypothesis costs a fraction
+of a commit.
+
+faster_whisper (and CTranslate2 behind it) is imported when a model is
+loaded, not with this module, so processes that only handle the protocol
+(e.g. the worker supervisor) start without it.
 """
 
 import os
 import logging
+from math import ceil
 import numpy as np
 from dataclasses import dataclass, field
-from typing import Iterator
+from typing import TYPE_CHECKING, Callable, Iterator
 
-from faster_whisper import WhisperModel
+if TYPE_CHECKING:
+    from faster_whisper import WhisperModel
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +34,33 @@ WHISPER_DEVICE = os.getenv("WHISPER_DEVICE", "cuda")
 WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "5"))
 WHISPER_TEMPERATURE = os.getenv("WHISPER_TEMPERATURE", "0")  # "0" or "0,0.2,0.4,0.6,0.8,1.0"
 WHISPER_INITIAL_PROMPT = os.getenv("WHISPER_INITIAL_PROMPT", "")  # Style hint for punctuation
+WHISPER_NUM_WORKERS = int(os.getenv("WHISPER_NUM_WORKERS", "1"))  # Concurrent CTranslate2 decodes
+WHISPER_CPU_THREADS = int(os.getenv("WHISPER_CPU_THREADS", "0"))  # 0 = CTranslate2 default
+
+# Optional small model for PARTIAL hypotheses ("" = use WHISPER_MODEL for everything)
+WHISPER_PARTIAL_MODEL = os.getenv("WHISPER_PARTIAL_MODEL", "")
+WHISPER_PARTIAL_COMPUTE_TYPE = os.getenv("WHISPER_PARTIAL_COMPUTE_TYPE", "int8")
+WHISPER_PARTIAL_DEVICE = os.getenv("WHISPER_PARTIAL_DEVICE", WHISPER_DEVICE)
+WHISPER_PARTIAL_BEAM_SIZE = int(os.getenv("WHISPER_PARTIAL_BEAM_SIZE", "1"))
+
+
+@dataclass(frozen=True)
+class DecodeProfile:
+    """Decoding options chosen per call."""
+    name: str
+    beam_size: int | None = None  # None = the engine's beam size
+    word_timestamps: bool = True
+    temperature_fallback: bool = True  # False = first temperature only
+
+
+COMMIT_PROFILE = DecodeProfile("commit")
+PARTIAL_PROFILE = DecodeProfile(
+    "partial", beam_size=1, word_timestamps=False, temperature_fallback=False
+)
+
+# Punctuation merged into neighbouring words (faster-whisper defaults)
+PREPEND_PUNCTUATIONS = "\"'“¿([{-"
+APPEND_PUNCTUATIONS = "\"'.。,，!！?？:：”)]}、"
 
 
 @dataclass
@@ -57,6 +97,10 @@ class WhisperEngine:
         model_name: str = WHISPER_MODEL,
         device: str = WHISPER_DEVICE,
         compute_type: str = WHISPER_COMPUTE_TYPE,
+        num_workers: int = WHISPER_NUM_WORKERS,
+        cpu_threads: int = WHISPER_CPU_THREADS,
+        beam_size: int = WHISPER_BEAM_SIZE,
+        temperature: str = WHISPER_TEMPERATURE,
     ):
         """Initialize the Whisper engine.
 
@@ -64,11 +108,20 @@ class WhisperEngine:
             model_name: Whisper model to use (e.g., "large-v3-turbo")
             device: Device to use ("cuda" or "cpu")
             compute_type: Compute type ("float16", "int8", "float32")
+            num_workers: Number of transcribe() calls that may run concurrently
+                from different threads
+            cpu_threads: Threads per decode on CPU (0 = CTranslate2 default)
+            beam_size: Beam size for decoding
+            temperature: Temperature, or comma-separated fallback temperatures
         """
         self.model_name = model_name
         self.device = device
         self.compute_type = compute_type
-        self.model: WhisperModel | None = None
+        self.num_workers = max(1, num_workers)
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+        self.temperatures = parse_temperature(temperature)
+        self.model: "WhisperModel | None" = None
         self._sample_rate = 16000  # Whisper expects 16kHz audio
 
     def load_model(self) -> None:
@@ -77,6 +130,8 @@ class WhisperEngine:
             logger.warning("Model already loaded, skipping")
             return
 
+        from faster_whisper import WhisperModel
+
         logger.info(
             f"Loading Whisper model: {self.model_name} "
             f"(device={self.device}, compute_type={self.compute_type})"
@@ -87,10 +142,12 @@ class WhisperEngine:
                 self.model_name,
                 device=self.device,
                 compute_type=self.compute_type,
+                cpu_threads=self.cpu_threads,
+                num_workers=self.num_workers,
             )
             logger.info(
-                f"Whisper model loaded: beam_size={WHISPER_BEAM_SIZE}, "
-                f"temperature={WHISPER_TEMPERATURE}"
+                f"Whisper model loaded: beam_size={self.beam_size}, "
+                f"temperatures={list(self.temperatures)}, num_workers={self.num_workers}"
             )
         except Exception as e:
             if self.device == "cuda":
@@ -101,6 +158,8 @@ class WhisperEngine:
                     self.model_name,
                     device="cpu",
                     compute_type="int8",
+                    cpu_threads=self.cpu_threads,
+                    num_workers=self.num_workers,
                 )
                 logger.info("Whisper model loaded on CPU (fallback)")
             else:
@@ -111,55 +170,89 @@ class WhisperEngine:
         audio: np.ndarray,
         language: str | None = None,
         initial_prompt: str | None = None,
+        on_segment: Callable[[TranscriptionResult], None] | None = None,
+        profile: DecodeProfile = COMMIT_PROFILE,
     ) -> TranscriptionResult:
         """Transcribe audio data.
 
         Args:
-            audio: Audio samples as float32 numpy array (16kHz, mono)
+            audio: Audio samples as float32 numpy array normalized to [-1, 1]
+                (16kHz, mono); int16 arrays are normalized here
             language: Source language code (e.g., "en", "fr") or None for auto-detect
             initial_prompt: Optional prompt to guide transcription
+            on_segment: Called (on the decoding thread) with the result so far
+                each time a segment has been decoded
+            profile: Decoding options (beam, temperatures, word timestamps)
 
         Returns:
             TranscriptionResult with text, language, and word timings
         """
+        result = None
+        for result in self.transcribe_segments(audio, language, initial_prompt, profile):
+            if on_segment:
+                on_segment(result)
+        return result
+
+    def transcribe_segments(
+        self,
+        audio: np.ndarray,
+        language: str | None = None,
+        initial_prompt: str | None = None,
+        profile: DecodeProfile = COMMIT_PROFILE,
+    ) -> Iterator[TranscriptionResult]:
+        """Transcribe audio, yielding the result so far after each segment.
+
+        faster-whisper decodes segments lazily, so the text of the first
+        segments is available while the rest of the window is still being
+        decoded. The last result yielded is the complete transcription (an
+        empty one if there was no speech).
+
+        Args:
+            audio: Audio samples as float32 numpy array normalized to [-1, 1]
+                (16kHz, mono); int16 arrays are normalized here
+            language: Source language code (e.g., "en", "fr") or None for auto-detect
+            initial_prompt: Optional prompt to guide transcription
+            profile: Decoding options (beam, temperatures, word timestamps)
+
+        Yields:
+            Cumulative TranscriptionResult, one per decoded segment
+        """
         if self.model is None:
             raise RuntimeError("Model not loaded. Call load_model() first.")
 
-        if audio.dtype != np.float32:
-            audio = audio.astype(np.float32)
-
-        if audio.max() > 1.0 or audio.min() < -1.0:
-            audio = audio / 32768.0
+        audio = as_float32(audio)
 
         duration_seconds = len(audio) / self._sample_rate
 
         # Use env prompt if no explicit prompt provided
         prompt = initial_prompt if initial_prompt else (WHISPER_INITIAL_PROMPT or None)
 
-        # Parse temperature: single value or comma-separated fallback list
-        temp_str = WHISPER_TEMPERATURE
-        if "," in temp_str:
-            temperature = [float(t.strip()) for t in temp_str.split(",")]
-        else:
-            temperature = float(temp_str)
+        temperatures = self.temperatures if profile.temperature_fallback else self.temperatures[:1]
 
         segments, info = self.model.transcribe(
             audio,
             language=language,
             initial_prompt=prompt,
-            word_timestamps=True,
+            word_timestamps=profile.word_timestamps,
             vad_filter=False,  # We handle VAD separately
             condition_on_previous_text=True,
-            beam_size=WHISPER_BEAM_SIZE,
-            temperature=temperature,
+            beam_size=profile.beam_size or self.beam_size,
+            temperature=list(temperatures),
         )
 
-        segments_list = list(segments)
-
         text_parts = []
         words = []
 
-        for segment in segments_list:
+        def result() -> TranscriptionResult:
+            return TranscriptionResult(
+                text=" ".join(text_parts).strip(),
+                language=info.language,
+                language_confidence=info.language_probability,
+                words=list(words),
+                duration_seconds=duration_seconds,
+            )
+
+        for segment in segments:
             text_parts.append(segment.text)
             if segment.words:
                 for w in segment.words:
@@ -169,15 +262,196 @@ class WhisperEngine:
                         end=w.end,
                         confidence=w.probability,
                     ))
+            yield result()
+
+        if not text_parts:
+            yield result()
+
+    def transcribe_batch(
+        self,
+        audios: list[np.ndarray],
+        language: str | None = None,
+        initial_prompts: list[str | None] | None = None,
+        profile: DecodeProfile = COMMIT_PROFILE,
+    ) -> list[TranscriptionResult]:
+        """Transcribe several independent windows in one batched inference.
+
+        Windows are padded to 30 s and encoded together, then decoded with a
+        single generate() call (one prompt per window) and word-aligned
+        together (unless the profile skips word timestamps). Unlike
+        transcribe(), the batched path uses only the first temperature and
+        does not fall back to higher ones.
+
+        Args:
+            audios: Audio windows as float32 numpy arrays (16kHz, mono, <=30 s)
+            language: Shared language code, or None to detect per window
+            initial_prompts: Optional prompt per window
+            profile: Decoding options (beam, word timestamps)
+
+        Returns:
+            One TranscriptionResult per window, in input order
+        """
+        if self.model is None:
+            raise RuntimeError("Model not loaded. Call load_model() first.")
+
+        prompts = initial_prompts or [None] * len(audios)
+
+        if len(audios) == 1:
+            return [self.transcribe(
+                audios[0], language=language, initial_prompt=prompts[0], profile=profile
+            )]
+
+        if language is not None:
+            return self._transcribe_batch_language(audios, language, prompts, profile)
+
+        # Auto-detect: word alignment needs one tokenizer per batch,
+        # so detect each window's language and batch per language.
+        detected = [self.model.detect_language(audio=audio)[:2] for audio in audios]
+        by_language: dict[str, list[int]] = {}
+        for i, (lang, _) in enumerate(detected):
+            by_language.setdefault(lang, []).append(i)
+
+        results: list[TranscriptionResult | None] = [None] * len(audios)
+        for lang, indices in by_language.items():
+            batch_results = self._transcribe_batch_language(
+                [audios[i] for i in indices],
+                lang,
+                [prompts[i] for i in indices],
+                profile,
+            )
+            for i, result in zip(indices, batch_results):
+                result.language_confidence = detected[i][1]
+                results[i] = result
+
+        return results
+
+    def detect_language(
+        self,
+        audio: np.ndarray,
+        candidates: list[str] | None = None,
+    ) -> tuple[str, float]:
+        """Detect the spoken language of a window.
+
+        Args:
+            audio: Audio samples as float32 numpy array (16kHz, mono)
+            candidates: Language codes to choose from (None = any)
+
+        Returns:
+            (language, confidence); with candidates, the confidence is
+            renormalized over the candidate languages
+        """
+        if self.model is None:
+            raise RuntimeError("Model not loaded. Call load_model() first.")
+
+        language, probability, all_probs = self.model.detect_language(audio=as_float32(audio))
+        if not candidates:
+            return language, probability
+
+        probs = {lang: prob for lang, prob in all_probs if lang in candidates}
+        if not probs:
+            return candidates[0], 0.0
 
-        return TranscriptionResult(
-            text=" ".join(text_parts).strip(),
-            language=info.language,
-            language_confidence=info.language_probability,
-            words=words,
-            duration_seconds=duration_seconds,
+        best = max(probs, key=probs.get)
+        total = sum(probs.values())
+        return best, probs[best] / total if total > 0 else 0.0
+
+    def _transcribe_batch_language(
+        self,
+        audios: list[np.ndarray],
+        language: str,
+        initial_prompts: list[str | None],
+        profile: DecodeProfile = COMMIT_PROFILE,
+    ) -> list[TranscriptionResult]:
+        """Batched encode + generate + word alignment for one language."""
+        from faster_whisper.audio import pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+        from faster_whisper.transcribe import get_suppressed_tokens
+
+        model = self.model
+        tokenizer = Tokenizer(
+            model.hf_tokenizer,
+            model.model.is_multilingual,
+            task="transcribe",
+            language=language,
+        )
+
+        audios = [as_float32(a) for a in audios]
+        features = np.stack([pad_or_trim(model.feature_extractor(a)) for a in audios])
+        encoder_output = model.encode(features)
+
+        prompts = []
+        for initial_prompt in initial_prompts:
+            prompt_text = initial_prompt if initial_prompt else (WHISPER_INITIAL_PROMPT or None)
+            previous_tokens = tokenizer.encode(" " + prompt_text.strip()) if prompt_text else []
+            prompts.append(model.get_prompt(tokenizer, previous_tokens))
+
+        temperature = self.temperatures[0]
+        if temperature > 0:
+            sampling = {"beam_size": 1, "sampling_topk": 0, "sampling_temperature": temperature}
+        else:
+            sampling = {"beam_size": profile.beam_size or self.beam_size}
+
+        generated = model.model.generate(
+            encoder_output,
+            prompts,
+            max_length=model.max_length,
+            return_scores=True,
+            return_no_speech_prob=True,
+            suppress_blank=True,
+            suppress_tokens=get_suppressed_tokens(tokenizer, [-1]),
+            **sampling,
         )
 
+        durations = [len(a) / self._sample_rate for a in audios]
+        segment_sizes = []
+        segmented = []
+        for duration, output in zip(durations, generated):
+            segment_size = int(ceil(duration) * model.frames_per_second)
+            segment_sizes.append(segment_size)
+            subsegments, _, _ = model._split_segments_by_timestamps(
+                tokenizer=tokenizer,
+                tokens=output.sequences_ids[0],
+                time_offset=0.0,
+                segment_size=segment_size,
+                segment_duration=duration,
+                seek=0,
+            )
+            segmented.append(subsegments)
+
+        if profile.word_timestamps:
+            model.add_word_timestamps(
+                segmented,
+                tokenizer,
+                encoder_output,
+                segment_sizes,
+                PREPEND_PUNCTUATIONS,
+                APPEND_PUNCTUATIONS,
+                last_speech_timestamp=0.0,
+            )
+
+        results = []
+        for duration, subsegments in zip(durations, segmented):
+            text_parts = []
+            words = []
+            for subsegment in subsegments:
+                text_parts.append(tokenizer.decode(subsegment["tokens"]))
+                for w in subsegment.get("words", []):
+                    words.append(WordInfo(
+                        word=w["word"],
+                        start=w["start"],
+                        end=w["end"],
+                        confidence=w["probability"],
+                    ))
+            results.append(TranscriptionResult(
+                text=" ".join(text_parts).strip(),
+                language=language,
+                language_confidence=1.0,
+                words=words,
+                duration_seconds=duration,
+            ))
+
+        return results
+
     def transcribe_streaming(
         self,
         audio: np.ndarray,
@@ -260,6 +534,12 @@ class WhisperEngine:
         return self.model is not None
 
 
+def parse_temperature(value: str) -> tuple[float, ...]:
+    """Parse a temperature: single value or comma-separated fallback list."""
+    temperatures = tuple(float(t) for t in value.split(",") if t.strip())
+    return temperatures or (0.0,)
+
+
 def pcm_to_float32(pcm_bytes: bytes) -> np.ndarray:
     """Convert PCM bytes (16-bit signed, little-endian) to float32 numpy array.
 
@@ -272,3 +552,16 @@ def pcm_to_float32(pcm_bytes: bytes) -> np.ndarray:
     int16_audio = np.frombuffer(pcm_bytes, dtype=np.int16)
     float32_audio = int16_audio.astype(np.float32) / 32768.0
     return float32_audio
+
+
+def as_float32(audio: np.ndarray) -> np.ndarray:
+    """Return audio as normalized float32 without scanning its range.
+
+    float32 input is assumed to be normalized already and is returned as is
+    (no copy); int16 input is scaled to [-1, 1].
+    """
+    if audio.dtype == np.float32:
+        return audio
+    if audio.dtype == np.int16:
+        return audio.astype(np.float32) / 32768.0
+    return audio.astype(np.float32)
@@ -0,0 +1,658 @@
+"""Multi-process worker pool with session affinity.
+
+One WhisperServer process is limited by the GIL and a single event loop.
+In supervisor mode a front-end process accepts clients and forwards each
+session to one of N worker processes, each with its own engine and VAD:
+
+- START pins the session to the worker with the fewest active sessions;
+  every later command for that session goes to the same worker.
+- Audio (base64 AUDIO or binary frames) is decoded once in the front end
+  and written into a per-worker shared-memory ring; the worker only
+  receives the ring offset and length, not pickled PCM.
+- Workers put their responses on a queue that the front end routes back
+  to the client connection that sent the command.
+- When a client disconnects, the front end unpins its sessions and tells
+  every worker to drop them; sessions without commands for
+  WHISPER_SESSION_IDLE_S are stopped by the front end.
+
+Workers are started with the "spawn" method so no model, thread or event
+loop state is inherited. Unless WHISPER_CPU_THREADS is set, the cores are
+split evenly between workers.
+"""
+
+import asyncio
+import base64
+import ctypes
+import logging
+import multiprocessing as mp
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Callable
+
+from .outbound import WRITER_CLOSE_TIMEOUT_S, OutboundQueue, write_loop
+from .session_queues import SessionQueues
+from .protocol import (
+    AUDIO_FRAME_HEADER,
+    AUDIO_FRAME_MAGIC,
+    AudioCommand,
+    BusyResponse,
+    ErrorResponse,
+    ReadyResponse,
+    Response,
+    StartCommand,
+    StopCommand,
+    parse_audio_frame_header,
+    parse_command,
+)
+
+logger = logging.getLogger(__name__)
+
+# Configuration from environment
+WORKER_PROCESSES = int(os.getenv("WHISPER_WORKER_PROCESSES", "0"))  # 0 = single process
+WORKER_RING_MB = int(os.getenv("WHISPER_WORKER_RING_MB", "16"))  # Shared audio ring per worker
+RING_RETRY_S = 0.05  # Re-check a full ring in case a release notification was missed
+
+
+class SharedAudioRing:
+    """Single-producer, single-consumer byte ring in shared memory.
+
+    The front end writes PCM chunks; the worker reads them back in the same
+    order and publishes how far it has consumed through a shared counter.
+    Chunks never wrap: one that doesn't fit at the end starts at offset 0.
+
+    A producer blocked on a full ring raises a shared flag; the consumer
+    checks it after each read and notifies the producer once, so nothing
+    is sent per chunk while the ring has room.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, size: int, consumed, waiting, owner: bool):
+        self.shm = shm
+        self.size = size
+        self.consumed = consumed  # shared c_uint64: absolute bytes consumed
+        self.waiting = waiting  # shared c_bool: the producer waits for space
+        self.owner = owner
+        self._head = 0  # absolute bytes written (producer only)
+
+    @classmethod
+    def create(cls, size: int, ctx=mp) -> "SharedAudioRing":
+        """Allocate a ring (front end)."""
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        return cls(
+            shm, size,
+            ctx.Value(ctypes.c_uint64, 0, lock=False),
+            ctx.Value(ctypes.c_bool, False, lock=False),
+            owner=True,
+        )
+
+    @classmethod
+    def attach(cls, name: str, size: int, consumed, waiting) -> "SharedAudioRing":
+        """Attach to a ring created by another process (worker)."""
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, size, consumed, waiting, owner=False)
+
+    @property
+    def free_bytes(self) -> int:
+        return self.size - (self._head - self.consumed.value)
+
+    def write(self, data: bytes) -> int | None:
+        """Copy a chunk into the ring.
+
+        Returns:
+            Absolute start offset of the chunk, or None if there's no room yet
+        """
+        n = len(data)
+        if n > self.size:
+            raise ValueError(f"Chunk of {n} bytes exceeds ring size {self.size}")
+
+        pos = self._head % self.size
+        pad = self.size - pos if pos + n > self.size else 0
+        if pad + n > self.free_bytes:
+            return None
+
+        self._head += pad
+        pos = self._head % self.size
+        self.shm.buf[pos:pos + n] = data
+        start = self._head
+        self._head += n
+        return start
+
+    def read(self, start: int, n: int) -> bytes:
+        """Copy a chunk out of the ring and release its space."""
+        pos = start % self.size
+        data = bytes(self.shm.buf[pos:pos + n])
+        self.consumed.value = start + n
+        return data
+
+    def want_release(self) -> None:
+        """Ask the consumer to notify the producer after its next read."""
+        self.waiting.value = True
+
+    def release_wanted(self) -> bool:
+        """Whether the producer asked to be notified (consumer; resets the flag)."""
+        if not self.waiting.value:
+            return False
+        self.waiting.value = False
+        return True
+
+    def close(self) -> None:
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _worker_main(
+    index: int,
+    cmd_queue,
+    resp_queue,
+    ring_name: str,
+    ring_size: int,
+    consumed,
+    waiting,
+    engine_factory: Callable | None,
+) -> None:
+    """Worker process entry point."""
+    # Each worker gets its own metrics port next to the configured one
+    metrics_port = int(os.getenv("WHISPER_METRICS_PORT", "0"))
+    if metrics_port > 0:
+        os.environ["WHISPER_METRICS_PORT"] = str(metrics_port + 1 + index)
+
+    asyncio.run(_worker_loop(
+        index, cmd_queue, resp_queue, ring_name, ring_size, consumed, waiting, engine_factory,
+    ))
+
+
+async def _worker_loop(
+    index: int,
+    cmd_queue,
+    resp_queue,
+    ring_name: str,
+    ring_size: int,
+    consumed,
+    waiting,
+    engine_factory: Callable | None,
+) -> None:
+    """Run a listener-less WhisperServer fed from the command queue."""
+    from .server import WhisperServer
+
+    server = WhisperServer(engine=engine_factory() if engine_factory else None)
+    server.idle_timeout_s = 0  # the front end reaps idle sessions
+    await server.load()
+    ring = SharedAudioRing.attach(ring_name, ring_size, consumed, waiting)
+    loop = asyncio.get_running_loop()
+    logger.info(f"Worker {index} ready (pid {os.getpid()})")
+    resp_queue.put((None, index, "ready", None, None))
+
+    # Commands of one session are handled in order, sessions sharing a
+    # client connection concurrently, like the single-process server does
+    connections: dict[int, SessionQueues] = {}
+    tasks: set[asyncio.Task] = set()
+
+    def connection_queues(conn_id: int) -> SessionQueues:
+        async def emit(response: Response) -> None:
+            # Typed so the front end never parses the line to route it
+            resp_queue.put((conn_id, index, response.type, response.session_id, response.to_json()))
+
+        async def handle(msg: tuple) -> None:
+            if msg[0] == "line":
+                response = await server._dispatch_command(msg[2], emit, conn_id)
+            else:
+                _, _, session_id, seq, pcm = msg
+                session = server.sessions.get(session_id)
+                if session is None:
+                    response = ErrorResponse(session_id=session_id, error="Session not found")
+                elif seq >= 0:
+                    response = await server._ingest_frame(session, seq, pcm)
+                elif session.is_active:
+                    response = await server._ingest_audio(session, pcm)
+                else:
+                    response = None
+            if response:
+                await emit(response)
+
+        return SessionQueues(handle)
+
+    async def disconnect(conn_id: int, queues: SessionQueues | None) -> None:
+        if queues is not None:
+            await queues.close()
+        server.close_connection(conn_id)
+
+    while True:
+        msg = await loop.run_in_executor(None, cmd_queue.get)
+        if msg is None:
+            break
+
+        conn_id = msg[1]
+        if msg[0] == "disconnect":
+            task = asyncio.create_task(disconnect(conn_id, connections.pop(conn_id, None)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            continue
+
+        if msg[0] == "audio":
+            # Copy out right away so the ring space is released in order
+            _, conn_id, session_id, seq, start, n = msg
+            msg = ("audio", conn_id, session_id, seq, ring.read(start, n))
+            if ring.release_wanted():
+                resp_queue.put((None, index, "released", None, None))
+        else:
+            cmd = server._parse_command(msg[2])
+            msg = ("line", conn_id, cmd)
+            session_id = cmd.session_id if cmd else "unknown"
+
+        if conn_id not in connections:
+            connections[conn_id] = connection_queues(conn_id)
+        await connections[conn_id].submit(session_id, msg)
+
+    for queues in connections.values():
+        await queues.close()
+    for task in tasks:
+        task.cancel()
+    await server.stop()
+    ring.close()
+
+
+class WorkerPool:
+    """Front end of the worker pool: spawns workers and routes sessions."""
+
+    def __init__(
+        self,
+        num_workers: int,
+        engine_factory: Callable | None = None,
+        ring_bytes: int = WORKER_RING_MB * 1024 * 1024,
+    ):
+        """
+        Args:
+            num_workers: Worker processes to start
+            engine_factory: Picklable callable building each worker's engine
+                (None = load the configured Whisper model)
+            ring_bytes: Shared audio ring size per worker
+        """
+        self.num_workers = max(1, num_workers)
+        self.engine_factory = engine_factory
+        self.ring_bytes = ring_bytes
+
+        self.processes: list[mp.Process] = []
+        self.rings: list[SharedAudioRing] = []
+        self.cmd_queues: list = []
+        self.resp_queue = None
+        self.load: list[int] = [0] * self.num_workers  # active sessions per worker
+        self.session_workers: dict[str, int] = {}
+
+        self._ready = 0
+        self._ready_event = threading.Event()
+        self._space: list[asyncio.Event] = []  # set when a worker released ring space
+        self._pump: threading.Thread | None = None
+        self._dispatch: Callable[[int, str, str, str], None] | None = None
+
+    def start(self, dispatch: Callable[[int, str, str, str], None], loop: asyncio.AbstractEventLoop) -> None:
+        """Spawn the workers.
+
+        Args:
+            dispatch: Called on `loop` with (conn_id, type, session_id, line)
+                for every worker response
+            loop: Event loop the front end runs on
+        """
+        ctx = mp.get_context("spawn")
+        self.resp_queue = ctx.Queue()
+        self._dispatch = dispatch
+        self._space = [asyncio.Event() for _ in range(self.num_workers)]
+
+        # Split the cores between workers unless configured explicitly
+        if not os.getenv("WHISPER_CPU_THREADS"):
+            threads = max(1, (os.cpu_count() or 1) // self.num_workers)
+            os.environ["WHISPER_CPU_THREADS"] = str(threads)
+
+        for index in range(self.num_workers):
+            ring = SharedAudioRing.create(self.ring_bytes, ctx)
+            cmd_queue = ctx.Queue()
+            process = ctx.Process(
+                target=_worker_main,
+                args=(
+                    index, cmd_queue, self.resp_queue, ring.shm.name, ring.size,
+                    ring.consumed, ring.waiting, self.engine_factory,
+                ),
+                name=f"whisper-worker-{index}",
+                daemon=True,
+            )
+            process.start()
+            self.rings.append(ring)
+            self.cmd_queues.append(cmd_queue)
+            self.processes.append(process)
+
+        self._pump = threading.Thread(
+            target=self._pump_responses, args=(loop,), name="whisper-worker-responses", daemon=True
+        )
+        self._pump.start()
+
+    async def wait_ready(self) -> None:
+        """Wait until every worker has loaded its models.
+
+        Raises:
+            RuntimeError: A worker exited while loading
+        """
+        while not self._ready_event.is_set():
+            for process in self.processes:
+                if not process.is_alive():
+                    raise RuntimeError(f"{process.name} exited with code {process.exitcode}")
+            await asyncio.sleep(0.1)
+
+    def _pump_responses(self, loop: asyncio.AbstractEventLoop) -> None:
+        while True:
+            item = self.resp_queue.get()
+            if item is None:
+                return
+            conn_id, index, kind, session_id, line = item
+            if conn_id is None:
+                if kind == "released":
+                    loop.call_soon_threadsafe(self._space[index].set)
+                    continue
+                self._ready += 1
+                if self._ready == self.num_workers:
+                    self._ready_event.set()
+                continue
+            loop.call_soon_threadsafe(self._dispatch, conn_id, kind, session_id, line)
+
+    def assign(self, session_id: str) -> int:
+        """Pin a new session to the least-loaded worker."""
+        index = min(range(self.num_workers), key=lambda i: (self.load[i], i))
+        self.load[index] += 1
+        self.session_workers[session_id] = index
+        return index
+
+    def release(self, session_id: str) -> int | None:
+        """Unpin a stopped session; returns its worker."""
+        index = self.session_workers.pop(session_id, None)
+        if index is not None:
+            self.load[index] -= 1
+        return index
+
+    def send_line(self, index: int, conn_id: int, line: str) -> None:
+        self.cmd_queues[index].put(("line", conn_id, line))
+
+    def close_connection(self, conn_id: int) -> None:
+        """Tell every worker that a client connection is gone."""
+        for cmd_queue in self.cmd_queues:
+            cmd_queue.put(("disconnect", conn_id))
+
+    async def send_audio(self, index: int, conn_id: int, session_id: str, seq: int, pcm: bytes) -> None:
+        """Write PCM to the worker's ring and notify it (seq -1 = JSON AUDIO)."""
+        ring = self.rings[index]
+        start = ring.write(pcm)
+        while start is None:
+            # Worker is behind: have it notify us once it has read a chunk.
+            # Retry right after asking, in case it read in between, and
+            # now and then anyway in case a notification was missed.
+            space = self._space[index]
+            space.clear()
+            ring.want_release()
+            start = ring.write(pcm)
+            if start is None:
+                try:
+                    await asyncio.wait_for(space.wait(), RING_RETRY_S)
+                except asyncio.TimeoutError:
+                    pass
+                start = ring.write(pcm)
+        self.cmd_queues[index].put(("audio", conn_id, session_id, seq, start, len(pcm)))
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the workers and release shared memory."""
+        for cmd_queue in self.cmd_queues:
+            cmd_queue.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                logger.warning(f"{process.name} did not exit, terminating")
+                process.terminate()
+        if self.resp_queue is not None:
+            self.resp_queue.put(None)
+        if self._pump:
+            self._pump.join(timeout)
+        for ring in self.rings:
+            ring.close()
+
+
+class SupervisorServer:
+    """Front-end acceptor that forwards sessions to a WorkerPool.
+
+    Speaks the same protocol as WhisperServer on the same socket or port.
+    """
+
+    def __init__(
+        self,
+        num_workers: int,
+        socket_path: str | None = None,
+        tcp_host: str | None = None,
+        tcp_port: int | None = None,
+        engine_factory: Callable | None = None,
+    ):
+        from .server import MAX_SESSIONS, SESSION_IDLE_S
+
+        self.socket_path = socket_path
+        self.tcp_host = tcp_host
+        self.tcp_port = tcp_port
+        self.use_tcp = tcp_port is not None
+        self.pool = WorkerPool(num_workers, engine_factory=engine_factory)
+        self.max_sessions = MAX_SESSIONS  # across all workers
+        self.idle_timeout_s = SESSION_IDLE_S
+        self.server: asyncio.Server | None = None
+        self._reaper_task: asyncio.Task | None = None
+
+        self.outbound: dict[int, OutboundQueue] = {}  # per client connection
+        self.audio_channels: dict[int, str] = {}  # front-end channel -> session_id
+        self.pending_channels: dict[str, int] = {}  # channel to add to READY
+        self.session_conns: dict[str, int] = {}  # session_id -> owning connection
+        self.last_activity: dict[str, float] = {}  # session_id -> monotonic time of last command
+        self._next_conn = 1
+        self._next_audio_channel = 1
+
+    async def start(self) -> None:
+        """Spawn the workers, wait for them to load, then start listening."""
+        from .server import STREAM_LIMIT
+
+        self.pool.start(self._dispatch, asyncio.get_running_loop())
+        logger.info(f"Waiting for {self.pool.num_workers} workers to load...")
+        await self.pool.wait_ready()
+
+        if self.use_tcp:
+            self.server = await asyncio.start_server(
+                self._handle_client, host=self.tcp_host, port=self.tcp_port, limit=STREAM_LIMIT,
+            )
+            logger.info(f"Supervisor listening on TCP {self.tcp_host}:{self.tcp_port}")
+        else:
+            socket_file = Path(self.socket_path)
+            if socket_file.exists():
+                socket_file.unlink()
+            self.server = await asyncio.start_unix_server(
+                self._handle_client, path=self.socket_path, limit=STREAM_LIMIT,
+            )
+            os.chmod(self.socket_path, 0o666)
+            logger.info(f"Supervisor listening on Unix socket {self.socket_path}")
+
+        if self.idle_timeout_s > 0:
+            self._reaper_task = asyncio.create_task(self._reap_idle_sessions())
+
+    async def stop(self) -> None:
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if not self.use_tcp and self.socket_path:
+            socket_file = Path(self.socket_path)
+            if socket_file.exists():
+                socket_file.unlink()
+        await asyncio.get_running_loop().run_in_executor(None, self.pool.stop)
+
+    def _dispatch(self, conn_id: int, kind: str, session_id: str, line: str) -> None:
+        """Send a worker response to its client connection."""
+        outbound = self.outbound.get(conn_id)
+        if outbound is None:
+            return
+
+        if kind == "READY" and self.pending_channels:
+            # Channels are assigned here, so the worker's READY lacks it
+            channel = self.pending_channels.pop(session_id, None)
+            if channel is not None:
+                line = ReadyResponse(session_id=session_id, audio_channel=channel).to_json()
+
+        outbound.put(line, kind, session_id)
+
+    def _send(self, conn_id: int, response: Response) -> None:
+        """Send a response made by the front end itself."""
+        self._dispatch(conn_id, response.type, response.session_id, response.to_json())
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        conn_id = self._next_conn
+        self._next_conn += 1
+        peer = writer.get_extra_info("peername") or "unknown"
+        logger.info(f"Client connected: {peer}")
+
+        # Responses are written by their own task, as in WhisperServer
+        outbound = OutboundQueue()
+        self.outbound[conn_id] = outbound
+        writer_task = asyncio.create_task(write_loop(outbound, writer))
+
+        try:
+            while True:
+                first = await reader.read(1)
+                if not first:
+                    break
+
+                if first[0] == AUDIO_FRAME_MAGIC:
+                    header = first + await reader.readexactly(AUDIO_FRAME_HEADER.size - 1)
+                    try:
+                        channel, seq, num_samples = parse_audio_frame_header(header)
+                    except ValueError as e:
+                        logger.error(f"Bad audio frame from {peer}: {e}")
+                        break
+                    pcm = await reader.readexactly(num_samples * 2)
+                    await self._route_audio(conn_id, self.audio_channels.get(channel), seq, pcm)
+                else:
+                    line = (first + await reader.readline()).decode("utf-8").strip()
+                    if line:
+                        await self._route_line(conn_id, line)
+
+        except asyncio.CancelledError:
+            pass
+        except asyncio.IncompleteReadError:
+            logger.warning(f"Client {peer} closed mid-frame")
+        except Exception as e:
+            logger.error(f"Error handling client {peer}: {e}")
+        finally:
+            logger.info(f"Client disconnected: {peer}")
+            self._close_connection(conn_id)
+            outbound.close()
+            try:
+                await asyncio.wait_for(writer_task, WRITER_CLOSE_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                pass
+            self.outbound.pop(conn_id, None)
+            writer.close()
+            await writer.wait_closed()
+
+    async def _route_line(self, conn_id: int, line: str) -> None:
+        cmd = parse_command(line)
+        if cmd is None:
+            self._send(conn_id, ErrorResponse(session_id="unknown", error="Invalid command format"))
+            return
+
+        if isinstance(cmd, StartCommand):
+            active = len(self.pool.session_workers)
+            if 0 < self.max_sessions <= active and cmd.session_id not in self.pool.session_workers:
+                self._send(conn_id, BusyResponse(
+                    session_id=cmd.session_id,
+                    reason="Session capacity reached",
+                    active_sessions=active,
+                    max_sessions=self.max_sessions,
+                ))
+                return
+            if cmd.session_id in self.pool.session_workers:
+                # Restarted without STOP: the worker replaces the session
+                index = self.pool.session_workers[cmd.session_id]
+            else:
+                index = self.pool.assign(cmd.session_id)
+            self.session_conns[cmd.session_id] = conn_id
+            self.last_activity[cmd.session_id] = time.monotonic()
+            if cmd.binary_audio:
+                # Channels are global to the front end, so workers don't see them
+                channel = self._next_audio_channel
+                self._next_audio_channel += 1
+                self.audio_channels[channel] = cmd.session_id
+                self.pending_channels[cmd.session_id] = channel
+                cmd.binary_audio = False
+                line = cmd.to_json()
+            self.pool.send_line(index, conn_id, line)
+            return
+
+        index = self.pool.session_workers.get(cmd.session_id)
+        if index is None:
+            self._send(conn_id, ErrorResponse(session_id=cmd.session_id, error="Session not found"))
+            return
+
+        self.last_activity[cmd.session_id] = time.monotonic()
+        if isinstance(cmd, AudioCommand):
+            try:
+                pcm = base64.b64decode(cmd.pcm_b64)
+            except Exception as e:
+                self._send(conn_id, ErrorResponse(
+                    session_id=cmd.session_id, error=f"Invalid base64 audio: {e}"
+                ))
+                return
+            seq = -1 if cmd.seq is None else cmd.seq
+            await self.pool.send_audio(index, conn_id, cmd.session_id, seq, pcm)
+        elif isinstance(cmd, StopCommand):
+            self.pool.send_line(index, conn_id, line)
+            self._release_session(cmd.session_id)
+
+    def _release_session(self, session_id: str) -> None:
+        """Unpin a session and forget its channels and bookkeeping."""
+        self.pool.release(session_id)
+        self.pending_channels.pop(session_id, None)
+        self.session_conns.pop(session_id, None)
+        self.last_activity.pop(session_id, None)
+        for channel, channel_session in list(self.audio_channels.items()):
+            if channel_session == session_id:
+                del self.audio_channels[channel]
+
+    def _close_connection(self, conn_id: int) -> None:
+        """Release the sessions of a disconnected client, here and in the workers."""
+        for session_id, owner in list(self.session_conns.items()):
+            if owner == conn_id:
+                logger.info(f"Closing session {session_id}: client disconnected without STOP")
+                self._release_session(session_id)
+        self.pool.close_connection(conn_id)
+
+    async def _reap_idle_sessions(self) -> None:
+        """Stop sessions that received no command for idle_timeout_s.
+
+        The STOP goes through the owning worker, so the pending text is
+        flushed to the client if it is still connected; the client is also
+        sent an ERROR, as by WhisperServer.
+        """
+        interval = min(30.0, self.idle_timeout_s / 4)
+        while True:
+            await asyncio.sleep(interval)
+            cutoff = time.monotonic() - self.idle_timeout_s
+            for session_id, last in list(self.last_activity.items()):
+                if last < cutoff and session_id in self.session_conns:
+                    logger.info(f"Reaping session {session_id}: idle for over {self.idle_timeout_s:.0f}s")
+                    conn_id = self.session_conns[session_id]
+                    await self._route_line(conn_id, StopCommand(session_id=session_id).to_json())
+                    self._send(conn_id, ErrorResponse(
+                        session_id=session_id,
+                        error=f"Session closed after {self.idle_timeout_s:.0f}s without commands",
+                    ))
+
+    async def _route_audio(self, conn_id: int, session_id: str | None, seq: int, pcm: bytes) -> None:
+        index = self.pool.session_workers.get(session_id) if session_id else None
+        if index is None:
+            self._send(conn_id, ErrorResponse(
+                session_id=session_id or "unknown", error="Unknown audio channel"
+            ))
+            return
+        self.last_activity[session_id] = time.monotonic()
+        await self.pool.send_audio(index, conn_id, session_id, seq, pcm)
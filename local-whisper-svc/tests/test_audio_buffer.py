@@ -0,0 +1,122 @@
+"""Tests for the per-session float32 ring buffer."""
+
+import numpy as np
+import pytest
+from local_whisper_svc.audio_buffer import AudioRingBuffer, capacity_for_bytes
+
+
+def ramp(start: int, n: int) -> np.ndarray:
+    return np.arange(start, start + n, dtype=np.float32)
+
+
+class TestAudioRingBuffer:
+    """Test cases for AudioRingBuffer."""
+
+    def test_append_pcm_normalizes_once(self):
+        """PCM should be converted to normalized float32 on arrival."""
+        buf = AudioRingBuffer(100)
+        pcm = np.array([0, 16384, -32768], dtype=np.int16).tobytes()
+
+        samples = buf.append_pcm(pcm)
+
+        assert samples.dtype == np.float32
+        np.testing.assert_allclose(samples, [0.0, 0.5, -1.0])
+        np.testing.assert_allclose(buf.view(), [0.0, 0.5, -1.0])
+
+    def test_view_is_contiguous_across_wrap(self):
+        """A window that wraps the ring should still be one contiguous view."""
+        buf = AudioRingBuffer(10)
+        buf.append(ramp(0, 8))
+        buf.append(ramp(8, 6))  # wraps
+
+        view = buf.view()
+
+        np.testing.assert_array_equal(view, ramp(4, 10))
+        assert view.flags["C_CONTIGUOUS"]
+        assert view.base is not None  # a view, not a copy
+
+    def test_view_max_samples(self):
+        """view(n) should return the n newest samples."""
+        buf = AudioRingBuffer(10)
+        buf.append(ramp(0, 7))
+
+        np.testing.assert_array_equal(buf.view(3), ramp(4, 3))
+        np.testing.assert_array_equal(buf.view(50), ramp(0, 7))
+
+    def test_overflow_drops_oldest(self):
+        """Appending past capacity should keep only the newest samples."""
+        buf = AudioRingBuffer(5)
+        buf.append(ramp(0, 12))
+
+        np.testing.assert_array_equal(buf.view(), ramp(7, 5))
+        assert buf.total_samples == 12
+        assert buf.start_offset == 7
+        assert buf.dropped_samples == 7
+
+    def test_keep_last_and_clear_are_index_moves(self):
+        """Trimming should not touch the data, only the window."""
+        buf = AudioRingBuffer(10)
+        buf.append(ramp(0, 8))
+
+        buf.keep_last(3)
+        np.testing.assert_array_equal(buf.view(), ramp(5, 3))
+        assert buf.start_offset == 5
+
+        buf.clear()
+        assert len(buf) == 0
+        assert buf.view().size == 0
+        assert buf.total_samples == 8
+
+    def test_discard_until_absolute_offset(self):
+        """discard_until should cut at an absolute stream offset."""
+        buf = AudioRingBuffer(10)
+        buf.append(ramp(0, 6))
+        buf.append(ramp(6, 6))
+
+        buf.discard_until(9)
+
+        np.testing.assert_array_equal(buf.view(), ramp(9, 3))
+        np.testing.assert_array_equal(buf.view_from(10), ramp(10, 2))
+
+    def test_view_survives_appends_within_headroom(self):
+        """A view should stay valid until capacity - len(view) more samples arrive."""
+        buf = AudioRingBuffer(10)
+        buf.append(ramp(0, 6))
+        view = buf.view()
+
+        buf.append(ramp(6, 4))
+
+        np.testing.assert_array_equal(view, ramp(0, 6))
+
+    def test_room_after(self):
+        """room_after counts the samples that fit before an offset is overwritten."""
+        buf = AudioRingBuffer(10)
+        buf.append(ramp(0, 6))
+        buf.discard_until(4)
+
+        assert buf.room_after(0) == 4
+        assert buf.room_after(buf.start_offset) == 8
+        buf.append(ramp(6, 4))
+        assert buf.room_after(0) == 0
+        assert buf.dropped_samples == 0
+
+    def test_memory_is_flat(self):
+        """Long streams should not grow the backing array."""
+        buf = AudioRingBuffer(16000)
+        nbytes = buf.nbytes
+        for i in range(100):
+            buf.append_pcm(np.zeros(4000, dtype=np.int16).tobytes())
+
+        assert buf.nbytes == nbytes
+        assert len(buf) == 16000
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            AudioRingBuffer(0)
+
+    def test_capacity_for_bytes(self):
+        """A ring sized from a byte budget should allocate no more than it."""
+        buf = AudioRingBuffer(capacity_for_bytes(1024 * 1024))
+
+        assert buf.nbytes <= 1024 * 1024
+        assert buf.capacity == 131072
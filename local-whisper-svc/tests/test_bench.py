@@ -0,0 +1,59 @@
+"""Tests for the replay benchmark helpers."""
+
+import wave
+
+import numpy as np
+import pytest
+from local_whisper_svc.bench import FakeWhisperEngine, load_wav, percentiles
+
+
+class TestFakeWhisperEngine:
+    """Test cases for the fixed-cost stand-in engine."""
+
+    def test_words_follow_audio_length(self):
+        """One word per word_ms of audio, with increasing timestamps."""
+        engine = FakeWhisperEngine(fixed_cost_ms=0, cost_per_audio_s_ms=0, word_ms=500)
+
+        result = engine.transcribe(np.zeros(16000 * 2, dtype=np.float32), language="fr")
+
+        assert result.text == "w0 w1 w2 w3"
+        assert result.language == "fr"
+        assert [w.end for w in result.words] == [0.5, 1.0, 1.5, 2.0]
+
+    def test_is_loaded_is_a_property(self):
+        """is_loaded should be read like WhisperEngine.is_loaded, not called."""
+        assert FakeWhisperEngine().is_loaded is True
+
+    def test_batch_is_one_call(self):
+        """A batch should cost one call and return one result per window."""
+        engine = FakeWhisperEngine(fixed_cost_ms=0, cost_per_audio_s_ms=0)
+
+        results = engine.transcribe_batch([np.zeros(16000, dtype=np.float32)] * 3)
+
+        assert len(results) == 3
+        assert engine.calls == 1
+
+
+class TestBenchHelpers:
+    """Test cases for WAV loading and percentile reporting."""
+
+    def test_percentiles(self):
+        """Percentiles should be reported in milliseconds."""
+        stats = percentiles([0.1] * 99 + [1.0])
+
+        assert stats["count"] == 100
+        assert stats["p50_ms"] == 100.0
+        assert stats["max_ms"] == 1000.0
+        assert percentiles([]) == {"count": 0}
+
+    def test_load_wav_rejects_other_formats(self, tmp_path):
+        """Only 16 kHz mono 16-bit WAV should be accepted."""
+        path = tmp_path / "stereo.wav"
+        with wave.open(str(path), "wb") as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(b"\0" * 400)
+
+        with pytest.raises(ValueError):
+            load_wav(path)
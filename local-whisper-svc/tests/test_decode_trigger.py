@@ -0,0 +1,60 @@
+"""Tests for the per-session decode trigger."""
+
+from local_whisper_svc.decode_trigger import DecodeTrigger
+
+
+class TestDecodeTrigger:
+    """Test cases for DecodeTrigger."""
+
+    def test_waits_for_step(self):
+        """A decode should only be due once a step of new audio arrived."""
+        trigger = DecodeTrigger(step_samples=1000)
+
+        assert not trigger.add_chunk(400)
+        assert not trigger.add_chunk(400)
+        assert trigger.add_chunk(400)
+
+    def test_boundary_triggers_immediately(self):
+        """A VAD boundary should make a decode due regardless of step."""
+        trigger = DecodeTrigger(step_samples=1000)
+
+        assert trigger.add_chunk(100, boundary=True)
+
+    def test_chunks_during_decode_are_merged(self):
+        """Chunks arriving while a decode runs should fold into one next decode."""
+        trigger = DecodeTrigger(step_samples=100)
+        assert trigger.add_chunk(100)
+        assert trigger.begin() == 1
+
+        # In flight: nothing new starts, backlog accumulates
+        for _ in range(5):
+            assert not trigger.add_chunk(100)
+        assert trigger.backlog_chunks == 5
+
+        assert trigger.finish()  # backlog already due
+        assert trigger.begin() == 5
+        assert trigger.backlog_chunks == 0
+        assert trigger.stats.decodes == 2
+        assert trigger.stats.merged_chunks == 4
+        assert trigger.stats.max_backlog_chunks == 5
+
+    def test_finish_without_backlog(self):
+        """finish() should report nothing due when no audio arrived meanwhile."""
+        trigger = DecodeTrigger(step_samples=100)
+        trigger.add_chunk(100)
+        trigger.begin()
+
+        assert not trigger.finish()
+        assert not trigger.in_flight
+
+    def test_silent_chunks_are_skipped(self):
+        """Silence should only count towards a decode once speech is pending."""
+        trigger = DecodeTrigger(step_samples=100)
+
+        assert not trigger.add_chunk(100, speech=False)
+        assert trigger.backlog_samples == 0
+        assert trigger.stats.skipped_chunks == 1
+
+        assert not trigger.add_chunk(50)
+        assert trigger.add_chunk(50, speech=False)  # pending speech: counted
+        assert trigger.stats.skipped_chunks == 1
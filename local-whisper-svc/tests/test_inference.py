@@ -0,0 +1,158 @@
+"""Tests for the bounded inference executor."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from local_whisper_svc.inference import InferenceExecutor, InferenceQueueFull
+
+
+class TestInferenceExecutor:
+    """Test cases for InferenceExecutor."""
+
+    @pytest.mark.asyncio
+    async def test_runs_off_event_loop(self):
+        """Blocking calls should run on a worker thread, not the loop thread."""
+        executor = InferenceExecutor(workers=1, max_queue=1)
+        loop_thread = threading.get_ident()
+
+        worker_thread = await executor.run(threading.get_ident)
+
+        assert worker_thread != loop_thread
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_loop_keeps_running_during_decode(self):
+        """The loop should keep serving other tasks while a call is in flight."""
+        executor = InferenceExecutor(workers=1, max_queue=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        await executor.run(time.sleep, 0.1)
+        task.cancel()
+
+        assert ticks > 5
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_non_blocking_rejects_when_full(self):
+        """A non-blocking submission should fail fast when the queue is full."""
+        executor = InferenceExecutor(workers=1, max_queue=0)
+        release = threading.Event()
+
+        running = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(InferenceQueueFull):
+            await executor.run(lambda: None, block=False)
+        assert executor.stats.rejected == 1
+
+        release.set()
+        await running
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_records_timings(self):
+        """Queue wait and run time should be measured per call."""
+        executor = InferenceExecutor(workers=1, max_queue=2)
+
+        await asyncio.gather(
+            executor.run(time.sleep, 0.05),
+            executor.run(time.sleep, 0.05),
+        )
+
+        assert executor.stats.completed == 2
+        assert executor.stats.last_run_ms >= 40
+        assert executor.stats.last_queue_wait_ms >= 40
+        assert executor.stats.in_flight == 0
+        assert executor.stats.queued == 0
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_exception_propagates(self):
+        """Errors raised by the call should reach the caller."""
+        executor = InferenceExecutor(workers=1, max_queue=1)
+
+        def boom():
+            raise ValueError("decode failed")
+
+        with pytest.raises(ValueError):
+            await executor.run(boom)
+        assert executor.stats.failed == 1
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_counters_settle_under_concurrency(self):
+        """queued/in_flight should return to zero after many concurrent calls."""
+        executor = InferenceExecutor(workers=4, max_queue=64)
+
+        await asyncio.gather(*[executor.run(time.sleep, 0) for _ in range(500)])
+
+        assert executor.stats.queued == 0
+        assert executor.stats.in_flight == 0
+        assert executor.stats.completed == 500
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_wait_for_slot(self):
+        """wait_for_slot should return once a running call frees its slot."""
+        executor = InferenceExecutor(workers=1, max_queue=0)
+        hold = threading.Event()
+        running = asyncio.create_task(executor.run(hold.wait))
+        await asyncio.sleep(0)
+
+        waiter = asyncio.create_task(executor.wait_for_slot())
+        await asyncio.sleep(0.02)
+        assert not waiter.done()
+
+        hold.set()
+        await running
+        await asyncio.wait_for(waiter, 1)
+        assert not executor.is_full
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_holds_slot_until_done(self):
+        """Cancelling the caller doesn't free the slot while the thread still runs."""
+        executor = InferenceExecutor(workers=1, max_queue=0)
+        hold = threading.Event()
+        running = asyncio.create_task(executor.run(hold.wait, 5))
+        await asyncio.sleep(0.01)
+
+        running.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await running
+        await asyncio.sleep(0.01)
+        assert executor.is_full
+
+        hold.set()
+        await asyncio.wait_for(executor.wait_for_slot(), 1)
+        assert executor.stats.in_flight == 0 and executor.stats.queued == 0
+        executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_before_start_frees_slot(self):
+        """A call cancelled while still queued gives its slot back right away."""
+        executor = InferenceExecutor(workers=1, max_queue=1)
+        hold = threading.Event()
+        running = asyncio.create_task(executor.run(hold.wait, 5))
+        queued = asyncio.create_task(executor.run(lambda: None))
+        await asyncio.sleep(0.01)
+        assert executor.is_full
+
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+        assert not executor.is_full
+        assert executor.stats.queued == 0
+        hold.set()
+        await running
+        executor.shutdown()
@@ -1,7 +1,14 @@
 """Tests for LocalAgreement commit policy."""
 
 import pytest
-from local_whisper_svc.local_agreement import LocalAgreement, AgreementResult
+from local_whisper_svc.local_agreement import (
+    LocalAgreement,
+    AgreementResult,
+    WordAgreement,
+    committed_end_time,
+    committed_word_count,
+)
+from local_whisper_svc.whisper_engine import WordInfo
 
 
 class TestLocalAgreement:
@@ -121,6 +128,122 @@ class TestLocalAgreement:
         assert result.text == ""
 
 
+def timed_words(text: str, start: float = 0.0, step: float = 0.5) -> list[WordInfo]:
+    """One WordInfo per word, `step` seconds apart."""
+    return [
+        WordInfo(f" {word}", start + i * step, start + (i + 1) * step - 0.1)
+        for i, word in enumerate(text.split())
+    ]
+
+
+class TestWordAgreement:
+    """Test cases for WordAgreement."""
+
+    def test_commit_on_stable_words(self):
+        """Should commit the words the last N hypotheses agree on."""
+        agreement = WordAgreement(k=3, n=2, min_new_chars=5)
+
+        agreement.process("Hello world", timed_words("Hello world"))
+        result = agreement.process("Hello world how are", timed_words("Hello world how are"))
+
+        assert result.is_final is True
+        assert result.text == "Hello world"
+        assert result.end_time == pytest.approx(0.9)
+
+    def test_ignores_punctuation_and_case_changes(self):
+        """Words differing only in punctuation or case still agree."""
+        agreement = WordAgreement(k=3, n=2, min_new_chars=5)
+
+        agreement.process("hello world", timed_words("hello world"))
+        result = agreement.process("Hello world, how", timed_words("Hello world, how"))
+
+        assert result.is_final is True
+        assert result.text == "Hello world,"
+
+    def test_no_commit_when_words_differ(self):
+        """Should not commit when the first words differ."""
+        agreement = WordAgreement(k=3, n=2, min_new_chars=5)
+
+        agreement.process("Hello world", timed_words("Hello world"))
+        result = agreement.process("Hi there world", timed_words("Hi there world"))
+
+        assert result.is_final is False
+        assert result.text == "Hi there world"
+
+    def test_skips_committed_words_by_timestamp(self):
+        """Later hypotheses only report what follows the committed words."""
+        agreement = WordAgreement(k=3, n=2, min_new_chars=5)
+
+        agreement.process("one two three", timed_words("one two three"))
+        agreement.process("one two three four", timed_words("one two three four"))
+        result = agreement.process("one two three four five", timed_words("one two three four five"))
+
+        assert result.is_final is False
+        assert result.text == "four five"
+
+        result = agreement.process(
+            "one two three four five six", timed_words("one two three four five six")
+        )
+        assert result.is_final is True
+        assert result.text == "four five"
+
+    def test_window_offset_anchors_times(self):
+        """A window starting later in the stream lines up by its offset."""
+        agreement = WordAgreement(k=3, n=2, min_new_chars=5)
+
+        agreement.process("alpha beta gamma", timed_words("alpha beta gamma"))
+        agreement.process("alpha beta gamma delta", timed_words("alpha beta gamma delta"))
+
+        # Same stream, decoded from a window that starts 1 s in
+        result = agreement.process("gamma delta epsilon", timed_words("gamma delta epsilon"), offset=1.0)
+        assert result.text == "delta epsilon"
+
+    def test_without_word_timings(self):
+        """Falls back to the committed word count without timings."""
+        agreement = WordAgreement(k=3, n=2, min_new_chars=5)
+
+        agreement.process("one two three")
+        result = agreement.process("one two three four")
+        assert result.is_final is True
+        assert result.end_time is None
+
+        result = agreement.process("one two three four five")
+        assert result.text == "four five"
+
+    def test_force_commit(self):
+        """force_commit should commit the uncommitted words."""
+        agreement = WordAgreement(k=3, n=2, min_new_chars=5)
+
+        agreement.process("Hello world this is a test", timed_words("Hello world this is a test"))
+        result = agreement.force_commit()
+
+        assert result is not None
+        assert result.text == "Hello world this is a test"
+        assert agreement.force_commit() is None
+
+    def test_history_is_bounded(self):
+        """History keeps at most K uncommitted suffixes."""
+        agreement = WordAgreement(k=3, n=2, min_new_chars=1000)
+
+        for i in range(1, 10):
+            text = " ".join(f"w{j}" for j in range(i))
+            agreement.process(text, timed_words(text))
+
+        assert len(agreement.history) == 3
+
+    def test_reset(self):
+        """reset should clear history and the committed position."""
+        agreement = WordAgreement(k=3, n=2, min_new_chars=5)
+
+        agreement.process("Hello world", timed_words("Hello world"))
+        agreement.process("Hello world how", timed_words("Hello world how"))
+        agreement.reset()
+
+        assert len(agreement.history) == 0
+        assert agreement.committed_words == 0
+        assert agreement.committed_end is None
+
+
 class TestLongestCommonPrefix:
     """Test the LCP helper method."""
 
@@ -181,3 +304,44 @@ class TestWordBoundaryTrimming:
         agreement = LocalAgreement()
         trimmed = agreement._trim_to_word_boundary("")
         assert trimmed == ""
+
+
+class TestCommittedEndTime:
+    """Test cases for committed_end_time."""
+
+    def test_end_of_last_committed_word(self):
+        """Should return the end of the word that completes the committed text."""
+        words = [
+            WordInfo(" Hello", 0.0, 0.4),
+            WordInfo(" world,", 0.5, 0.9),
+            WordInfo(" how", 1.0, 1.2),
+        ]
+
+        assert committed_end_time(words, "Hello world,") == 0.9
+
+    def test_text_not_covered(self):
+        """Should return None when the words end before the committed text."""
+        words = [WordInfo(" Hello", 0.0, 0.4)]
+
+        assert committed_end_time(words, "Hello world") is None
+        assert committed_end_time(words, "") is None
+
+
+class TestCommittedWordCount:
+    """Test cases for committed_word_count."""
+
+    def test_counts_words_covering_text(self):
+        """Should count the leading words that make up the committed text."""
+        words = [
+            WordInfo(" Hello", 0.0, 0.4),
+            WordInfo(" world,", 0.5, 0.9),
+            WordInfo(" how", 1.0, 1.2),
+        ]
+
+        assert committed_word_count(words, "Hello world,") == 2
+        assert committed_word_count(words, "Hello world, how") == 3
+
+    def test_text_not_covered(self):
+        """Should return None when the words don't cover the text."""
+        assert committed_word_count([WordInfo(" Hello", 0.0, 0.4)], "Hello world") is None
+        assert committed_word_count([], "") is None
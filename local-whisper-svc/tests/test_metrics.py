@@ -0,0 +1,57 @@
+"""Tests for the optional Prometheus metrics."""
+
+import pytest
+from local_whisper_svc.metrics import ServiceMetrics
+
+prometheus_client = pytest.importorskip("prometheus_client")
+
+
+class TestServiceMetrics:
+    """Test cases for ServiceMetrics."""
+
+    def sample(self, metrics: ServiceMetrics, name: str, **labels) -> float | None:
+        return metrics.registry.get_sample_value(
+            name, dict(model="tiny", device="cpu", **labels)
+        )
+
+    def test_decode_observations(self):
+        """A decode should feed latency, window and real-time factor."""
+        metrics = ServiceMetrics("tiny", "cpu")
+
+        metrics.observe_decode(0.5, 2.0)
+
+        assert self.sample(metrics, "whisper_svc_decode_latency_seconds_sum") == 0.5
+        assert self.sample(metrics, "whisper_svc_decode_window_seconds_sum") == 2.0
+        assert self.sample(metrics, "whisper_svc_decode_rtf_sum") == 0.25
+
+    def test_response_counters(self):
+        """Forced FINALs should also count as forced commits."""
+        metrics = ServiceMetrics("tiny", "cpu")
+
+        metrics.count_response("PARTIAL")
+        metrics.count_response("FINAL")
+        metrics.count_response("FINAL", forced=True)
+
+        assert self.sample(metrics, "whisper_svc_partials_total") == 1
+        assert self.sample(metrics, "whisper_svc_finals_total") == 2
+        assert self.sample(metrics, "whisper_svc_forced_commits_total") == 1
+
+    def test_session_series_removed(self):
+        """A stopped session's buffered gauge should disappear."""
+        metrics = ServiceMetrics("tiny", "cpu")
+
+        metrics.set_buffered("s1", 1.5)
+        assert self.sample(metrics, "whisper_svc_buffered_seconds", session="s1") == 1.5
+
+        metrics.remove_session("s1")
+        assert self.sample(metrics, "whisper_svc_buffered_seconds", session="s1") is None
+
+    def test_disabled_is_noop(self):
+        """Disabled metrics should accept calls and never listen."""
+        metrics = ServiceMetrics("tiny", "cpu", enabled=False)
+
+        metrics.observe_decode(0.5, 2.0)
+        metrics.count_response("FINAL", forced=True)
+        metrics.remove_session("s1")
+
+        assert metrics.start_http_server(port=9999) is False
@@ -0,0 +1,126 @@
+"""Tests for the per-connection outbound queue."""
+
+import asyncio
+import json
+
+import pytest
+from local_whisper_svc.outbound import OutboundQueue
+from local_whisper_svc.protocol import ErrorResponse, FinalResponse, PartialResponse
+
+
+def partial(session_id: str, text: str) -> str:
+    return PartialResponse(session_id=session_id, text=text, language="en").to_json()
+
+
+def final(session_id: str, text: str) -> str:
+    return FinalResponse(session_id=session_id, text=text, language="en").to_json()
+
+
+def put(queue: OutboundQueue, line: str) -> None:
+    """Queue a response line, typed as its producer would."""
+    data = json.loads(line)
+    queue.put(line, data["type"], data["session_id"])
+
+
+async def drain(queue: OutboundQueue) -> list[str]:
+    queue.close()
+    lines = []
+    while (line := await queue.get()) is not None:
+        lines.append(line)
+    return lines
+
+
+class TestOutboundQueue:
+    """Test cases for OutboundQueue."""
+
+    @pytest.mark.asyncio
+    async def test_latest_partial_wins(self):
+        """Queued PARTIALs of a session are replaced by the newest one."""
+        queue = OutboundQueue()
+        put(queue, partial("a", "one"))
+        put(queue, partial("a", "one two"))
+        put(queue, partial("a", "one two three"))
+
+        assert len(queue) == 1
+        assert queue.coalesced == 2
+        assert await drain(queue) == [partial("a", "one two three")]
+
+    @pytest.mark.asyncio
+    async def test_other_responses_never_dropped(self):
+        """FINAL and ERROR are always sent, and a PARTIAL never overtakes them."""
+        queue = OutboundQueue()
+        put(queue, partial("a", "one"))
+        put(queue, final("a", "one two"))
+        put(queue, partial("a", "one two three"))
+        put(queue, ErrorResponse(session_id="a", error="x").to_json())
+        put(queue, partial("a", "one two three four"))
+
+        assert await drain(queue) == [
+            partial("a", "one"),
+            final("a", "one two"),
+            partial("a", "one two three"),
+            ErrorResponse(session_id="a", error="x").to_json(),
+            partial("a", "one two three four"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_sessions_coalesce_separately(self):
+        """Each session keeps its own newest PARTIAL."""
+        queue = OutboundQueue()
+        put(queue, partial("a", "a1"))
+        put(queue, partial("b", "b1"))
+        put(queue, partial("a", "a2"))
+
+        assert await drain(queue) == [partial("a", "a2"), partial("b", "b1")]
+
+    @pytest.mark.asyncio
+    async def test_other_session_keeps_coalescing(self):
+        """A FINAL of one session doesn't stop another session's PARTIALs coalescing."""
+        queue = OutboundQueue()
+        put(queue, partial("a", "a1"))
+        put(queue, partial("b", "b1"))
+        put(queue, final("a", "a1 a2"))
+        put(queue, partial("b", "b2"))
+        put(queue, partial("a", "a3"))
+
+        assert await drain(queue) == [
+            partial("a", "a1"),
+            partial("b", "b2"),
+            final("a", "a1 a2"),
+            partial("a", "a3"),
+        ]
+        assert queue.coalesced == 1
+
+    @pytest.mark.asyncio
+    async def test_typed_by_producer(self):
+        """Lines are coalesced by the type and session they are put with, unparsed."""
+        queue = OutboundQueue()
+        queue.put("a1", "PARTIAL", "a")
+        queue.put("a2", "PARTIAL", "a")
+        queue.put(partial("a", "not coalesced"), "FLOW", "a")
+
+        assert await drain(queue) == ["a2", partial("a", "not coalesced")]
+
+    @pytest.mark.asyncio
+    async def test_partial_after_write_is_queued(self):
+        """A PARTIAL that was already taken by the writer isn't replaced."""
+        queue = OutboundQueue()
+        put(queue, partial("a", "one"))
+        assert await queue.get() == partial("a", "one")
+
+        put(queue, partial("a", "one two"))
+        assert await drain(queue) == [partial("a", "one two")]
+
+    @pytest.mark.asyncio
+    async def test_get_waits_for_put(self):
+        """get() waits for a response, and returns None once closed."""
+        queue = OutboundQueue()
+        getter = asyncio.create_task(queue.get())
+        await asyncio.sleep(0)
+        assert not getter.done()
+
+        put(queue, final("a", "done"))
+        assert await getter == final("a", "done")
+
+        queue.close()
+        assert await queue.get() is None
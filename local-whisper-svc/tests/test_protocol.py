@@ -0,0 +1,142 @@
+"""Tests for the JSON-lines protocol and binary audio frames."""
+
+import json
+
+import pytest
+from local_whisper_svc.protocol import (
+    AUDIO_FRAME_HEADER,
+    AudioFrame,
+    BusyResponse,
+    FinalResponse,
+    FLOW_THROTTLE,
+    FlowResponse,
+    PartialResponse,
+    ReadyResponse,
+    ResponseTiming,
+    StartCommand,
+    WordInfo,
+    parse_audio_frame_header,
+    parse_command,
+)
+
+
+class TestBinaryAudioFrames:
+    """Test cases for binary audio framing."""
+
+    def test_round_trip(self):
+        """A frame should parse back to its channel, seq and sample count."""
+        pcm = bytes(range(200))
+        data = AudioFrame(audio_channel=7, seq=42, pcm=pcm).to_bytes()
+
+        header, payload = data[:AUDIO_FRAME_HEADER.size], data[AUDIO_FRAME_HEADER.size:]
+
+        assert parse_audio_frame_header(header) == (7, 42, 100)
+        assert payload == pcm
+
+    def test_frame_never_looks_like_json(self):
+        """Frames must be distinguishable from JSON lines by the first byte."""
+        data = AudioFrame(audio_channel=1, seq=0, pcm=b"\x00\x00").to_bytes()
+        assert data[0:1] != b"{"
+
+    def test_bad_magic(self):
+        header = AUDIO_FRAME_HEADER.pack(0x7B, 1, 0, 10)
+        with pytest.raises(ValueError):
+            parse_audio_frame_header(header)
+
+    def test_oversized_frame(self):
+        header = AUDIO_FRAME_HEADER.pack(0, 1, 0, 10**9)
+        with pytest.raises(ValueError):
+            parse_audio_frame_header(header)
+
+
+class TestBinaryNegotiation:
+    """Test cases for negotiating binary audio in START/READY."""
+
+    def test_start_binary_audio_flag(self):
+        cmd = parse_command(StartCommand(session_id="s1", binary_audio=True).to_json())
+        assert cmd.binary_audio is True
+
+    def test_start_defaults_to_json_audio(self):
+        cmd = parse_command('{"cmd": "START", "session_id": "s1"}')
+        assert cmd.binary_audio is False
+
+    def test_ready_includes_channel_only_when_negotiated(self):
+        assert "audio_channel" not in json.loads(ReadyResponse("s1").to_json())
+        assert json.loads(ReadyResponse("s1", audio_channel=3).to_json())["audio_channel"] == 3
+
+
+class TestFlowControlResponses:
+    """Test cases for BUSY and FLOW responses."""
+
+    def test_busy_json(self):
+        """BUSY should carry the capacity numbers."""
+        data = json.loads(BusyResponse("s1", "Session capacity reached", 8, 8).to_json())
+
+        assert data == {
+            "type": "BUSY",
+            "session_id": "s1",
+            "reason": "Session capacity reached",
+            "active_sessions": 8,
+            "max_sessions": 8,
+        }
+
+    def test_flow_json(self):
+        """FLOW should carry the state and backlog."""
+        data = json.loads(FlowResponse("s1", FLOW_THROTTLE, 3200, 4100).to_json())
+
+        assert data["type"] == "FLOW"
+        assert data["state"] == "throttle"
+        assert data["backlog_ms"] == 3200
+
+
+class TestFinalResponse:
+    """Test cases for FINAL serialization."""
+
+    def test_delta_words_and_commit_seq(self):
+        """FINAL carries the committed span's words and its sequence number."""
+        final = FinalResponse(
+            session_id="s1",
+            text="Hello world how",
+            language="en",
+            words=[WordInfo(" how", 12.5, 12.8)],
+            committed_prefix="Hello world how",
+            commit_seq=3,
+        )
+
+        msg = json.loads(final.to_json())
+        assert msg["commit_seq"] == 3
+        assert msg["words"] == [{"word": " how", "start": 12.5, "end": 12.8, "confidence": 1.0}]
+        assert msg["tts_final"] is False
+
+
+class TestResponseTiming:
+    """Test cases for the opt-in latency breakdown."""
+
+    def test_start_timing_flag(self):
+        assert parse_command(StartCommand(session_id="s1", timing=True).to_json()).timing is True
+        assert parse_command('{"cmd": "START", "session_id": "s1"}').timing is False
+
+    def test_audio_seq_is_optional(self):
+        """AUDIO may carry the client's chunk number; anything but an int is ignored."""
+        assert parse_command('{"cmd": "AUDIO", "session_id": "s1", "pcm_b64": "", "seq": 4}').seq == 4
+        assert parse_command('{"cmd": "AUDIO", "session_id": "s1", "pcm_b64": "", "seq": "x"}').seq is None
+        assert parse_command('{"cmd": "AUDIO", "session_id": "s1", "pcm_b64": ""}').seq is None
+
+    def test_timing_only_when_requested(self):
+        """PARTIAL/FINAL only carry a timing object when one is set."""
+        assert "timing" not in json.loads(PartialResponse("s1", "hi", "en").to_json())
+
+        timing = ResponseTiming(
+            chunk_seq=7, chunk_recv_ms=1000, window_s=2.5, stream_end_s=12.0,
+            queued_ms=15, decode_start_ms=1020, decode_end_ms=1180,
+        )
+        msg = json.loads(FinalResponse("s1", "hi", "en", timing=timing).to_json())
+        assert msg["timing"] == {
+            "chunk_seq": 7,
+            "chunk_recv_ms": 1000,
+            "window_s": 2.5,
+            "stream_end_s": 12.0,
+            "queued_ms": 15,
+            "decode_start_ms": 1020,
+            "decode_end_ms": 1180,
+        }
@@ -0,0 +1,204 @@
+"""Tests for the cross-session batched decode scheduler."""
+
+import asyncio
+
+import numpy as np
+import pytest
+from local_whisper_svc.inference import InferenceExecutor
+from local_whisper_svc.scheduler import DecodeScheduler, DecodeTiming
+from local_whisper_svc.whisper_engine import COMMIT_PROFILE, PARTIAL_PROFILE, TranscriptionResult
+
+
+class FakeEngine:
+    """Records batch shapes and echoes each window's length as text."""
+
+    def __init__(self):
+        self.batches: list[tuple[int, str | None]] = []
+
+    def transcribe_batch(self, audios, language=None, initial_prompts=None, profile=None):
+        self.batches.append((len(audios), language))
+        return [
+            TranscriptionResult(text=f"{len(a)} {prompt}", language=language or "en")
+            for a, prompt in zip(audios, initial_prompts)
+        ]
+
+    def transcribe(self, audio, language=None, initial_prompt=None, on_segment=None, profile=None):
+        """Reports one segment per second of audio."""
+        self.batches.append((1, language))
+        text = ""
+        for i in range(int(len(audio) / 16000)):
+            text = f"{text} s{i}".strip()
+            on_segment(TranscriptionResult(text=text, language=language or "en"))
+        return TranscriptionResult(text=text, language=language or "en")
+
+
+def window(seconds: float) -> np.ndarray:
+    return np.zeros(int(16000 * seconds), dtype=np.float32)
+
+
+class TestDecodeScheduler:
+    """Test cases for DecodeScheduler."""
+
+    @pytest.mark.asyncio
+    async def test_batches_concurrent_sessions(self):
+        """Windows submitted in the same tick should run as one batch."""
+        engine = FakeEngine()
+        scheduler = DecodeScheduler(engine, InferenceExecutor(workers=1), batch_window_ms=10)
+        scheduler.start()
+
+        await asyncio.gather(*[
+            scheduler.decode(f"s{i}", window(2), language="en", initial_prompt=f"p{i}")
+            for i in range(4)
+        ])
+
+        assert engine.batches == [(4, "en")]
+        assert scheduler.stats.avg_batch_size == 4
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_results_routed_to_submitter(self):
+        """Each session should get the result of its own window."""
+        engine = FakeEngine()
+        scheduler = DecodeScheduler(engine, InferenceExecutor(workers=1), batch_window_ms=10)
+        scheduler.start()
+
+        results = await asyncio.gather(*[
+            scheduler.decode(f"s{i}", window(1 + i * 0.5), language="en", initial_prompt=f"p{i}")
+            for i in range(3)
+        ])
+
+        assert [r.text for r in results] == ["16000 p0", "24000 p1", "32000 p2"]
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_groups_by_language_and_length(self):
+        """Different languages and length buckets should not share a batch."""
+        engine = FakeEngine()
+        scheduler = DecodeScheduler(
+            engine, InferenceExecutor(workers=1), batch_window_ms=10, buckets_s="5,30",
+        )
+        scheduler.start()
+
+        await asyncio.gather(
+            scheduler.decode("a", window(2), language="en"),
+            scheduler.decode("b", window(3), language="en"),
+            scheduler.decode("c", window(2), language="fr"),
+            scheduler.decode("d", window(20), language="en"),
+        )
+
+        assert sorted(engine.batches) == [(1, "en"), (1, "fr"), (2, "en")]
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_max_batch_size(self):
+        """Buckets larger than max_batch_size should be split."""
+        engine = FakeEngine()
+        scheduler = DecodeScheduler(
+            engine, InferenceExecutor(workers=1), batch_window_ms=10, max_batch_size=2,
+        )
+        scheduler.start()
+
+        await asyncio.gather(*[
+            scheduler.decode(f"s{i}", window(1), language="en") for i in range(5)
+        ])
+
+        assert sorted(size for size, _ in engine.batches) == [1, 2, 2]
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_profiles_not_batched_together(self):
+        """Partial and commit decodes should run as separate batches."""
+        profiles = []
+
+        class ProfileEngine(FakeEngine):
+            def transcribe_batch(self, audios, language=None, initial_prompts=None, profile=None):
+                profiles.append((len(audios), profile.name))
+                return super().transcribe_batch(audios, language, initial_prompts)
+
+        scheduler = DecodeScheduler(ProfileEngine(), InferenceExecutor(workers=1), batch_window_ms=10)
+        scheduler.start()
+
+        await asyncio.gather(*[
+            scheduler.decode(f"s{i}", window(2), language="en", profile=profile)
+            for i, profile in enumerate([PARTIAL_PROFILE, COMMIT_PROFILE] * 2)
+        ])
+
+        assert sorted(profiles) == [(2, "commit"), (2, "partial")]
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_timing_milestones(self):
+        """A DecodeTiming should record submission, engine start and end in order."""
+        scheduler = DecodeScheduler(FakeEngine(), InferenceExecutor(workers=1), batch_window_ms=10)
+        scheduler.start()
+
+        timings = [DecodeTiming(), DecodeTiming()]
+        await asyncio.gather(*[
+            scheduler.decode(f"s{i}", window(1), language="en", timing=timing)
+            for i, timing in enumerate(timings)
+        ])
+
+        for timing in timings:
+            assert 0 < timing.submitted_ms <= timing.started_ms <= timing.finished_ms
+        # Windows of one batch share its engine call
+        assert timings[0].started_ms == timings[1].started_ms
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_engine_error_reaches_all_sessions(self):
+        """A failed batch should fail every request in it."""
+
+        class FailingEngine:
+            def transcribe_batch(self, audios, language=None, initial_prompts=None, profile=None):
+                raise RuntimeError("CUDA out of memory")
+
+        scheduler = DecodeScheduler(FailingEngine(), InferenceExecutor(workers=1), batch_window_ms=10)
+        scheduler.start()
+
+        results = await asyncio.gather(
+            scheduler.decode("a", window(1), language="en"),
+            scheduler.decode("b", window(1), language="en"),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_streams_segments_of_single_window(self):
+        """A window decoded on its own reports each segment before its result."""
+        engine = FakeEngine()
+        scheduler = DecodeScheduler(engine, InferenceExecutor(workers=1), batch_window_ms=10)
+        scheduler.start()
+
+        segments = []
+
+        async def on_segment(result):
+            segments.append(result.text)
+
+        result = await scheduler.decode("a", window(3), language="en", on_segment=on_segment)
+
+        assert segments == ["s0", "s0 s1", "s0 s1 s2"]
+        assert result.text == "s0 s1 s2"
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_batched_windows_do_not_stream(self):
+        """Windows sharing a batch get only their final results."""
+        engine = FakeEngine()
+        scheduler = DecodeScheduler(engine, InferenceExecutor(workers=1), batch_window_ms=10)
+        scheduler.start()
+
+        segments = []
+
+        async def on_segment(result):
+            segments.append(result.text)
+
+        await asyncio.gather(*[
+            scheduler.decode(f"s{i}", window(2), language="en", on_segment=on_segment)
+            for i in range(2)
+        ])
+
+        assert engine.batches == [(2, "en")]
+        assert segments == []
+        await scheduler.stop()
@@ -0,0 +1,535 @@
+"""Server-level tests of the decode pipeline, with a stand-in engine and VAD."""
+
+import asyncio
+import json
+import threading
+
+import numpy as np
+import pytest
+from local_whisper_svc.bench import FakeWhisperEngine
+from local_whisper_svc.inference import INFERENCE_QUEUE_SIZE, InferenceExecutor
+from local_whisper_svc.protocol import FLOW_DROP, FLOW_OK, StartCommand, StopCommand
+from local_whisper_svc import server as server_module
+from local_whisper_svc.scheduler import DecodeScheduler
+from local_whisper_svc.server import WhisperServer
+from local_whisper_svc.whisper_engine import (
+    COMMIT_PROFILE,
+    PARTIAL_PROFILE,
+    TranscriptionResult,
+    WordInfo,
+)
+from local_whisper_svc.vad import CONTEXT_SAMPLES, SileroVAD, VADBatcher
+
+
+class LoudnessVAD(SileroVAD):
+    """Model-free VAD: a frame is speech if it is loud."""
+
+    def __init__(self):
+        super().__init__(min_speech_ms=64, min_silence_ms=96)
+        self.model = object()
+
+    def forward(self, frames, states):
+        probs = (np.abs(frames[:, CONTEXT_SAMPLES:]).mean(axis=1) > 0.01).astype(np.float32)
+        return probs, states
+
+
+def make_server(engine=None, max_queue: int = INFERENCE_QUEUE_SIZE, **engine_args) -> WhisperServer:
+    """Server wired to a FakeWhisperEngine and LoudnessVAD, no listener."""
+    engine = engine or FakeWhisperEngine(**engine_args)
+    server = WhisperServer(engine=engine)
+    server.idle_timeout_s = 0
+    server.vad = LoudnessVAD()
+    server.vad_batcher = VADBatcher(server.vad, batch_window_ms=0)
+    server.inference = InferenceExecutor(workers=engine.num_workers, max_queue=max_queue)
+    server.scheduler = DecodeScheduler(engine, server.inference, batch_window_ms=0)
+    server.scheduler.start()
+    return server
+
+
+def speech(seconds: float) -> bytes:
+    """Loud 16-bit PCM (a tone) the LoudnessVAD takes for speech."""
+    t = np.arange(int(16000 * seconds))
+    return (np.sin(t / 5) * 8000).astype(np.int16).tobytes()
+
+
+def silence(seconds: float) -> bytes:
+    return np.zeros(int(16000 * seconds), dtype=np.int16).tobytes()
+
+
+async def start(server: WhisperServer, session_id: str = "s", **options):
+    """Start a session; returns (session, list its responses are collected in)."""
+    sent: list[dict] = []
+
+    async def emit(response: str) -> None:
+        sent.append(json.loads(response))
+
+    command = StartCommand(session_id, **options).to_json()
+    ready = await server._process_command(command, emit, 1)
+    assert json.loads(ready)["type"] == "READY"
+    return server.sessions[session_id], sent
+
+
+async def feed(server: WhisperServer, session, pcm: bytes, chunk_s: float = 0.25) -> None:
+    """Send PCM in chunks, like a client streaming in real time (but faster)."""
+    step = int(16000 * chunk_s) * 2
+    for i in range(0, len(pcm), step):
+        await server._ingest_audio(session, pcm[i:i + step])
+        await asyncio.sleep(0)
+
+
+async def settle(session) -> None:
+    """Wait until the session has no decode running."""
+    while session.decode_task and not session.decode_task.done():
+        await session.decode_task
+
+
+class TestEndOfSpeechFlush:
+    """Test cases for the FINAL sent at end of speech."""
+
+    @pytest.mark.asyncio
+    async def test_audio_during_flush_decode_is_kept(self):
+        """Audio arriving while the end-of-speech decode runs must not be dropped."""
+        server = make_server(fixed_cost_ms=300)
+        session, sent = await start(server)
+
+        await feed(server, session, speech(2) + silence(0.25))
+        while session.end_of_speech:  # until the end-of-speech decode has begun
+            await asyncio.sleep(0.01)
+        assert not session.decode_task.done()
+        end_of_flushed = session.audio_buffer.total_samples
+
+        await server._ingest_audio(session, speech(1))  # during the decode
+        await settle(session)
+
+        assert any(m["type"] == "FINAL" and m["tts_final"] for m in sent)
+        assert session.audio_buffer.start_offset <= end_of_flushed
+        assert len(session.audio_buffer) >= 16000
+        await server.scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_long_pause_is_trimmed(self, caplog):
+        """Silence after a flushed unit is trimmed, so a long pause never
+        reaches the forced-commit limit or triggers decodes."""
+        server = make_server(fixed_cost_ms=0)
+        session, sent = await start(server)
+
+        await feed(server, session, speech(2) + silence(0.5))
+        await settle(session)
+        assert [m["type"] for m in sent].count("FINAL") == 1
+        calls = server.engine.calls
+
+        await feed(server, session, silence(25), chunk_s=0.5)
+        await settle(session)
+
+        assert server.engine.calls == calls
+        assert len(session.audio_buffer) <= session.speech.pad_samples + server._trim_margin_samples
+        assert "forcing commit" not in caplog.text
+        await server.scheduler.stop()
+
+
+class TestStop:
+    """Test cases for STOP reusing the last decode."""
+
+    @pytest.mark.asyncio
+    async def test_stop_reuses_cached_window(self):
+        """STOP right after a decode covering all audio needs no new decode."""
+        server = make_server(fixed_cost_ms=10, word_ms=400)
+        server.hypothesis_profile = COMMIT_PROFILE  # hypotheses are cached as is
+        session, sent = await start(server)
+
+        await feed(server, session, speech(2))
+        await settle(session)
+        assert session.last_window_end == session.audio_buffer.total_samples
+        calls = server.engine.calls
+
+        final = json.loads(await server._process_command(StopCommand("s").to_json()))
+
+        assert server.engine.calls == calls
+        assert final["type"] == "FINAL" and final["tts_final"]
+        assert final["text"] == "w0 w1 w2 w3 w4"
+        await server.scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_decodes_only_new_tail(self):
+        """Audio after the last decode is decoded on its own and appended."""
+        server = make_server(fixed_cost_ms=10, word_ms=400)
+        server.hypothesis_profile = COMMIT_PROFILE
+        session, sent = await start(server)
+
+        await feed(server, session, speech(2))
+        await settle(session)
+        session.audio_buffer.append_pcm(speech(0.8))  # buffered, not decoded
+        session.speech.add(32000, 32000 + 12800)
+        calls = server.engine.calls
+        observed = []
+        server.metrics.observe_decode = lambda latency, window: observed.append(window)
+
+        final = json.loads(await server._process_command(StopCommand("s").to_json()))
+
+        assert server.engine.calls == calls + 1
+        assert observed == [0.8]  # the tail decode is in the decode metrics
+        assert final["text"] == "w0 w1 w2 w3 w4 w0 w1"
+        await server.scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_after_hypothesis_decodes_uncommitted_audio(self):
+        """A cached hypothesis isn't committed: STOP decodes the uncommitted
+        audio (and only that) again at full quality."""
+        server = make_server(fixed_cost_ms=5, word_ms=400)
+        session, sent = await start(server)
+        margin_s = server._trim_margin_samples / 16000
+
+        # Stream until a commit was followed by a hypothesis covering all audio
+        for _ in range(40):
+            await feed(server, session, speech(0.25))
+            await settle(session)
+            committed = [m for m in sent if m["type"] == "FINAL"]
+            covered = session.last_window_end == session.audio_buffer.total_samples
+            if committed and covered and not session.last_authoritative:
+                break
+        assert session.last_profile is PARTIAL_PROFILE and not session.last_authoritative
+        uncommitted_s = len(session.audio_buffer) / 16000
+        observed = []
+        server.metrics.observe_decode = lambda latency, window: observed.append(window)
+
+        final = json.loads(await server._process_command(StopCommand("s").to_json()))
+
+        assert observed == [pytest.approx(uncommitted_s)]
+        assert final["words"]  # COMMIT_PROFILE has word timings
+        assert final["words"][0]["start"] >= committed[-1]["words"][-1]["end"] - margin_s
+        assert final["text"].startswith(committed[-1]["text"])
+        await server.scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_final_in_flight_at_stop_is_sent(self):
+        """A FINAL committed by a decode STOP waits for is still sent, so
+        the client sees no gap in commit_seq."""
+        server = make_server(fixed_cost_ms=300)
+        session, sent = await start(server)
+
+        await feed(server, session, speech(2) + silence(0.25))
+        while session.end_of_speech:  # until the end-of-speech decode has begun
+            await asyncio.sleep(0.01)
+        await server._ingest_audio(session, speech(1))  # decoded by STOP
+
+        final = json.loads(await server._process_command(StopCommand("s").to_json()))
+
+        finals = [m for m in sent if m["type"] == "FINAL"] + [final]
+        assert [m["commit_seq"] for m in finals] == [1, 2]
+        assert all(m["tts_final"] for m in finals)
+        await server.scheduler.stop()
+
+
+class DetectingEngine(FakeWhisperEngine):
+    """Returns scripted language detections and records the candidates."""
+
+    def __init__(self, *detections: tuple[str, float]):
+        super().__init__(fixed_cost_ms=0)
+        self.detections = list(detections)
+        self.candidates: list[list[str] | None] = []
+
+    def detect_language(self, audio, candidates=None):
+        self.candidates.append(candidates)
+        return self.detections.pop(0)
+
+
+class TestLanguagePinning:
+    """Test cases for per-utterance language detection in auto sessions."""
+
+    @pytest.mark.asyncio
+    async def test_single_candidate_is_pinned_without_detection(self):
+        engine = DetectingEngine()
+        server = make_server(engine)
+        session, _ = await start(server, source_lang="auto", auto_detect_langs=["fr-CA"])
+
+        language = await server._utterance_language(session, np.zeros(16000, dtype=np.float32))
+
+        assert language == "fr" and session.language == "fr"
+        assert engine.candidates == []
+        await server.scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_detection_restricted_to_candidates(self):
+        """Detection sees only the session's languages and is pinned for the utterance."""
+        engine = DetectingEngine(("fr", 0.9))
+        server = make_server(engine)
+        session, _ = await start(
+            server, source_lang="auto", auto_detect_langs=["en-US", "fr-CA", "en-GB"],
+        )
+        audio = np.zeros(16000, dtype=np.float32)
+
+        assert await server._utterance_language(session, audio) == "fr"
+        assert await server._utterance_language(session, audio) == "fr"
+
+        assert engine.candidates == [["en", "fr"]]
+        await server.scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_redetected_when_unpinned(self):
+        """A low-confidence detection and a new utterance both detect again."""
+        engine = DetectingEngine(("en", 0.3), ("en", 0.9), ("fr", 0.9))
+        server = make_server(engine)
+        session, _ = await start(server, source_lang="auto", auto_detect_langs=["en-US", "fr-CA"])
+        audio = np.zeros(16000, dtype=np.float32)
+        await feed(server, session, speech(0.2))  # speech_start
+
+        await server._utterance_language(session, audio)
+        assert session.language is None  # below the pin threshold
+        await server._utterance_language(session, audio)
+        assert session.language == "en"
+
+        # Silence then speech: a new utterance unpins the language
+        await feed(server, session, silence(0.2) + speech(0.2), chunk_s=0.1)
+        assert session.language is None
+        assert await server._utterance_language(session, audio) == "fr"
+        assert len(engine.candidates) == 3
+        await server.scheduler.stop()
+
+
+class TestStreamingAndTrimming:
+    """Test cases for per-segment PARTIALs and trimming committed audio."""
+
+    @pytest.mark.asyncio
+    async def test_partial_per_segment(self):
+        """A long window decoded alone sends a PARTIAL after each segment."""
+        server = make_server(fixed_cost_ms=5, cost_per_audio_s_ms=50, word_ms=400, segment_s=1)
+        session, sent = await start(server)
+
+        await server._ingest_audio(session, speech(3))
+        await settle(session)
+        await asyncio.sleep(0.01)  # segment callbacks hop back onto the loop
+
+        assert [m["text"] for m in sent if m["type"] == "PARTIAL"] == [
+            "w0 w1",
+            "w0 w1 w2 w3 w4",
+            "w0 w1 w2 w3 w4 w5 w6",
+        ]
+        await server.scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_committed_audio_is_trimmed(self):
+        """After a commit the buffer starts at the last committed word, so
+        committed words are not decoded (and committed) again."""
+        server = make_server(fixed_cost_ms=5, cost_per_audio_s_ms=0, word_ms=400)
+        server.hypothesis_profile = COMMIT_PROFILE
+        session, sent = await start(server)
+        margin_s = server._trim_margin_samples / 16000
+
+        finals, seen = [], 0
+        for _ in range(24):
+            await feed(server, session, speech(0.25))
+            await settle(session)
+            new = [m for m in sent[seen:] if m["type"] == "FINAL"]
+            seen = len(sent)
+            if new:
+                end = new[-1]["words"][-1]["end"]
+                assert session.audio_buffer.start_offset / 16000 == pytest.approx(end - margin_s)
+            finals += new
+
+        assert len(finals) >= 2
+        for previous, final in zip(finals, finals[1:]):
+            assert final["words"][0]["start"] >= previous["words"][-1]["end"] - margin_s
+        await server.scheduler.stop()
+
+
+class TestFlowControl:
+    """Test cases for FLOW_DROP recovery."""
+
+    @pytest.mark.asyncio
+    async def test_drop_lifted_without_more_chunks(self):
+        """A decode deferred on a saturated executor runs once a slot frees,
+        and lifts FLOW_DROP even though the client has stopped sending."""
+        server = make_server(fixed_cost_ms=5, max_queue=0)
+        server._max_backlog_samples = 16000
+        session, sent = await start(server)
+
+        # Occupy the only inference slot
+        hold = threading.Event()
+        blocker = asyncio.create_task(server.inference.run(hold.wait))
+        await asyncio.sleep(0)
+        assert server.inference.is_full
+
+        states = []
+        step = 4000 * 2
+        pcm = speech(3)
+        for i in range(0, len(pcm), step):
+            flow = await server._ingest_audio(session, pcm[i:i + step])
+            if flow:
+                states.append(flow.state)
+            await asyncio.sleep(0)
+        assert states[-1] == FLOW_DROP
+        assert session.trigger.stats.deferred > 0
+
+        # Free the slot; no more audio is sent
+        hold.set()
+        await blocker
+        for _ in range(100):
+            if session.flow_state == FLOW_OK:
+                break
+            await asyncio.sleep(0.01)
+        await settle(session)
+
+        assert session.flow_state == FLOW_OK
+        assert {"type": "FLOW", "state": FLOW_OK} in [
+            {"type": m["type"], "state": m.get("state")} for m in sent if m["type"] == "FLOW"
+        ]
+        assert any(m["type"] == "PARTIAL" for m in sent)
+        await server.scheduler.stop()
+
+
+class StallingEngine(FakeWhisperEngine):
+    """Decodes to no text, so nothing is committed; a decode of at least
+    `stall_samples` blocks until `release` is set."""
+
+    def __init__(self, stall_samples: int):
+        super().__init__(fixed_cost_ms=0, cost_per_audio_s_ms=0)
+        self.stall_samples = stall_samples
+        self.stalled = threading.Event()
+        self.release = threading.Event()
+        self.window: np.ndarray | None = None
+        self.window_on_entry: np.ndarray | None = None
+
+    def _result(self, audio, language, profile=COMMIT_PROFILE):
+        if len(audio) >= self.stall_samples and not self.release.is_set():
+            self.window, self.window_on_entry = audio, audio.copy()
+            self.stalled.set()
+            self.release.wait(10)
+        return TranscriptionResult(text="", language="en", words=[])
+
+
+class TestBufferCap:
+    """Test cases for a session ring capped by WHISPER_SESSION_BUFFER_MB."""
+
+    @pytest.mark.asyncio
+    async def test_full_window_decode_is_not_overwritten(self, monkeypatch):
+        """Audio arriving during a stalled full-window decode is shed rather
+        than overwriting the window or the buffered audio."""
+        monkeypatch.setattr(server_module, "SESSION_BUFFER_MB", 2)
+        server = make_server(StallingEngine(0))
+        server.engine.stall_samples = server._max_transcribe_samples
+        session, _ = await start(server)
+
+        # Nothing commits, so the buffer fills up to a forced full-window decode
+        while not server.engine.stalled.is_set():
+            await feed(server, session, speech(0.25))
+            await asyncio.sleep(0.01)
+        # Chunks larger than the headroom allows for cross FLOW_DROP's
+        # threshold past the end of the ring
+        await feed(server, session, speech(10), chunk_s=2)
+
+        assert session.dropped_chunks > 0
+        server.engine.release.set()
+        await settle(session)
+
+        assert session.audio_buffer.dropped_samples == 0
+        np.testing.assert_array_equal(server.engine.window, server.engine.window_on_entry)
+        await server.scheduler.stop()
+
+    def test_headroom_covers_drop_threshold(self, monkeypatch, caplog):
+        """Headroom below FLOW_DROP's threshold is raised to it, with a warning."""
+        monkeypatch.setattr(server_module, "BUFFER_HEADROOM_S", 2)
+        monkeypatch.setattr(server_module, "SESSION_BUFFER_MB", 2)
+
+        server = WhisperServer(engine=FakeWhisperEngine())
+
+        headroom = server._buffer_samples - server._max_transcribe_samples
+        assert headroom == 2 * server._max_backlog_samples + 16000
+        assert "WHISPER_BUFFER_HEADROOM_S" in caplog.text
+
+
+class SegmentedEngine(FakeWhisperEngine):
+    """Decodes to two segments, joined with the double space Whisper's
+    leading-space segment texts produce."""
+
+    SEGMENTS = [[" Hello", " there", " world."], [" How", " are", " you", " today?"]]
+
+    def __init__(self):
+        super().__init__(fixed_cost_ms=0)
+
+    def _result(self, audio, language, profile=COMMIT_PROFILE):
+        count = round(len(audio) / 16000 / 0.4)  # a word every 0.4 s
+        words, texts = [], []
+        for segment in self.SEGMENTS:
+            decoded = segment[:count - len(words)]
+            for word in decoded:
+                words.append(WordInfo(word, 0.4 * len(words), 0.4 * (len(words) + 1)))
+            if decoded:
+                texts.append("".join(decoded))
+        return TranscriptionResult(text=" ".join(texts).strip(), language="en", words=words)
+
+
+class TestCommitAcrossSegments:
+    """Test cases for the pending text after a commit."""
+
+    @pytest.mark.asyncio
+    async def test_pending_follows_committed_words(self):
+        """Pending text comes from the words after the commit, whatever the
+        spacing of the decoded text."""
+        server = make_server(SegmentedEngine())
+        server.hypothesis_profile = COMMIT_PROFILE
+        session, _ = await start(server)
+
+        for seconds in (2.4, 0.4):  # six words, then all seven
+            start_sample = session.audio_buffer.total_samples
+            session.audio_buffer.append_pcm(speech(seconds))
+            session.speech.add(start_sample, session.audio_buffer.total_samples)
+            response = await server._decode_window(session, end_of_speech=False)
+        assert session.last_result.text == "Hello there world.  How are you today?"
+
+        assert response.type == "FINAL"
+        assert response.text == "Hello there world. How are you"
+        assert [w.word for w in response.words][-1] == " you"
+        assert session.last_pending == "today?"  # not "u today?"
+        assert [w.word for w in session.last_pending_words] == [" today?"]
+
+        final = json.loads(await server._process_command(StopCommand("s").to_json()))
+        assert final["text"] == "Hello there world. How are you today?"
+        await server.scheduler.stop()
+
+
+def buffer_audio(session, *parts: tuple[bytes, bool]) -> None:
+    """Append (pcm, is_speech) parts to the buffer, marking the speech."""
+    for pcm, is_speech in parts:
+        begin = session.audio_buffer.total_samples
+        session.audio_buffer.append_pcm(pcm)
+        if is_speech:
+            session.speech.add(begin, session.audio_buffer.total_samples)
+
+
+class TestStreamClock:
+    """Test cases for word times on the session stream clock."""
+
+    @pytest.mark.asyncio
+    async def test_squeezed_pause_is_put_back(self):
+        """Words after a pause squeezed out of the window get their stream times."""
+        server = make_server(fixed_cost_ms=0, word_ms=250)
+        session, _ = await start(server)
+        buffer_audio(session, (speech(1), True), (silence(2), False), (speech(1), True))
+
+        final = await server._decode_window(session, end_of_speech=True)
+
+        # A 2.3 s window: the 2 s pause was squeezed to 0.3 s
+        times = [(w.start, w.end) for w in final.words]
+        assert times[:4] == [(0.0, 0.25), (0.25, 0.5), (0.5, 0.75), (0.75, 1.0)]
+        assert times[5:] == [(2.95, 3.2), (3.2, 3.45), (3.45, 3.7), (3.7, 3.95)]
+        await server.scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_shed_audio_counts(self):
+        """Audio discarded under FLOW_DROP still advances the stream clock."""
+        server = make_server(fixed_cost_ms=0, word_ms=250)
+        session, _ = await start(server)
+        buffer_audio(session, (speech(0.5), True))
+
+        session.flow_state = FLOW_DROP
+        assert await server._ingest_audio(session, speech(0.75)) is None
+        session.flow_state = FLOW_OK
+        buffer_audio(session, (speech(0.5), True))
+
+        final = await server._decode_window(session, end_of_speech=True)
+
+        assert session.audio_buffer.total_samples == 16000  # nothing shed was buffered
+        assert [(w.start, w.end) for w in final.words] == [
+            (0.0, 0.25), (0.25, 0.5), (1.25, 1.5), (1.5, 1.75),
+        ]
+        await server.scheduler.stop()
@@ -0,0 +1,89 @@
+"""Tests for per-session command queues on a shared connection."""
+
+import asyncio
+
+import pytest
+from local_whisper_svc.session_queues import SessionQueues
+
+
+class TestSessionQueues:
+    """Test cases for SessionQueues."""
+
+    @pytest.mark.asyncio
+    async def test_commands_of_a_session_run_in_order(self):
+        """A session's commands should be handled one at a time, in order."""
+        handled = []
+
+        async def handle(command):
+            await asyncio.sleep(0.001 * (3 - command[1]))
+            handled.append(command)
+
+        queues = SessionQueues(handle)
+        for i in range(3):
+            await queues.submit("a", ("a", i))
+        await asyncio.sleep(0.05)
+
+        assert handled == [("a", 0), ("a", 1), ("a", 2)]
+        assert queues.active_sessions == 0
+
+    @pytest.mark.asyncio
+    async def test_blocked_session_does_not_hold_up_others(self):
+        """A slow command (e.g. STOP awaiting a decode) blocks only its session."""
+        release = asyncio.Event()
+        handled = []
+
+        async def handle(command):
+            if command == "a:stop":
+                await release.wait()
+            handled.append(command)
+
+        queues = SessionQueues(handle)
+        await queues.submit("a", "a:stop")
+        await queues.submit("a", "a:audio")
+        await queues.submit("b", "b:audio")
+        await asyncio.sleep(0.01)
+
+        assert handled == ["b:audio"]
+        release.set()
+        await asyncio.sleep(0.01)
+        assert handled == ["b:audio", "a:stop", "a:audio"]
+
+    @pytest.mark.asyncio
+    async def test_full_queue_applies_backpressure(self):
+        """submit() should wait while the session has max_queued commands queued."""
+        release = asyncio.Event()
+
+        async def handle(command):
+            await release.wait()
+
+        queues = SessionQueues(handle, max_queued=2)
+        for i in range(3):  # one being handled, two queued
+            await queues.submit("a", i)
+        await asyncio.sleep(0)
+
+        blocked = asyncio.create_task(queues.submit("a", 3))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        release.set()
+        await asyncio.wait_for(blocked, 1)
+        await queues.close()
+
+    @pytest.mark.asyncio
+    async def test_close_drops_queued_commands(self):
+        """close() should cancel handling and forget what is still queued."""
+        handled = []
+
+        async def handle(command):
+            await asyncio.sleep(1)
+            handled.append(command)
+
+        queues = SessionQueues(handle)
+        await queues.submit("a", 1)
+        await queues.submit("a", 2)
+        await queues.submit("b", 1)
+        await queues.close()
+
+        assert handled == []
+        assert queues.active_sessions == 0
+        assert len(queues) == 0
@@ -0,0 +1,94 @@
+"""Tests for session ownership, disconnect cleanup and idle reaping."""
+
+import asyncio
+import json
+
+import pytest
+from local_whisper_svc.protocol import StartCommand, StopCommand
+from local_whisper_svc.server import WhisperServer
+from local_whisper_svc.vad import SileroVAD
+
+
+def make_server() -> WhisperServer:
+    """Server without models: sessions can be started but not decoded."""
+    server = WhisperServer()
+    server.vad = SileroVAD()  # new_state() needs no loaded model
+    return server
+
+
+async def start(server: WhisperServer, session_id: str, connection: int, sent: list) -> None:
+    async def emit(response: str) -> None:
+        sent.append(json.loads(response))
+
+    ready = await server._process_command(StartCommand(session_id).to_json(), emit, connection)
+    assert json.loads(ready)["type"] == "READY"
+
+
+class TestSessionOwnership:
+    """Test cases for connection-owned sessions."""
+
+    @pytest.mark.asyncio
+    async def test_disconnect_closes_owned_sessions(self):
+        """A client that disconnects without STOP should leave no session behind."""
+        server = make_server()
+        await start(server, "a", connection=1, sent=[])
+        await start(server, "b", connection=1, sent=[])
+        await start(server, "c", connection=2, sent=[])
+
+        server.close_connection(1)
+
+        assert list(server.sessions) == ["c"]
+        assert server.connections == {2: {"c"}}
+
+    @pytest.mark.asyncio
+    async def test_restart_replaces_session(self):
+        """START for a live session id should replace it, not leak it."""
+        server = make_server()
+        await start(server, "a", connection=1, sent=[])
+        await start(server, "a", connection=2, sent=[])
+
+        server.close_connection(1)
+
+        assert server.sessions["a"].connection == 2
+        assert server.buffer_bytes == server.sessions["a"].audio_buffer.nbytes
+
+    @pytest.mark.asyncio
+    async def test_idle_session_is_reaped(self):
+        """A session without commands should be stopped and its client told."""
+        server = make_server()
+        server.idle_timeout_s = 0.04
+        sent = []
+        await start(server, "a", connection=1, sent=sent)
+
+        reaper = asyncio.create_task(server._reap_idle_sessions())
+        await asyncio.sleep(0.1)
+        reaper.cancel()
+
+        assert not server.sessions
+        assert [m["type"] for m in sent] == ["ERROR"]
+
+    @pytest.mark.asyncio
+    async def test_reap_waits_for_queued_commands(self):
+        """The reap runs behind the session's queued commands, not alongside them."""
+        server = make_server()
+        server.idle_timeout_s = 0.04
+        sent = []
+        await start(server, "a", connection=1, sent=sent)
+
+        async def emit(response) -> None:
+            sent.append(json.loads(response.to_json()))
+
+        queues = server._connection_queues(1, emit)
+        busy = asyncio.Event()
+        await queues.submit("a", busy.wait)  # the session's lane is busy
+        await queues.submit("a", StopCommand("a"))
+
+        reaper = asyncio.create_task(server._reap_idle_sessions())
+        await asyncio.sleep(0.1)
+        assert "a" in server.sessions  # the reap is queued behind the STOP
+        busy.set()
+        await asyncio.sleep(0.05)
+        reaper.cancel()
+
+        assert not server.sessions
+        assert [m["type"] for m in sent] == []  # stopped by the client, not reaped
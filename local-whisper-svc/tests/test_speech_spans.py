@@ -0,0 +1,74 @@
+"""Tests for speech spans and silence-squeezed decode windows."""
+
+import numpy as np
+from local_whisper_svc.speech_spans import SpeechSpans, WindowMap
+
+SR = 16000
+
+
+def stream(seconds: float) -> np.ndarray:
+    """Audio whose sample values are their own offsets, to check slicing."""
+    return np.arange(int(SR * seconds), dtype=np.float32)
+
+
+class TestSpeechSpans:
+    """Test cases for SpeechSpans."""
+
+    def test_adjacent_frames_merge(self):
+        """Consecutive speech frames should form one span."""
+        spans = SpeechSpans()
+        for start in range(0, 512 * 4, 512):
+            spans.add(start, start + 512)
+        spans.add(SR, SR + 512)
+
+        assert len(spans) == 2
+
+    def test_no_speech_gives_empty_window(self):
+        """A window without speech frames needs no decode."""
+        spans = SpeechSpans(squeeze_pause_ms=300)
+
+        window, _ = spans.compact(stream(5), 0)
+
+        assert len(window) == 0
+
+    def test_long_pause_is_squeezed(self):
+        """A pause longer than the squeeze pause should shrink to it."""
+        spans = SpeechSpans(squeeze_pause_ms=300)
+        spans.add(1 * SR, 2 * SR)
+        spans.add(6 * SR, 7 * SR)
+
+        window, window_map = spans.compact(stream(8), 0)
+
+        # 1 s of speech twice, 150 ms of padding on each side of each span
+        assert len(window) == 2 * (SR + 2 * 2400)
+        assert window[0] == SR - 2400
+        # A word starting right at the second span maps back to 6 s
+        second_start = (SR + 2 * 2400 + 2400) / SR
+        assert abs(window_map.to_stream(second_start) - 6.0) < 1e-6
+
+    def test_continuous_speech_is_not_copied(self):
+        """A window that is speech throughout is returned as is."""
+        spans = SpeechSpans(squeeze_pause_ms=300)
+        spans.add(0, 3 * SR)
+        audio = stream(3)
+
+        window, window_map = spans.compact(audio, 0)
+
+        assert window is audio
+        assert window_map.to_stream(1.5) == 1.5
+
+    def test_discard_until_clips_spans(self):
+        """Speech before the buffer start should no longer be kept."""
+        spans = SpeechSpans(squeeze_pause_ms=300)
+        spans.add(0, 2 * SR)
+        spans.add(3 * SR, 4 * SR)
+
+        spans.discard_until(int(2.5 * SR))
+        window, window_map = spans.compact(stream(2), int(2.5 * SR))
+
+        assert len(spans) == 1
+        assert window_map.stream_start == 3 * SR - 2400
+
+    def test_contiguous_map_shifts_by_offset(self):
+        """An unsqueezed window maps by a constant shift."""
+        assert WindowMap.contiguous(2 * SR).to_stream(0.5) == 2.5
@@ -0,0 +1,108 @@
+"""Tests for service startup behaviour."""
+
+import asyncio
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+from local_whisper_svc import server as server_module
+from local_whisper_svc.bench import FakeWhisperEngine
+from local_whisper_svc.protocol import StartCommand
+from local_whisper_svc.server import WhisperServer
+from local_whisper_svc.vad import CONTEXT_SAMPLES, SileroVAD
+
+
+class TestLazyImports:
+    """Heavy dependencies are imported when models load, not on import."""
+
+    def test_server_import_skips_torch_and_faster_whisper(self):
+        """Importing the server and supervisor modules loads no ML frameworks."""
+        code = (
+            "import sys\n"
+            "import local_whisper_svc.server, local_whisper_svc.workers\n"
+            "print(','.join(m for m in ('torch', 'faster_whisper', 'ctranslate2') if m in sys.modules))\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        )
+        assert out.stdout.strip() == ""
+
+
+class RecordingEngine(FakeWhisperEngine):
+    """Records loads and decodes into a shared event list."""
+
+    def __init__(self, events: list[str]):
+        super().__init__(fixed_cost_ms=0)
+        self.events = events
+        self.loaded = False
+
+    def load_model(self) -> None:
+        self.events.append("load")
+        self.loaded = True
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.loaded
+
+    def transcribe(self, audio, *args, **kwargs):
+        self.events.append("decode")
+        return super().transcribe(audio, *args, **kwargs)
+
+    def transcribe_batch(self, audios, *args, **kwargs):
+        self.events.append("decode")
+        return super().transcribe_batch(audios, *args, **kwargs)
+
+
+class LoudnessVAD(SileroVAD):
+    """Model-free VAD: a frame is speech if it is loud."""
+
+    def __init__(self):
+        super().__init__(min_speech_ms=64, min_silence_ms=96)
+        self.model = object()
+
+    def forward(self, frames, states):
+        probs = (np.abs(frames[:, CONTEXT_SAMPLES:]).mean(axis=1) > 0.01).astype(np.float32)
+        return probs, states
+
+
+class TestStartupOrder:
+    """The model is loaded and warmed up once, before clients can connect."""
+
+    @pytest.mark.asyncio
+    async def test_warm_before_listen_and_loaded_once(self, monkeypatch, tmp_path):
+        """start() loads and warms the engine before binding the socket, and
+        sessions decode on the loaded model without loading it again."""
+        events: list[str] = []
+        monkeypatch.setattr(server_module, "create_vad", LoudnessVAD)
+        monkeypatch.setattr(server_module, "WARMUP_S", 1)
+        start_unix_server = asyncio.start_unix_server
+
+        async def record_listen(*args, **kwargs):
+            events.append("listen")
+            return await start_unix_server(*args, **kwargs)
+
+        monkeypatch.setattr(asyncio, "start_unix_server", record_listen)
+        server = WhisperServer(socket_path=str(tmp_path / "stt.sock"), engine=RecordingEngine(events))
+        server.idle_timeout_s = 0
+
+        await server.start()
+        assert events[0] == "load" and events[-1] == "listen"
+        assert "decode" in events  # the warm-up
+
+        pcm = (np.sin(np.arange(16000 * 2) / 5) * 8000).astype(np.int16).tobytes()
+        for session_id in ("a", "b"):
+            command = StartCommand(session_id).to_json()
+            ready = await server._process_command(command, lambda line: asyncio.sleep(0), 1)
+            assert json.loads(ready)["type"] == "READY"
+            session = server.sessions[session_id]
+            for i in range(0, len(pcm), 8000):
+                await server._ingest_audio(session, pcm[i:i + 8000])
+            while session.decode_task and not session.decode_task.done():
+                await session.decode_task
+        await server.stop()
+
+        after_listen = events[events.index("listen") + 1:]
+        assert after_listen.count("decode") >= 2  # both sessions decoded
+        assert "load" not in after_listen
@@ -0,0 +1,84 @@
+"""Tests for the onnxruntime Silero VAD backend."""
+
+import numpy as np
+import pytest
+from local_whisper_svc.vad import (
+    CONTEXT_SAMPLES,
+    FRAME_SAMPLES,
+    STATE_SHAPE,
+    OnnxSileroVAD,
+    SileroVAD,
+    create_vad,
+)
+
+pytest.importorskip("onnxruntime")
+
+
+def noise(seconds: float, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(16000 * seconds)) * 0.1).astype(np.float32)
+
+
+def frame_probs(vad, streams) -> list[list[float]]:
+    """Per-frame speech probabilities (threshold 0 reports every frame)."""
+    for stream in streams:
+        stream.threshold = 0.0
+    return [
+        [e.confidence for e in events if e.event_type == "speech"]
+        for events in vad.process_frames(streams)
+    ]
+
+
+@pytest.fixture(scope="module")
+def vad():
+    try:
+        model = OnnxSileroVAD()
+        model.load_model()
+    except RuntimeError as e:
+        pytest.skip(str(e))
+    return model
+
+
+class TestOnnxSileroVAD:
+    """Test cases for OnnxSileroVAD."""
+
+    def test_create_vad_selects_backend(self):
+        """create_vad should pick the backend by name."""
+        assert isinstance(create_vad("onnx"), OnnxSileroVAD)
+        assert type(create_vad("torch")) is SileroVAD
+        with pytest.raises(ValueError):
+            create_vad("tflite")
+
+    def test_forward_shapes(self, vad):
+        """One probability and one state slice per stream in the batch."""
+        frames = np.zeros((3, CONTEXT_SAMPLES + FRAME_SAMPLES), dtype=np.float32)
+        states = np.zeros((STATE_SHAPE[0], 3, STATE_SHAPE[2]), dtype=np.float32)
+
+        probs, new_states = vad.forward(frames, states)
+
+        assert probs.shape == (3,)
+        assert new_states.shape == states.shape
+        assert np.all((probs >= 0) & (probs <= 1))
+
+    def test_silence_has_no_speech(self, vad):
+        """Silence should produce no speech events."""
+        vad.reset()
+        events = vad.process_audio(np.zeros(16000, dtype=np.float32))
+
+        assert not any(e.event_type == "speech_start" for e in events)
+
+    def test_batched_matches_single_stream(self, vad):
+        """Batching streams must not change any stream's probabilities."""
+        audio = noise(0.5)
+        single = vad.new_state()
+        single.push(audio)
+        expected = frame_probs(vad, [single])[0]
+
+        streams = [vad.new_state() for _ in range(3)]
+        streams[0].push(noise(0.5, seed=1))
+        streams[1].push(audio)
+        streams[2].push(audio[: len(audio) // 2])
+        probs = frame_probs(vad, streams)
+
+        assert len(expected) == len(audio) // FRAME_SAMPLES
+        assert probs[1] == pytest.approx(expected, abs=1e-5)
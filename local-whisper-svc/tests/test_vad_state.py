@@ -0,0 +1,119 @@
+"""Tests for per-session VAD state and cross-session batched VAD passes."""
+
+import asyncio
+
+import numpy as np
+import pytest
+from local_whisper_svc.vad import (
+    CONTEXT_SAMPLES,
+    FRAME_SAMPLES,
+    SileroVAD,
+    VADBatcher,
+    VADState,
+)
+
+
+class FakeVAD(SileroVAD):
+    """Model-free VAD: a frame is speech if it is loud.
+
+    Each step adds 1 to the recurrent state, so the state shows how many
+    frames its stream has been through; batch sizes are recorded.
+    """
+
+    def __init__(self):
+        super().__init__(min_speech_ms=64, min_silence_ms=64)
+        self.model = object()
+        self.batches: list[int] = []
+
+    def forward(self, frames, states):
+        self.batches.append(len(frames))
+        probs = (np.abs(frames[:, CONTEXT_SAMPLES:]).mean(axis=1) > 0.1).astype(np.float32)
+        return probs, states + 1
+
+
+def loud(frames: int) -> np.ndarray:
+    return np.full(frames * FRAME_SAMPLES, 0.5, dtype=np.float32)
+
+
+def quiet(frames: int) -> np.ndarray:
+    return np.zeros(frames * FRAME_SAMPLES, dtype=np.float32)
+
+
+class TestVADState:
+    """Test cases for VADState framing and hysteresis."""
+
+    def test_partial_frames_are_kept(self):
+        """Samples short of a frame should wait for the next push."""
+        state = VADState()
+
+        assert state.push(np.zeros(FRAME_SAMPLES - 10, dtype=np.float32)) == 0
+        assert state.push(np.zeros(20, dtype=np.float32)) == 1
+        assert len(state.take_frame()) == CONTEXT_SAMPLES + FRAME_SAMPLES
+        assert len(state.pending) == 10
+
+    def test_context_carries_over(self):
+        """Each frame is prefixed with the tail of the previous one."""
+        state = VADState()
+        state.push(np.arange(2 * FRAME_SAMPLES, dtype=np.float32))
+
+        first, second = state.take_frame(), state.take_frame()
+
+        assert np.all(first[:CONTEXT_SAMPLES] == 0)
+        assert np.array_equal(second[:CONTEXT_SAMPLES], first[-CONTEXT_SAMPLES:])
+
+    def test_hysteresis(self):
+        """speech_start needs min_speech_ms of speech, speech_end min_silence_ms of silence."""
+        state = VADState(threshold=0.5, min_speech_ms=64, min_silence_ms=96)
+
+        assert [e.event_type for e in state.update(1.0, 32)] == ["speech"]
+        assert [e.event_type for e in state.update(1.0, 32)] == ["speech_start", "speech"]
+        assert state.update(0.0, 32) == []
+        assert state.update(0.0, 32) == []
+        assert [e.event_type for e in state.update(0.0, 32)] == ["speech_end"]
+        assert not state.is_speaking
+
+
+class TestBatchedVAD:
+    """Test cases for batching streams through one model."""
+
+    def test_streams_keep_their_own_state(self):
+        """Batched streams must not share recurrent state or hysteresis."""
+        vad = FakeVAD()
+        a, b = vad.new_state(), vad.new_state()
+        a.push(loud(3))
+        b.push(quiet(1))
+
+        events = vad.process_frames([a, b])
+
+        assert vad.batches == [2, 1, 1]
+        assert np.all(a.rnn_state == 3) and np.all(b.rnn_state == 1)
+        assert a.is_speaking and not b.is_speaking
+        assert "speech_start" in [e.event_type for e in events[0]]
+        assert events[1] == []
+
+    @pytest.mark.asyncio
+    async def test_batcher_runs_sessions_in_one_pass(self):
+        """Sessions submitting in the same tick share one forward pass."""
+        vad = FakeVAD()
+        batcher = VADBatcher(vad, batch_window_ms=5)
+        states = [vad.new_state() for _ in range(4)]
+
+        events = await asyncio.gather(*[
+            batcher.process(state, loud(2) if i % 2 else quiet(2))
+            for i, state in enumerate(states)
+        ])
+
+        assert vad.batches == [4, 4]
+        assert [any(e.event_type == "speech_start" for e in ev) for ev in events] == [
+            False, True, False, True,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_batcher_skips_short_chunks(self):
+        """A chunk shorter than a frame needs no model call."""
+        vad = FakeVAD()
+        batcher = VADBatcher(vad, batch_window_ms=0)
+        state = vad.new_state()
+
+        assert await batcher.process(state, np.zeros(100, dtype=np.float32)) == []
+        assert vad.batches == []
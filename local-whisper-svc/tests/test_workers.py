@@ -0,0 +1,116 @@
+"""Tests for the multi-process worker pool front end."""
+
+import asyncio
+import queue
+import threading
+
+import pytest
+from local_whisper_svc import workers
+from local_whisper_svc.workers import SharedAudioRing, WorkerPool
+
+
+@pytest.fixture
+def ring():
+    ring = SharedAudioRing.create(16)
+    yield ring
+    ring.close()
+
+
+class TestSharedAudioRing:
+    """Test cases for SharedAudioRing."""
+
+    def test_write_then_read(self, ring):
+        """Chunks should come back in order and release their space."""
+        a = ring.write(b"abcd")
+        b = ring.write(b"efgh")
+
+        assert ring.read(a, 4) == b"abcd"
+        assert ring.read(b, 4) == b"efgh"
+        assert ring.free_bytes == 16
+
+    def test_full_ring_applies_backpressure(self, ring):
+        """A write that doesn't fit should wait for the reader."""
+        start = ring.write(b"x" * 12)
+
+        assert ring.write(b"y" * 8) is None
+
+        ring.read(start, 12)
+        assert ring.write(b"y" * 8) is not None
+
+    def test_chunks_never_wrap(self, ring):
+        """A chunk that doesn't fit at the end should start at offset 0."""
+        first = ring.write(b"x" * 12)
+        ring.read(first, 12)
+
+        start = ring.write(b"abcdef")
+
+        assert start % ring.size == 0
+        assert ring.read(start, 6) == b"abcdef"
+
+    def test_release_notification_requested_once(self, ring):
+        """The consumer notifies only when the producer asked, and only once."""
+        start = ring.write(b"x" * 12)
+        assert not ring.release_wanted()
+
+        ring.want_release()
+        ring.read(start, 12)
+
+        assert ring.release_wanted()
+        assert not ring.release_wanted()
+
+    def test_oversized_chunk(self, ring):
+        """Chunks larger than the ring are rejected."""
+        with pytest.raises(ValueError):
+            ring.write(b"x" * 17)
+
+
+class TestWorkerPoolAffinity:
+    """Test cases for session placement (no processes started)."""
+
+    def test_least_loaded_worker(self):
+        """New sessions should go to the worker with the fewest sessions."""
+        pool = WorkerPool(3)
+
+        assert [pool.assign(f"s{i}") for i in range(4)] == [0, 1, 2, 0]
+
+        pool.release("s1")
+        assert pool.assign("s4") == 1
+        assert pool.session_workers["s4"] == 1
+
+    def test_release_unknown_session(self):
+        """Releasing an unknown session is a no-op."""
+        pool = WorkerPool(2)
+
+        assert pool.release("missing") is None
+        assert pool.load == [0, 0]
+
+
+class TestWorkerPoolBackpressure:
+    """Test cases for writing audio to a full worker ring (no processes started)."""
+
+    @pytest.mark.asyncio
+    async def test_send_audio_waits_for_release(self, ring, monkeypatch):
+        """A blocked send resumes on the worker's release notification."""
+        monkeypatch.setattr(workers, "RING_RETRY_S", 60)  # only the notification wakes it
+        pool = WorkerPool(1)
+        pool.rings = [ring]
+        pool.cmd_queues = [queue.Queue()]
+        pool.resp_queue = queue.Queue()
+        pool._space = [asyncio.Event()]
+        pump = threading.Thread(target=pool._pump_responses, args=(asyncio.get_running_loop(),))
+        pump.start()
+
+        start = ring.write(b"x" * 12)
+        send = asyncio.create_task(pool.send_audio(0, 1, "s", 0, b"y" * 8))
+        await asyncio.sleep(0.01)
+        assert not send.done()
+
+        # What the worker does after copying the chunk out
+        ring.read(start, 12)
+        assert ring.release_wanted()
+        pool.resp_queue.put((None, 0, "released", None, None))
+        await asyncio.wait_for(send, 5)
+
+        assert pool.cmd_queues[0].get_nowait()[:4] == ("audio", 1, "s", 0)
+        pool.resp_queue.put(None)
+        pump.join()
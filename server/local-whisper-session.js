@@ -21,6 +21,13 @@ const WHISPER_TCP_PORT = process.env.WHISPER_TCP_PORT ? parseInt(process.env.WHI
 // Use TCP if host and port are configured
 const USE_TCP = !!(WHISPER_TCP_HOST && WHISPER_TCP_PORT)
 
+// Send audio as binary frames instead of base64 JSON (negotiated in START)
+const WHISPER_BINARY_AUDIO = process.env.WHISPER_BINARY_AUDIO !== 'false'
+
+// Binary audio frame header: u8 magic (0x00), u32 channel, u32 seq, u32 sample count (LE)
+const AUDIO_FRAME_MAGIC = 0x00
+const AUDIO_FRAME_HEADER_SIZE = 13
+
 const PROVIDER_NAME = 'local-whisper'
 
 // Language code mapping: BCP-47 → Whisper short codes
@@ -103,6 +110,26 @@ class LocalWhisperSession {
     // Buffer for incomplete JSON lines
     this.lineBuffer = ''
 
+    // Binary audio channel (assigned by the service in READY)
+    this.audioChannel = null
+    this.audioSeq = 0
+
+    // Admission / flow control from the service
+    this.isBusy = false // START refused at capacity (BUSY)
+    this.flowState = 'ok' // 'ok' | 'throttle' | 'drop' (FLOW)
+    this.droppedChunks = 0
+
+    // Incremental finals: FINAL words only cover the newly committed span,
+    // timed on the session stream clock
+    this.lastCommitSeq = 0
+    this.unitStartMs = null // stream time of the current unit's first word
+
+    // Audio the service never got (withheld in drop, or lost while
+    // connecting) still took session time; word times from the service
+    // are shifted by what was withheld before them
+    this.acceptedMs = 0 // audio sent or queued for the service: its stream clock
+    this.withheld = [] // { atMs, totalMs }: total withheld once the service clock reaches atMs
+
     // Pending audio during connection
     this.pendingAudio = []
     this.maxPendingAudio = 50
@@ -167,6 +194,7 @@ class LocalWhisperSession {
           auto_detect_langs: this.autoDetectLangs,
           phrase_hints: this.phraseHints,
           initial_prompt: this.sttPrompt || undefined,
+          binary_audio: WHISPER_BINARY_AUDIO,
         })
         this.socket.write(startCmd + '\n')
 
@@ -231,7 +259,12 @@ class LocalWhisperSession {
    */
   async _handleMessage(msg) {
     if (msg.type === 'READY') {
-      this.logger.info(`[LocalWhisper:${this.roomId}] Session ready`)
+      if (typeof msg.audio_channel === 'number') {
+        this.audioChannel = msg.audio_channel
+      }
+      this.logger.info(`[LocalWhisper:${this.roomId}] Session ready`, {
+        binaryAudio: this.audioChannel !== null
+      })
       return
     }
 
@@ -240,6 +273,28 @@ class LocalWhisperSession {
       return
     }
 
+    if (msg.type === 'BUSY') {
+      // Service at capacity: no session was created, stop sending audio
+      this.isBusy = true
+      this.logger.error(`[LocalWhisper:${this.roomId}] Service busy:`, {
+        reason: msg.reason,
+        activeSessions: msg.active_sessions,
+        maxSessions: msg.max_sessions
+      })
+      return
+    }
+
+    if (msg.type === 'FLOW') {
+      if (msg.state !== this.flowState) {
+        this.logger.warn(`[LocalWhisper:${this.roomId}] Flow ${this.flowState} -> ${msg.state}`, {
+          backlogMs: msg.backlog_ms,
+          bufferedMs: msg.buffered_ms
+        })
+      }
+      this.flowState = msg.state
+      return
+    }
+
     if (msg.type === 'PARTIAL') {
       await this._handlePartial(msg)
     } else if (msg.type === 'FINAL') {
@@ -302,17 +357,26 @@ class LocalWhisperSession {
       metrics.observeSttTtfc(this.roomId, PROVIDER_NAME, ttfc / 1000)
     }
 
+    // Finals are numbered per session; a repeated or older one is stale
+    if (msg.commit_seq) {
+      if (msg.commit_seq <= this.lastCommitSeq) return
+      this.lastCommitSeq = msg.commit_seq
+    }
+
     const srcLang = mapFromWhisperLang(msg.language)
     if (!this.currentLang) {
       this.currentLang = srcLang
     }
 
-    // Build timestamps from words if available
+    // Words cover only this commit; the unit spans from its first word
     let ts = undefined
     if (msg.words && msg.words.length > 0) {
+      if (this.unitStartMs === null) {
+        this.unitStartMs = this._sessionMs(msg.words[0].start)
+      }
       ts = {
-        t0: Math.floor(msg.words[0].start * 1000),
-        t1: Math.floor(msg.words[msg.words.length - 1].end * 1000),
+        t0: this.unitStartMs,
+        t1: this._sessionMs(msg.words[msg.words.length - 1].end),
       }
     }
 
@@ -333,6 +397,7 @@ class LocalWhisperSession {
     if (msg.tts_final) {
       this.unitIndex++
       this.version = 0
+      this.unitStartMs = null
       this.currentLang = ''
       this.lastSoftText = ''
       this.lastSoftAt = Date.now()
@@ -363,23 +428,68 @@ class LocalWhisperSession {
       return
     }
 
+    if (this.isBusy) return
+
+    if (this.flowState === 'drop') {
+      // The service discards this audio anyway; don't spend bandwidth on it
+      this.droppedChunks++
+      this._withhold(audioData)
+      return
+    }
+
     if (!this.isConnected) {
       // Buffer audio during connection
       if (this.pendingAudio.length < this.maxPendingAudio) {
         this.pendingAudio.push(audioData)
+        this.acceptedMs += audioData.length / 32
+      } else {
+        this._withhold(audioData)
       }
       return
     }
 
+    this.acceptedMs += audioData.length / 32
     this._sendAudio(audioData)
   }
 
+  /**
+   * Record audio not sent to the service, at the current service stream time
+   */
+  _withhold(audioData) {
+    const ms = audioData.length / 32 // 16kHz 16-bit mono
+    const last = this.withheld[this.withheld.length - 1]
+    if (last && last.atMs === this.acceptedMs) {
+      last.totalMs += ms
+    } else {
+      this.withheld.push({ atMs: this.acceptedMs, totalMs: (last ? last.totalMs : 0) + ms })
+    }
+  }
+
+  /**
+   * Map service stream time (seconds) to session time (ms), counting the
+   * audio withheld before it
+   */
+  _sessionMs(streamSeconds) {
+    const ms = streamSeconds * 1000
+    let shift = 0
+    for (const gap of this.withheld) {
+      if (gap.atMs > ms) break
+      shift = gap.totalMs
+    }
+    return Math.floor(ms + shift)
+  }
+
   /**
    * Send audio to the whisper service
    */
   _sendAudio(audioData) {
     if (!this.socket || !this.isConnected) return
 
+    if (this.audioChannel !== null) {
+      this._sendAudioFrame(audioData)
+      return
+    }
+
     const audioCmd = JSON.stringify({
       cmd: 'AUDIO',
       session_id: this.sessionId,
@@ -393,6 +503,24 @@ class LocalWhisperSession {
     }
   }
 
+  /**
+   * Send audio as a binary frame (raw PCM, no base64/JSON)
+   */
+  _sendAudioFrame(audioData) {
+    const header = Buffer.alloc(AUDIO_FRAME_HEADER_SIZE)
+    header.writeUInt8(AUDIO_FRAME_MAGIC, 0)
+    header.writeUInt32LE(this.audioChannel, 1)
+    header.writeUInt32LE(this.audioSeq, 5)
+    header.writeUInt32LE(audioData.length >> 1, 9)
+    this.audioSeq = (this.audioSeq + 1) >>> 0
+
+    try {
+      this.socket.write(Buffer.concat([header, audioData]))
+    } catch (err) {
+      this.logger.error(`[LocalWhisper:${this.roomId}] Failed to send audio frame:`, err)
+    }
+  }
+
   /**
    * Update configuration mid-session
    */
@@ -433,6 +561,14 @@ class LocalWhisperSession {
     this.isConnected = false
     this.pendingAudio = []
     this.socket = null
+    this.audioChannel = null
+    this.audioSeq = 0
+    this.isBusy = false
+    this.flowState = 'ok'
+    this.lastCommitSeq = 0
+    this.unitStartMs = null
+    this.acceptedMs = 0
+    this.withheld = []
   }
 
   /**
@@ -451,6 +587,9 @@ class LocalWhisperSession {
       ttfc_ms: this.firstFinalAt ? this.firstFinalAt - this.audioStartTime : null,
       unit_count: this.unitIndex,
       total_patches: this.version,
+      busy: this.isBusy,
+      flow_state: this.flowState,
+      dropped_chunks: this.droppedChunks,
     }
   }
 }